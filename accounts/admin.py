@@ -1,4 +1,18 @@
 from django.contrib import admin
+
+from hostel_booking_system.pagination import EstimatedCountPaginator
 from .models import CustomUser
-# Register your models here.
-admin.site.register(CustomUser)
+
+
+class CustomUserAdmin(admin.ModelAdmin):
+    list_display = ('email', 'username', 'first_name', 'last_name', 'role', 'is_active', 'date_joined')
+    list_filter = ('role', 'is_active', 'is_staff')
+    # Prefix searches can use the unique email and username indexes; also
+    # what the booking and hostel autocompletes search.
+    search_fields = ('^email', '^username')
+    ordering = ('-date_joined', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+admin.site.register(CustomUser, CustomUserAdmin)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_auth_cache():
+    return caches[getattr(settings, 'AUTH_CACHE_ALIAS', 'default')]
+
+
+def auth_cache_timeout():
+    return getattr(settings, 'AUTH_CACHE_TIMEOUT', 300)
+
+
+def token_cache_key(key):
+    return f'auth:token:{key}'
+
+
+def user_token_cache_key(user_id):
+    return f'auth:user-token:{user_id}'
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def token_expired(token):
+    expiry = getattr(settings, 'TOKEN_EXPIRY_SECONDS', None)
+    return expiry is not None and token.created + timedelta(seconds=expiry) <= timezone.now()
+
+
+def invalidate_token(key):
+    get_auth_cache().delete(token_cache_key(key))
+
+
+def invalidate_user(user_id):
+    cache = get_auth_cache()
+    keys = [user_cache_key(user_id), user_token_cache_key(user_id)]
+    token_key = cache.get(user_token_cache_key(user_id))
+    if token_key:
+        keys.append(token_cache_key(token_key))
+    cache.delete_many(keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps the token and its user (role, is_active)
+    in the cache for AUTH_CACHE_TIMEOUT seconds, so warm requests skip the
+    token -> user query. Entries are dropped once a deletion of the token, or
+    a save or deletion of the user, commits. Tokens older than
+    TOKEN_EXPIRY_SECONDS are refused when that setting is not None.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_auth_cache()
+        token = cache.get(token_cache_key(key))
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            timeout = auth_cache_timeout()
+            cache.set_many({
+                token_cache_key(key): token,
+                user_token_cache_key(token.user_id): key,
+            }, timeout)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        if token_expired(token):
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        return (token.user, token)
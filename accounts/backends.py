@@ -0,0 +1,21 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .authentication import auth_cache_timeout, get_auth_cache, user_cache_key
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose session lookups (get_user) are served from the cache.
+    Paired with the cached_db session engine, a warm session-authenticated
+    request needs no queries to resolve request.user.
+    """
+
+    def get_user(self, user_id):
+        cache = get_auth_cache()
+        user = cache.get(user_cache_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(user_cache_key(user_id), user, auth_cache_timeout())
+        return user if self.user_can_authenticate(user) else None
@@ -48,5 +48,12 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'role']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_id'),
+            # The user list's role filter; see check_query_plans.
+            models.Index(fields=['role', 'date_joined', 'id'], name='user_role_date_joined_id'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} <{self.email}>"
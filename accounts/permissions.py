@@ -7,7 +7,7 @@ class IsAdmin(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        return request.user and request.user.role == 'admin' and request.user.is_authenticated
+        return request.user and request.user.is_authenticated and request.user.role == 'admin'
 
 
 class IsCustodianOrAdmin(permissions.BasePermission):
@@ -26,7 +26,7 @@ class IsCustodian(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        return request.user and request.user.role == 'custodian' and request.user.is_authenticated
+        return request.user and request.user.is_authenticated and request.user.role == 'custodian'
 
 
 class IsStudent(permissions.BasePermission):
@@ -35,4 +35,4 @@ class IsStudent(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        return request.user and request.user.role == 'student' and request.user.is_authenticated
+        return request.user and request.user.is_authenticated and request.user.role == 'student'
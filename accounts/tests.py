@@ -1,3 +1,133 @@
-from django.test import TestCase
+from datetime import timedelta
+from itertools import count
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase
+
+from hostel_booking_system.testing import QueryBudgetMixin, walk_cursor_pages
+from .authentication import CachedTokenAuthentication
+from .backends import CachedModelBackend
+from .models import CustomUser
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.numbers = count()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pass12345!', role='admin',
+            first_name='Ad', last_name='Min', username='admin')
+        self.client.force_authenticate(self.admin)
+
+    def make_user(self):
+        number = next(self.numbers)
+        return CustomUser.objects.create(
+            email=f'user{number}@example.com', username=f'user{number}', role='student',
+            first_name='User', last_name=str(number))
+
+    def test_user_list(self):
+        self.assertQueryBudget(reverse('users-list'), self.make_user, budget=2)
+
+    def test_user_detail(self):
+        user = self.make_user()
+        self.assertLessEqual(self.count_queries(reverse('users-detail', args=[user.pk])), 1)
+
+    def test_cursor_pages_by_nullable_username(self):
+        for number in range(7):
+            user = self.make_user()
+            if number % 3 == 0:
+                CustomUser.objects.filter(pk=user.pk).update(username=None)
+        url = reverse('users-list')
+        for ordering in ('username', '-username', '-date_joined'):
+            with self.subTest(ordering=ordering):
+                expected = [row['id'] for row in self.client.get(
+                    url, {'ordering': ordering, 'page_size': 100}).data['results']]
+                forward, backward = walk_cursor_pages(
+                    self.client, url, {'ordering': ordering, 'page_size': 2})
+                self.assertEqual(sorted(forward), sorted(expected))
+                self.assertEqual(len(forward), len(set(forward)))
+                self.assertEqual(backward, forward)
+
+    def test_sparse_fieldset_reads_only_those_columns(self):
+        self.make_user()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('users-list'), {'fields': 'id,email'})
+        self.assertEqual([list(row) for row in response.data['results']], [['id', 'email']] * 2)
+        self.assertNotIn('first_name', ctx.captured_queries[-1]['sql'])
+        self.assertNotIn('password', ctx.captured_queries[-1]['sql'])
+
+    def test_cursor_mode_skips_count(self):
+        self.assertQueryBudget(reverse('users-list'), self.make_user, budget=1,
+                               params={'pagination': 'cursor'})
+
+
+class CachedAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_warm_token_lookup_issues_no_queries(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user.pk, user.role, token.key), (self.user.pk, 'custodian', self.token.key))
+
+    def test_deactivating_user_invalidates_cache(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_rolled_back_change_keeps_the_cache(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.user.save()
+                raise RuntimeError
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deleting_token_invalidates_cache(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_expired_token_is_refused_and_renewed(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=2))
+        with self.settings(TOKEN_EXPIRY_SECONDS=3600):
+            with self.assertRaises(AuthenticationFailed):
+                self.auth.authenticate_credentials(self.token.key)
+            response = self.client.post('/api/api-token-auth/', {
+                'username': 'custodian@example.com', 'password': 'pass12345!'})
+            self.assertNotEqual(response.data['token'], self.token.key)
+            self.auth.authenticate_credentials(response.data['token'])
+
+    def test_token_header_end_to_end(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(self.client.get(reverse('users-list')).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            Token.objects.all().delete()
+        self.assertEqual(self.client.get(reverse('users-list')).status_code, 401)
+
+    def test_warm_session_user_lookup_issues_no_queries(self):
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.get_user(self.user.pk), self.user)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNone(backend.get_user(self.user.pk))
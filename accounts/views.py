@@ -3,10 +3,17 @@ from django.contrib import messages
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.decorators import login_required
 from rest_framework import viewsets, permissions
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from .authentication import token_expired
 from .forms import CustomUserCreationForm, CustomUserChangeForm
 from .models import CustomUser
 from .serializers import CustomUserSerializers
 from .permissions import IsStudent, IsCustodian, IsAdmin, IsCustodianOrAdmin
+from hostel_booking_system.db_routing import ReplicaReadMixin
+from hostel_booking_system.fieldsets import SparseFieldsetMixin
+from hostel_booking_system.pagination import HybridPagination
 
 # Create your views here.
 
@@ -36,10 +43,28 @@ def profile(request):
     return render(request, 'accounts/profile.html', {'user': request.user})
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class ObtainExpiringAuthToken(ObtainAuthToken):
+    """
+    Same as DRF's obtain_auth_token, but replaces a token that has passed
+    TOKEN_EXPIRY_SECONDS instead of handing it back.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
+        return Response({'token': token.key})
+
+
+class UserViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = CustomUser.objects.all().order_by("-date_joined")
     serializer_class = CustomUserSerializers
     permission_classes = [permissions.IsAuthenticated & IsCustodianOrAdmin]
+    pagination_class = HybridPagination
     filterset_fields = ['role', 'username']
     search_fields = ['username', 'first_name', 'last_name', 'email']
     ordering_fields = ['date_joined', 'username']
@@ -0,0 +1,12 @@
+from rest_framework.test import APIClient
+
+
+def api_client(user=None, raise_request_exception=True):
+    """
+    An in-process API client for benchmark commands. Run it under
+    override_settings(ALLOWED_HOSTS=['*']) when DEBUG is off.
+    """
+    client = APIClient(HTTP_HOST='localhost', raise_request_exception=raise_request_exception)
+    if user is not None:
+        client.force_authenticate(user)
+    return client
@@ -0,0 +1,255 @@
+import math
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.mixins import ListModelMixin
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostels.models import Hostel, Rooms
+from hostel_booking_system.pagination import HybridPagination
+from benchmarks.client import api_client
+
+ROLES = ('anonymous', 'student', 'custodian', 'admin')
+EXCLUDED_PREFIXES = ('admin/',)
+TOKEN_PASSWORD = 'bench-pass-123'
+
+# Query parameters a route needs before it will answer, or to keep its response realistic.
+REQUIRED_PARAMS = {
+    'room-availability': {'check_in': '2023-01-01', 'check_out': '2023-05-01'},
+    # One term's approved bookings, the typical finance pull.
+    'booking-export': {'status': 'approved', 'check_in_after': '2023-01-01', 'check_in_before': '2023-06-30'},
+}
+
+# Models behind list views that only define get_queryset().
+VIEW_MODELS = {
+    'bookings-list-create': Booking,
+    'async-student-bookings': Booking,
+    'room-availability': Rooms,
+}
+
+
+def discover_routes():
+    """
+    Every URL pattern outside the Django admin, as (path template, URL name,
+    view class, allowed methods, is list view) tuples. Format-suffix
+    duplicates from the DRF router are dropped.
+    """
+    routes = []
+
+    def walk(patterns, prefix, namespace):
+        for pattern in patterns:
+            template = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                if not template.startswith(EXCLUDED_PREFIXES):
+                    walk(pattern.url_patterns, template, pattern.namespace or namespace)
+                continue
+            if 'format' in pattern.pattern.regex.groupindex:
+                continue
+            callback = pattern.callback
+            view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+            actions = getattr(callback, 'actions', None)
+            if actions:
+                methods, is_list = set(actions), actions.get('get') == 'list'
+            elif isinstance(view, type):
+                methods = {method for method in view.http_method_names if hasattr(view, method)} - {'options'}
+                is_list = issubclass(view, ListModelMixin)
+            else:
+                methods, is_list = {'get', 'post'}, False
+            name = pattern.name and (f'{namespace}:{pattern.name}' if namespace else pattern.name)
+            routes.append((template, name, view, methods, is_list))
+
+    walk(get_resolver().url_patterns, '', None)
+    return routes
+
+
+def route_key(template, name):
+    return name or re.sub(r'\W+', '-', template).strip('-')
+
+
+class Scenario:
+    def __init__(self, role, route, variant, method, path, params=None, data=None, format='json'):
+        self.role = role
+        self.route = route
+        self.variant = variant
+        self.method = method
+        self.path = path
+        self.params = params or {}
+        self.data = data
+        self.format = format
+        self.write = method != 'get'
+
+    @property
+    def key(self):
+        return f'{self.role} {self.method.upper()} {self.route}:{self.variant}'
+
+
+class Planner:
+    """
+    Builds the scenarios for every discovered route and role from the data
+    that is in the database: detail pages use real primary keys, filters use
+    real values, search uses a word taken from a real row and deep pages are
+    computed from the actual row counts.
+    """
+
+    def __init__(self, cursor_hops=10):
+        self.cursor_hops = cursor_hops
+        self.users = self.pick_users()
+        self.clients = {role: self.client_for(role) for role in ROLES}
+        self.scenarios = []
+        self.uncovered = []
+
+    def pick_users(self):
+        admin = CustomUser.objects.filter(role='admin').order_by('pk').first()
+        if admin is None:
+            admin = CustomUser.objects.create(email='bench-runner-admin@example.com', role='admin',
+                                              username='bench-runner-admin', first_name='Bench', last_name='Admin')
+        custodian = CustomUser.objects.filter(role='custodian', hostels__isnull=False).order_by('pk').first()
+        student_id = Booking.objects.order_by('created_at', 'pk').values_list('student_id', flat=True).first()
+        student = CustomUser.objects.filter(pk=student_id).first()
+        if custodian is None or student is None:
+            raise ValueError('The database needs at least one hostel with a custodian and one booking.')
+        # Set before any session exists, since changing it logs sessions out.
+        student.set_password(TOKEN_PASSWORD)
+        student.save(update_fields=['password'])
+        return {'admin': admin, 'custodian': custodian, 'student': student}
+
+    def client_for(self, role):
+        client = api_client(raise_request_exception=False)
+        user = self.users.get(role)
+        if user is not None:
+            # Real token authentication, plus a session for the HTML pages.
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            client.force_login(user)
+        return client
+
+    def add(self, *args, **kwargs):
+        scenario = Scenario(*args, **kwargs)
+        self.scenarios.append(scenario)
+        return scenario
+
+    def plan(self):
+        routes = [(route_key(template, name), template, name, view, methods, is_list)
+                  for template, name, view, methods, is_list in discover_routes()]
+        for key, template, name, view, methods, is_list in routes:
+            if 'get' in methods:
+                self.plan_reads(key, template, name, view, is_list)
+        self.plan_writes()
+        covered = {scenario.route for scenario in self.scenarios}
+        self.uncovered = [key for key, *_ in routes if key not in covered]
+        return self.scenarios
+
+    def detail_pk(self, model, role):
+        if model is Booking and role == 'student':
+            return Booking.objects.filter(student_id=self.users['student']).values_list('pk', flat=True).first()
+        if model is CustomUser:
+            return self.users.get(role, self.users['student']).pk
+        if model is Hostel and role == 'custodian':
+            return self.users['custodian'].hostels.values_list('pk', flat=True).first()
+        return model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+
+    def plan_reads(self, key, template, name, view, is_list):
+        queryset = getattr(view, 'queryset', None)
+        model = queryset.model if queryset is not None else VIEW_MODELS.get(name)
+        if '<' in template:
+            if model is not None:
+                for role in ROLES:
+                    pk = self.detail_pk(model, role)
+                    # Tables that are empty until a command fills them, like the booking archive.
+                    if pk is not None:
+                        self.add(role, key, 'detail', 'get', reverse(name, kwargs={'pk': pk}))
+            return
+        path = reverse(name) if name else '/' + template
+        base = dict(REQUIRED_PARAMS.get(name, {}))
+        for role in ROLES:
+            if is_list and model is not None:
+                self.plan_list(role, key, path, view, model, base)
+            else:
+                self.add(role, key, 'get', 'get', path, base)
+
+    def plan_list(self, role, key, path, view, model, base):
+        self.add(role, key, 'list', 'get', path, base)
+        if role == 'anonymous':
+            return
+        rows = model._default_manager.order_by('pk')
+        for field in getattr(view, 'filterset_fields', None) or []:
+            value = rows.values_list(field, flat=True).first()
+            if value is not None:
+                value = str(value).lower() if isinstance(value, bool) else str(value)
+                self.add(role, key, f'filter_{field}', 'get', path, {**base, field: value})
+        search_fields = getattr(view, 'search_fields', None) or []
+        if search_fields:
+            total = rows.count()
+            text = rows.values_list(search_fields[0], flat=True)[total // 2] if total else ''
+            words = re.findall(r'\w+', str(text))
+            if words:
+                self.add(role, key, 'search', 'get', path, {**base, 'search': max(words, key=len)})
+        for field in getattr(view, 'ordering_fields', None) or []:
+            self.add(role, key, f'ordering_-{field}', 'get', path, {**base, 'ordering': f'-{field}'})
+
+        first = self.clients[role].get(path, base)
+        count = first.data.get('count') if first.status_code == 200 and isinstance(first.data, dict) else None
+        if count:
+            page_size = len(first.data['results']) or 1
+            last = math.ceil(count / page_size)
+            if last > 1:
+                self.add(role, key, 'deep_page', 'get', path, {**base, 'page': last})
+        if getattr(view, 'pagination_class', None) is HybridPagination and first.status_code == 200:
+            self.add(role, key, 'cursor_first', 'get', path, {**base, 'pagination': 'cursor'})
+            response = self.clients[role].get(path, {**base, 'pagination': 'cursor'})
+            url = None
+            for _ in range(self.cursor_hops):
+                url = response.data.get('next') if response.status_code == 200 else None
+                if not url:
+                    break
+                response = self.clients[role].get(url)
+            if url:
+                self.add(role, key, f'cursor_after_{self.cursor_hops}_pages', 'get', url)
+
+    def plan_writes(self):
+        """One representative write per mutating endpoint, each rolled back after every call."""
+        student, custodian = self.users['student'], self.users['custodian']
+        hostel = custodian.hostels.order_by('pk').first()
+        room = Rooms.objects.filter(hostel=hostel).order_by('pk').first()
+        free_room = Rooms.objects.exclude(bookings__student_id=student).order_by('pk').first()
+        pending = list(Booking.objects.filter(status='pending').order_by('created_at', 'pk')[:50])
+        approvable = next((booking for booking in pending if not Booking.objects.approved().overlapping(
+            booking.check_in_date, booking.check_out_date).filter(room_id=booking.room_id_id).exists()), None)
+        far = date.today() + timedelta(days=3650)
+
+        self.add('anonymous', 'api-api-token-auth', 'obtain_token', 'post', '/api/api-token-auth/',
+                 data={'username': student.email, 'password': TOKEN_PASSWORD})
+        if free_room is not None:
+            self.add('student', 'bookings-list-create', 'create', 'post', reverse('bookings-list-create'), data={
+                'room_id': str(free_room.pk), 'check_in_date': far.isoformat(),
+                'check_out_date': (far + timedelta(days=120)).isoformat()})
+        if approvable is not None:
+            self.add('custodian', 'booking-detail', 'approve', 'patch',
+                     reverse('booking-detail', kwargs={'pk': approvable.pk}), data={'status': 'approved'})
+        if pending:
+            self.add('custodian', 'booking-decisions', 'approve_50', 'post', reverse('booking-decisions'),
+                     data={'ids': [str(booking.pk) for booking in pending], 'status': 'approved'})
+        self.add('admin', 'booking-allocate', 'dry_run', 'post', reverse('booking-allocate'),
+                 data={'dry_run': True})
+        self.add('admin', 'hostel-list-create', 'create', 'post', reverse('hostel-list-create'), data={
+            'name': 'Bench Hostel', 'location': 'Bench', 'capacity': 10, 'custodian_id': custodian.pk})
+        self.add('custodian', 'room-bulk', 'create_50', 'post', reverse('room-bulk'), data=[
+            {'hostel': str(hostel.pk), 'room_number': f'B{number}', 'price_per_semester': '500.00'}
+            for number in range(50)])
+        rows = '\n'.join(f'{hostel.pk},I{number},double,650.00,true' for number in range(200))
+        self.add('admin', 'room-import', 'csv_200', 'post', reverse('room-import'), format='multipart', data=lambda: {
+            'file': SimpleUploadedFile('rooms.csv', (
+                'hostel,room_number,room_type,price_per_semester,is_available\n' + rows).encode())})
+        self.add('admin', 'hostel-import', 'csv_20', 'post', reverse('hostel-import'), format='multipart',
+                 data=lambda: {'file': SimpleUploadedFile('hostels.csv', (
+                     'name,location,capacity,custodian_email\n' + '\n'.join(
+                         f'Imported Hostel {number},Bench,40,{custodian.email}' for number in range(20))).encode())})
+        if room is not None:
+            self.add('custodian', 'room-retrieve-update-destroy', 'update_price', 'patch',
+                     reverse('room-retrieve-update-destroy', kwargs={'pk': room.pk}),
+                     data={'price_per_semester': str(room.price_per_semester + Decimal('1'))})
@@ -0,0 +1,77 @@
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bookings.allocation import Allocator, allocate_rooms
+from benchmarks.seeding import ROOM_TYPES, rolled_back, seed_dataset
+
+
+class Command(BaseCommand):
+    help = ('Time the batch allocator: the in-memory matcher on synthetic requests, then a full '
+            'allocate_rooms() run (load, match, bulk write) against a seeded database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50000)
+        parser.add_argument('--rooms', type=int, default=5000)
+        parser.add_argument('--hostels', type=int, default=10)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-db', action='store_true', help='Only time the in-memory matcher.')
+
+    def matcher(self, options):
+        rng = random.Random(options['seed'])
+        hostels = [uuid.UUID(int=n) for n in range(options['hostels'])]
+        rooms = [(uuid.UUID(int=(1 << 64) + n), rng.choice(hostels), rng.choice(ROOM_TYPES), rng.random() < 0.9)
+                 for n in range(options['rooms'])]
+        room_ids = [room[0] for room in rooms]
+        # Most requests follow the semester calendar; the rest are arbitrary stays.
+        semesters = [(date(2025 + year, month, 1), date(2025 + year, month + 4, 1))
+                     for year in range(2) for month in (1, 8)]
+        requests = []
+        for n in range(options['requests']):
+            if rng.random() < 0.8:
+                check_in, check_out = rng.choice(semesters)
+            else:
+                check_in = date(2025, 1, 1) + timedelta(days=rng.randrange(730))
+                check_out = check_in + timedelta(days=rng.randrange(30, 180))
+            requests.append((n, rng.randrange(options['students']), rng.choice(room_ids), check_in, check_out))
+
+        started = time.perf_counter()
+        allocator = Allocator(rooms)
+        decisions = list(allocator.allocate(requests))
+        elapsed = time.perf_counter() - started
+        placed = [room_id for _, room_id in decisions if room_id is not None]
+        return {
+            'requests': len(requests),
+            'rooms': len(rooms),
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(len(requests) / elapsed),
+            'approved': len(placed),
+            'reassigned': sum(room_id != request[2] for (_, room_id), request in zip(decisions, requests)
+                              if room_id is not None),
+            'rejected': len(decisions) - len(placed),
+        }
+
+    def end_to_end(self, options):
+        with rolled_back():
+            started = time.perf_counter()
+            seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms'] // options['hostels'],
+                         students=options['students'], bookings=options['requests'], seed=options['seed'])
+            seeded = time.perf_counter() - started
+            with CaptureQueriesContext(connection) as ctx:
+                summary = allocate_rooms()
+            summary['queries'] = len(ctx.captured_queries)
+            summary['seed_seconds'] = round(seeded, 3)
+        return summary
+
+    def handle(self, *args, **options):
+        results = {'matcher': self.matcher(options)}
+        if not options['skip_db']:
+            results['end_to_end'] = self.end_to_end(options)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,96 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from bookings.archive import archive_bookings, archive_cutoff
+from bookings.models import ArchivedBooking, Booking
+from bookings.rollups import rebuild_rollups
+from hostels.models import Rooms
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = ('Seed several years of booking history, time the hot booking and availability endpoints, '
+            'archive everything older than --keep-semesters and time them again (rolled back afterwards).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=100)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=120000)
+        parser.add_argument('--years', type=int, default=6)
+        parser.add_argument('--keep-semesters', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False, CATALOG_CACHE_ENABLED=False), \
+                rolled_back():
+            seeded = seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                                  students=options['students'], bookings=options['bookings'],
+                                  start=date(today.year - options['years'], 1, 1), years=options['years'],
+                                  seed=options['seed'], admins=1)
+            # Requests nobody decided on before the stay started were turned down.
+            Booking.objects.filter(status='pending', check_in_date__lt=today).update(status='rejected')
+            rebuild_rollups()
+            scenarios = self.scenarios(seeded, today)
+
+            results['before'] = self.run(scenarios, options['repeat'])
+            cutoff = archive_cutoff(options['keep_semesters'], today)
+            started = time.perf_counter()
+            summary = archive_bookings(cutoff, batch_size=options['batch_size'])
+            seconds = time.perf_counter() - started
+            results['archive'] = {**summary, 'seconds': round(seconds, 3),
+                                  'rows_per_second': round(summary['archived'] / seconds) if seconds else None}
+            results['after'] = self.run(scenarios, options['repeat'])
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def scenarios(self, seeded, today):
+        admin = CustomUser.objects.get(email='bench-admin0@example.com')
+        custodian = CustomUser.objects.filter(role='custodian', email__startswith='bench-').order_by('pk').first()
+        # The student with the most recent stay still has bookings after archiving.
+        student = Booking.objects.order_by('-check_out_date').values_list('student_id', flat=True).first()
+        student = CustomUser.objects.get(pk=student)
+        room = Rooms.objects.filter(hostel_id=seeded['hostel_ids'][0]).exclude(
+            bookings__student_id=student).order_by('pk').first()
+        admin_client, custodian_client, student_client = (
+            api_client(admin), api_client(custodian), api_client(student))
+        bookings_url = reverse('bookings-list-create')
+        check_in = today + timedelta(days=30)
+        stay = {'check_in': check_in.isoformat(), 'check_out': (check_in + timedelta(days=120)).isoformat()}
+
+        def create():
+            with transaction.atomic():
+                student_client.post(bookings_url, {
+                    'room_id': str(room.pk), 'check_in_date': stay['check_in'],
+                    'check_out_date': stay['check_out']})
+                transaction.set_rollback(True)
+
+        return {
+            'admin_booking_list': lambda: admin_client.get(bookings_url),
+            'admin_approved_by_check_in': lambda: admin_client.get(
+                bookings_url, {'status': 'approved', 'ordering': 'check_in_date'}),
+            'custodian_pending_list': lambda: custodian_client.get(bookings_url, {'status': 'pending'}),
+            'student_booking_list': lambda: student_client.get(bookings_url),
+            'room_availability': lambda: student_client.get(reverse('room-availability'), stay),
+            'booking_create': create,
+        }
+
+    def run(self, scenarios, repeat):
+        results = {'tables': {'bookings': Booking.objects.count(),
+                              'archived_bookings': ArchivedBooking.objects.count()}}
+        for name, func in scenarios.items():
+            results[name] = measure(func, repeat)
+        return results
@@ -0,0 +1,213 @@
+import asyncio
+import io
+import json
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from bookings.rollups import rebuild_rollups
+from hostels.models import Hostel, Rooms
+from benchmarks.seeding import seed_dataset
+from benchmarks.timing import percentile
+
+MODES = ('wsgi', 'asgi_sync', 'asgi_async')
+
+
+def wsgi_request(handler, path, query, token, method='GET', body=b'', response_headers=None):
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'HTTP_AUTHORIZATION': f'Token {token}',
+        'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    status = []
+
+    def start_response(code, headers, exc_info=None):
+        status.append(code)
+        if response_headers is not None:
+            response_headers.update(headers)
+
+    response = handler(environ, start_response)
+    try:
+        size = sum(map(len, response))
+    finally:
+        response.close()
+    return int(status[0].split()[0]), size
+
+
+async def asgi_request(handler, path, query, token):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query.encode(),
+        'headers': [(b'host', b'localhost'), (b'authorization', f'Token {token}'.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    done = asyncio.Event()
+    received = False
+    status, size = None, 0
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django listens for a disconnect while the view runs.
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status, size
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+            if not message.get('more_body'):
+                done.set()
+
+    await handler(scope, receive, send)
+    done.set()
+    return status, size
+
+
+class Command(BaseCommand):
+    help = ('Load the read-heavy endpoints (hostel list, room list and detail, a student\'s bookings) '
+            'at high concurrency three ways: the sync views through the WSGI handler on a thread pool, '
+            'the sync views through the ASGI handler, and the async views through the ASGI handler. '
+            'Seeded rows are committed, because the workers use their own connections, and removed '
+            'afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64,
+                            help='Requests in flight at once (threads for WSGI, tasks for ASGI).')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and mode.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=100)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--mode', action='append', choices=MODES, default=[],
+                            help='Only run this mode; repeatable.')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the catalog list cache.')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows for inspection.')
+        parser.add_argument('--output', help='Write the JSON report to this file as well.')
+
+    def handle(self, *args, **options):
+        prefix = f'asgi-{uuid.uuid4().hex[:8]}'
+        dataset = seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                               students=options['students'], bookings=options['bookings'],
+                               seed=options['seed'], prefix=prefix)
+        hostel_ids = dataset.pop('hostel_ids')
+        rebuild_rollups(hostel_ids=hostel_ids)
+        overrides = {'ALLOWED_HOSTS': ['*'], 'DEBUG': False, 'THROTTLE_ENABLED': False}
+        if options['no_cache']:
+            overrides['CATALOG_CACHE_ENABLED'] = False
+        try:
+            with override_settings(**overrides):
+                endpoints = self.endpoints(prefix, hostel_ids)
+                results = {}
+                for mode in options['mode'] or MODES:
+                    results[mode] = {name: self.run(mode, endpoint, options)
+                                     for name, endpoint in endpoints.items()}
+        finally:
+            connections.close_all()
+            if not options['keep']:
+                Hostel.objects.filter(pk__in=hostel_ids).delete()
+                CustomUser.objects.filter(email__startswith=f'{prefix}-').delete()
+
+        report = {
+            'meta': {
+                'database': connections['default'].vendor,
+                'catalog_cache': not options['no_cache'] and settings.CATALOG_CACHE_ENABLED,
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+            },
+            'dataset': dataset,
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+        failed = [f'{mode} {name}' for mode, endpoints in results.items()
+                  for name, result in endpoints.items() if set(result['status']) != {'200'}]
+        if failed:
+            raise CommandError(f'Some requests did not return 200: {", ".join(failed)}.')
+
+    def endpoints(self, prefix, hostel_ids):
+        """(sync path, async path, query string, token) per endpoint, for the role that reads it."""
+        custodian = CustomUser.objects.filter(email=f'{prefix}-custodian0@example.com').get()
+        student_id = (Booking.objects.filter(room_id__hostel__in=hostel_ids).order_by('created_at', 'pk')
+                      .values_list('student_id', flat=True).first())
+        student = CustomUser.objects.get(pk=student_id)
+        room = Rooms.objects.filter(hostel__in=hostel_ids).order_by('pk').first()
+        tokens = {user.pk: Token.objects.get_or_create(user=user)[0].key for user in (custodian, student)}
+        return {
+            'hostel_list': (reverse('hostel-list-create'), reverse('async-hostel-list'), '', tokens[student.pk]),
+            'room_list': (reverse('room-list-create'), reverse('async-room-list'),
+                          urlencode({'pagination': 'cursor', 'page_size': 50}), tokens[student.pk]),
+            'room_detail': (reverse('room-retrieve-update-destroy', kwargs={'pk': room.pk}),
+                            reverse('async-room-detail', kwargs={'pk': room.pk}), '', tokens[custodian.pk]),
+            'student_bookings': (reverse('bookings-list-create'), reverse('async-student-bookings'),
+                                 '', tokens[student.pk]),
+        }
+
+    def run(self, mode, endpoint, options):
+        sync_path, async_path, query, token = endpoint
+        path = async_path if mode == 'asgi_async' else sync_path
+        self.drive(mode, path, query, token, options['warmup'], options['concurrency'])
+        started = time.perf_counter()
+        samples = self.drive(mode, path, query, token, options['requests'], options['concurrency'])
+        wall = time.perf_counter() - started
+        latencies = [elapsed for elapsed, _, _ in samples]
+        return {
+            'path': path,
+            'requests_per_second': round(len(samples) / wall, 1),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'status': dict(Counter(str(status) for _, status, _ in samples)),
+            'bytes': max(size for _, _, size in samples),
+        }
+
+    def drive(self, mode, path, query, token, total, concurrency):
+        if mode == 'wsgi':
+            # Django closes each thread's connection when its request finishes.
+            handler = WSGIHandler()
+            with ThreadPoolExecutor(concurrency) as pool:
+                return list(pool.map(lambda _: self.timed(wsgi_request, handler, path, query, token),
+                                     range(total)))
+        return asyncio.run(self.drive_asgi(ASGIHandler(), path, query, token, total, concurrency))
+
+    @staticmethod
+    def timed(request, *args):
+        started = time.perf_counter()
+        status, size = request(*args)
+        return (time.perf_counter() - started) * 1000, status, size
+
+    async def drive_asgi(self, handler, path, query, token, total, concurrency):
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with limit:
+                started = time.perf_counter()
+                status, size = await asgi_request(handler, path, query, token)
+                return (time.perf_counter() - started) * 1000, status, size
+
+        return await asyncio.gather(*(one() for _ in range(total)))
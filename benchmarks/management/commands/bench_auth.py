@@ -0,0 +1,54 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from accounts.authentication import CachedTokenAuthentication
+from accounts.backends import CachedModelBackend
+from accounts.models import CustomUser
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request authentication queries and latency with and without the auth cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False), rolled_back():
+            user = CustomUser.objects.create_user(
+                email='bench-auth@example.com', password=None, role='custodian',
+                first_name='Bench', last_name='Auth', username='bench-auth')
+            token = Token.objects.create(user=user)
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+            cache.clear()
+
+            def cold_token():
+                cache.clear()
+                CachedTokenAuthentication().authenticate(request)
+
+            results = {
+                'token_uncached': measure(lambda: TokenAuthentication().authenticate(request), repeat),
+                'token_cached_cold': measure(cold_token, repeat),
+                'token_cached_warm': measure(lambda: CachedTokenAuthentication().authenticate(request), repeat),
+                'session_user_uncached': measure(
+                    lambda: CustomUser._default_manager.get(pk=user.pk), repeat),
+                'session_user_cached_warm': measure(lambda: CachedModelBackend().get_user(user.pk), repeat),
+            }
+
+            client = api_client()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            url = reverse('hostel-list-create')
+            # The hostel list is served from the catalog cache once warm, so
+            # any remaining queries on this request are authentication's.
+            results['hostel_list_request_warm'] = measure(lambda: client.get(url), repeat)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,61 @@
+import json
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from bookings.availability import RoomIntervalIndex, available_rooms
+from hostels.models import Rooms
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = 'Benchmark date-range room availability against a seeded dataset (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=250)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            seeded = seed_dataset(hostels=options['hostels'],
+                                  rooms_per_hostel=options['rooms_per_hostel'],
+                                  students=options['students'],
+                                  bookings=options['bookings'],
+                                  seed=options['seed'])
+            rng = random.Random(options['seed'])
+            hostel_id = seeded['hostel_ids'][0]
+            rooms = Rooms.objects.filter(is_available=True)
+
+            def window():
+                check_in = date(2022, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+                return check_in, check_in + timedelta(days=120)
+
+            def all_hostels():
+                check_in, check_out = window()
+                list(available_rooms(rooms, check_in, check_out).values_list('pk', flat=True))
+
+            def one_hostel():
+                check_in, check_out = window()
+                list(available_rooms(rooms.filter(hostel_id=hostel_id), check_in, check_out)
+                     .values_list('pk', flat=True))
+
+            index = RoomIntervalIndex.build(hostel_id)
+
+            def one_hostel_index():
+                check_in, check_out = window()
+                index.free_room_ids(check_in, check_out)
+
+            results = {
+                'dataset': {key: value for key, value in seeded.items() if key != 'hostel_ids'},
+                'db_all_hostels': measure(all_hostels, options['repeat']),
+                'db_one_hostel': measure(one_hostel, options['repeat']),
+                'index_build': measure(lambda: RoomIntervalIndex.build(hostel_id), options['repeat']),
+                'index_one_hostel': measure(one_hostel_index, options['repeat']),
+            }
+        self.stdout.write(json.dumps(results, indent=2))
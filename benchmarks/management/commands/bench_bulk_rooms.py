@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from hostels.models import Hostel
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back
+
+
+class Command(BaseCommand):
+    help = 'Time creating N rooms through one bulk request versus N single POSTs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['rooms']
+        results = {'rooms': count}
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False), rolled_back():
+            custodian = CustomUser.objects.create_user(
+                email='bench-custodian@example.com', password=None, role='custodian',
+                first_name='Bench', last_name='Custodian', username='bench-custodian')
+            single_hostel, bulk_hostel = [
+                Hostel.objects.create(name=name, location='Bench', capacity=count, custodian_id=custodian)
+                for name in ('Single', 'Bulk')]
+            client = api_client(custodian)
+
+            def payload(hostel):
+                return [{'hostel': str(hostel.pk), 'room_number': str(number),
+                         'price_per_semester': '500.00', 'room_type': 'single'}
+                        for number in range(count)]
+
+            url = reverse('room-list-create')
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for item in payload(single_hostel):
+                    client.post(url, item, format='json')
+                results['single_posts'] = {'seconds': round(time.perf_counter() - started, 3),
+                                           'queries': len(ctx.captured_queries)}
+
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.post(reverse('room-bulk'), payload(bulk_hostel), format='json')
+                results['bulk_post'] = {'seconds': round(time.perf_counter() - started, 3),
+                                        'queries': len(ctx.captured_queries),
+                                        'status': response.status_code}
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,51 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Time approving N bookings one PATCH at a time versus one bulk decision request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--decisions', type=int, default=1000)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        count = options['decisions']
+        results = {'decisions': count}
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False), rolled_back():
+            seed_dataset(hostels=10, rooms_per_hostel=200, students=5000,
+                         bookings=options['bookings'], seed=options['seed'])
+            custodian = CustomUser.objects.filter(role='custodian').first()
+            client = api_client(custodian)
+            pending = list(Booking.objects.filter(status='pending').order_by('created_at')
+                           .values_list('pk', flat=True)[:count * 2])
+            single, bulk = pending[:count], pending[count:]
+
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for pk in single:
+                    client.patch(reverse('booking-detail', args=[pk]), {'status': 'approved'}, format='json')
+                results['single_patches'] = {'seconds': round(time.perf_counter() - started, 3),
+                                             'queries': len(ctx.captured_queries)}
+
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.post(reverse('booking-decisions'),
+                                       {'ids': [str(pk) for pk in bulk], 'status': 'approved'}, format='json')
+                results['bulk_decision'] = {'seconds': round(time.perf_counter() - started, 3),
+                                            'queries': len(ctx.captured_queries),
+                                            'updated': len(response.data['updated']),
+                                            'conflicts': len(response.data['conflicts']),
+                                            'auto_rejected': response.data['auto_rejected']}
+        self.stdout.write(json.dumps(results, indent=2))
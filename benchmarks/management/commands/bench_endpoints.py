@@ -0,0 +1,165 @@
+import json
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from bookings.rollups import rebuild_rollups
+from hostels.models import Hostel, Rooms
+from search.index import registered_indexes
+from benchmarks.endpoints import Planner
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def send(client, scenario):
+    if scenario.write:
+        # Every call starts from the same state.
+        with transaction.atomic():
+            data = scenario.data() if callable(scenario.data) else scenario.data
+            response = getattr(client, scenario.method)(scenario.path, data, format=scenario.format)
+            transaction.set_rollback(True)
+        return response
+    return client.get(scenario.path, scenario.params)
+
+
+class Command(BaseCommand):
+    help = ('Drive every API and page route as each role (anonymous, student, custodian, admin) with '
+            'filters, search, ordering, deep pages and representative writes, and report latency '
+            'percentiles, query counts and peak memory as JSON that can be compared across commits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=100)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--existing', action='store_true',
+                            help='Benchmark the rows already in the database (e.g. from seed_data) '
+                                 'instead of seeding a rolled-back dataset.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--no-cache', action='store_true', help='Disable the catalog list cache.')
+        parser.add_argument('--route', action='append', default=[],
+                            help='Only run scenarios for this route (URL name); repeatable.')
+        parser.add_argument('--output', help='Write the JSON report to this file as well.')
+        parser.add_argument('--baseline', help='A previous report to compare against.')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Relative p50 slowdown that counts as a regression (default 0.25).')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        overrides = {'ALLOWED_HOSTS': ['*'], 'THROTTLE_ENABLED': False}
+        if options['no_cache']:
+            overrides['CATALOG_CACHE_ENABLED'] = False
+        with override_settings(**overrides), rolled_back():
+            dataset = self.prepare(options)
+            planner = Planner()
+            scenarios = planner.plan()
+            if options['route']:
+                scenarios = [scenario for scenario in scenarios if scenario.route in options['route']]
+            results = {}
+            for scenario in sorted(scenarios, key=lambda scenario: scenario.write):
+                results[scenario.key] = self.run_scenario(planner.clients[scenario.role], scenario, options)
+
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'catalog_cache': not options['no_cache'] and settings.CATALOG_CACHE_ENABLED,
+                'search_index': settings.SEARCH_INDEX_ENABLED,
+                'repeat': options['repeat'],
+                'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+            'dataset': dataset,
+            'scenarios': results,
+            'uncovered_routes': planner.uncovered,
+        }
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                report['regressions'] = self.compare(json.load(baseline), results, options['threshold'])
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+        if options['fail_on_regression'] and report.get('regressions'):
+            raise CommandError(f'{len(report["regressions"])} scenario(s) regressed against the baseline.')
+
+    def prepare(self, options):
+        if options['existing']:
+            return {'existing': True, 'users': CustomUser.objects.count(), 'hostels': Hostel.objects.count(),
+                    'rooms': Rooms.objects.count(), 'bookings': Booking.objects.count()}
+        started = time.perf_counter()
+        dataset = seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                               students=options['students'], bookings=options['bookings'],
+                               seed=options['seed'], admins=1)
+        dataset.pop('hostel_ids')
+        # bulk_create skips the signals that maintain derived tables.
+        rebuild_rollups()
+        if settings.SEARCH_INDEX_ENABLED:
+            for index in registered_indexes():
+                index.rebuild()
+        dataset['seed_seconds'] = round(time.perf_counter() - started, 3)
+        return dataset
+
+    def run_scenario(self, client, scenario, options):
+        statuses = Counter()
+        sizes = []
+
+        def call():
+            response = send(client, scenario)
+            statuses[response.status_code] += 1
+            sizes.append(sum(map(len, response.streaming_content)) if response.streaming else len(response.content))
+
+        stats = measure(call, options['repeat'], options['warmup'])
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'role': scenario.role,
+            'route': scenario.route,
+            'method': scenario.method.upper(),
+            'path': scenario.path,
+            'params': scenario.params,
+            **stats,
+            'status': dict(statuses),
+            'bytes': max(sizes),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, baseline, results, threshold):
+        regressions = []
+        for key, current in results.items():
+            previous = baseline.get('scenarios', {}).get(key)
+            if previous is None:
+                continue
+            slower = previous['p50_ms'] and current['p50_ms'] > previous['p50_ms'] * (1 + threshold)
+            if slower or current['queries'] > previous['queries']:
+                regressions.append({
+                    'scenario': key,
+                    'p50_ms': [previous['p50_ms'], current['p50_ms']],
+                    'queries': [previous['queries'], current['queries']],
+                })
+        return regressions
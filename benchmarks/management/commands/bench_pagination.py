@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostel_booking_system.pagination import KeysetPagination
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = 'Compare page-number and keyset pagination latency at increasing depth on /api/bookings/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=50000)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False), rolled_back():
+            seeded = seed_dataset(hostels=20, rooms_per_hostel=250, students=max(1000, options['bookings'] // 10),
+                                  bookings=options['bookings'], seed=options['seed'])
+            admin = CustomUser.objects.create_user(
+                email='bench-admin@example.com', password=None, role='admin',
+                first_name='Bench', last_name='Admin', username='bench-admin')
+            client = api_client(admin)
+            url = reverse('bookings-list-create')
+
+            queryset = Booking.objects.all()
+            keyset = KeysetPagination()
+            keyset.set_keys(queryset)
+            last_page = max(1, seeded['bookings'] // page_size)
+            depths = sorted({1, 10, 100, last_page // 2, last_page} - {0})
+
+            results = {'dataset': {key: value for key, value in seeded.items() if key != 'hostel_ids'},
+                       'page_size': page_size, 'pages': []}
+            for page in depths:
+                params = {'page': page, 'page_size': page_size}
+                page_number = measure(lambda: client.get(url, params), options['repeat'])
+
+                cursor_params = {'pagination': 'cursor', 'page_size': page_size}
+                if page > 1:
+                    anchor = queryset.order_by('-created_at', '-pk')[(page - 1) * page_size - 1]
+                    cursor_params['cursor'] = keyset.cursor_for(anchor)
+                keyset_stats = measure(lambda: client.get(url, cursor_params), options['repeat'])
+                results['pages'].append({'page': page, 'page_number': page_number, 'keyset': keyset_stats})
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,76 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser
+from hostel_booking_system import compression, renderers
+from hostel_booking_system.renderers import FastJSONRenderer
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+
+# endpoint -> (URL name, role that lists it)
+ENDPOINTS = {
+    'room_list': ('room-list-create', 'custodian'),
+    'booking_list': ('bookings-list-create', 'admin'),
+}
+
+
+def cpu_us(func, repeat):
+    """Median CPU time of one call, in microseconds."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        samples.append((time.process_time() - started) * 1_000_000)
+    return round(statistics.median(samples), 1)
+
+
+class Command(BaseCommand):
+    help = ('Report render time with the stdlib and orjson JSON renderers, and bytes on the wire with '
+            'and without gzip and brotli, for room and booking list pages of each --page-size.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, action='append', default=[],
+                            help='Page sizes to render (default 10, 50 and 100); repeatable.')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        page_sizes = options['page_size'] or [10, 50, 100]
+        results = {'orjson': renderers.orjson is not None, 'brotli': compression.brotli is not None}
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False, CATALOG_CACHE_ENABLED=False), \
+                rolled_back():
+            seed_dataset(hostels=5, rooms_per_hostel=100, students=1000, bookings=5000,
+                         seed=options['seed'], admins=1)
+            users = {'admin': CustomUser.objects.get(email='bench-admin0@example.com'),
+                     'custodian': CustomUser.objects.filter(role='custodian').order_by('pk').first()}
+            for endpoint, (name, role) in ENDPOINTS.items():
+                client = api_client(users[role])
+                results[endpoint] = {}
+                for page_size in page_sizes:
+                    data = client.get(reverse(name), {'page_size': page_size}).data
+                    body = fast.render(data)
+                    measured = {
+                        'rows': len(data['results']),
+                        'render_us': {
+                            'json': cpu_us(lambda: stdlib.render(data), options['repeat']),
+                            'orjson': cpu_us(lambda: fast.render(data), options['repeat']),
+                        },
+                        'bytes': {'identity': len(body), 'gzip': len(compress_string(body))},
+                        'compress_us': {'gzip': cpu_us(lambda: compress_string(body), options['repeat'])},
+                    }
+                    if compression.brotli is not None:
+                        quality = compression.brotli_quality()
+                        measured['bytes']['br'] = len(compression.brotli.compress(body, quality=quality))
+                        measured['compress_us']['br'] = cpu_us(
+                            lambda: compression.brotli.compress(body, quality=quality), options['repeat'])
+                    results[endpoint][f'page_size_{page_size}'] = measured
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from bookings.rollups import compute_rollups, rebuild_rollups, rollup_drift
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = ('Compare reading hostel totals from the rollup table with aggregating bookings on the fly, '
+            'and time a full rebuild (rolled back afterwards).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=250)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False), rolled_back():
+            seeded = seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                                  students=options['students'], bookings=options['bookings'],
+                                  seed=options['seed'])
+            started = time.perf_counter()
+            rows = rebuild_rollups()
+            results['rebuild'] = {'rows': rows, 'seconds': round(time.perf_counter() - started, 3)}
+            hostel_id = seeded['hostel_ids'][0]
+            admin = CustomUser.objects.create(email='bench-admin@example.com', username='bench-admin',
+                                              first_name='Bench', last_name='Admin', role='admin')
+            client = api_client(admin)
+            url = reverse('booking-rollups')
+
+            results['aggregate_one_hostel'] = measure(lambda: compute_rollups([hostel_id]), options['repeat'])
+            results['aggregate_all_hostels'] = measure(compute_rollups, options['repeat'])
+            results['endpoint_one_hostel'] = measure(
+                lambda: client.get(url, {'hostel': str(hostel_id)}), options['repeat'])
+            results['endpoint_all_hostels'] = measure(lambda: client.get(url), options['repeat'])
+
+            started = time.perf_counter()
+            drift = rollup_drift()
+            results['consistency_check'] = {'mismatches': len(drift),
+                                            'seconds': round(time.perf_counter() - started, 3)}
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,59 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from search.index import registered_indexes
+from benchmarks.client import api_client
+from benchmarks.seeding import rolled_back, seed_dataset
+from benchmarks.timing import measure
+
+SEARCHES = [
+    ('users-list', 'student4242'),
+    ('users-list', 'student'),
+    ('users-list', 'zzzz'),
+    ('bookings-list-create', 'student4242'),
+    ('bookings-list-create', '0042'),
+    ('room-list-create', 'hostel 7'),
+    ('hostel-list-create', 'block 3'),
+]
+
+
+class Command(BaseCommand):
+    help = ('Compare ?search= on the word-suffix index with plain LIKE scans over a seeded dataset '
+            '(rolled back afterwards).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000)
+        parser.add_argument('--bookings', type=int, default=100000)
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=250)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*'], CATALOG_CACHE_ENABLED=False, THROTTLE_ENABLED=False), rolled_back():
+            seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                         students=options['students'], bookings=options['bookings'], seed=options['seed'])
+            admin = CustomUser.objects.create(email='bench-admin@example.com', username='bench-admin',
+                                              first_name='Bench', last_name='Admin', role='admin')
+            started = time.perf_counter()
+            postings = sum(index.rebuild() for index in registered_indexes())
+            results['index_build'] = {'postings': postings, 'seconds': round(time.perf_counter() - started, 3)}
+
+            client = api_client(admin)
+            for name, term in SEARCHES:
+                url = reverse(name)
+
+                def search():
+                    return client.get(url, {'search': term})
+                entry = {'results': search().data['count']}
+                entry['indexed'] = measure(search, options['repeat'])
+                with override_settings(SEARCH_INDEX_ENABLED=False):
+                    entry['like_scan'] = measure(search, options['repeat'])
+                results[f'{name}?search={term}'] = entry
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,77 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer, StudentBookingSerializer
+from hostels.models import Rooms
+from hostels.serializers import RoomSerializer, StudentRoomSerializer
+from hostel_booking_system.row_serializers import compile_row_serializer
+from benchmarks.seeding import rolled_back, seed_dataset
+
+# serializer -> the queryset its list view serializes
+CASES = {
+    'RoomSerializer': (RoomSerializer, lambda: Rooms.objects.select_related('hostel').order_by('-created_at')),
+    'StudentRoomSerializer': (StudentRoomSerializer,
+                              lambda: Rooms.objects.select_related('hostel').order_by('-created_at')),
+    'BookingSerializer': (BookingSerializer,
+                          lambda: Booking.objects.select_related('room_id__hostel').order_by('-created_at')),
+    'StudentBookingSerializer': (StudentBookingSerializer,
+                                 lambda: Booking.objects.select_related('room_id__hostel').order_by('-created_at')),
+}
+
+
+def cpu_per_row(func, rows, repeat):
+    """Median CPU time (process time, microseconds) per row over ``repeat`` calls."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        samples.append((time.process_time() - started) * 1_000_000 / rows)
+    return round(statistics.median(samples), 2)
+
+
+class Command(BaseCommand):
+    help = ('Compare the CPU cost per row of serializing room and booking lists from model instances '
+            'with the full serializers and from values_list() rows with the compiled row serializers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per serialized list.')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        results = {}
+        with rolled_back():
+            seed_dataset(hostels=10, rooms_per_hostel=max(1, rows // 10), students=max(100, rows // 10),
+                         bookings=rows, seed=options['seed'])
+            for name, (serializer_class, queryset) in CASES.items():
+                row_serializer = compile_row_serializer(serializer_class)
+                instances = list(queryset()[:rows])
+                values = list(row_serializer.rows(queryset())[:rows])
+                count = len(instances)
+                measured = {
+                    # Fetching and serializing, as a list view does.
+                    'query_and_serialize': {
+                        'instances_us_per_row': cpu_per_row(
+                            lambda: serializer_class(list(queryset()[:rows]), many=True).data,
+                            count, options['repeat']),
+                        'rows_us_per_row': cpu_per_row(
+                            lambda: row_serializer.serialize(list(row_serializer.rows(queryset())[:rows])),
+                            count, options['repeat']),
+                    },
+                    'serialize_only': {
+                        'instances_us_per_row': cpu_per_row(
+                            lambda: serializer_class(instances, many=True).data, count, options['repeat']),
+                        'rows_us_per_row': cpu_per_row(
+                            lambda: row_serializer.serialize(values), count, options['repeat']),
+                    },
+                }
+                for stats in measured.values():
+                    stats['speedup'] = round(stats['instances_us_per_row'] / max(stats['rows_us_per_row'], 0.01), 1)
+                results[name] = {'rows': count, **measured}
+        self.stdout.write(json.dumps({'rows': rows, 'results': results}, indent=2))
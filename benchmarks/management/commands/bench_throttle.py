@@ -0,0 +1,188 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostels.models import Hostel, Rooms
+from benchmarks.seeding import seed_dataset
+from benchmarks.timing import percentile
+from benchmarks.management.commands.bench_asgi import wsgi_request
+
+PHASES = ('custodian_alone', 'unthrottled', 'throttled')
+
+
+def latency_summary(samples):
+    latencies = [elapsed for elapsed, _ in samples]
+    return {
+        'requests': len(samples),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies, default=0), 2),
+        'status': dict(Counter(str(status) for _, status in samples)),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Load test for the role throttles: student threads flood booking requests and room list '
+            'reads while one custodian lists and decides pending bookings. It runs three phases: the '
+            'custodian alone, the flood without throttling, and the flood with it. It reports the '
+            'custodian\'s latency and the students\' 429s and Retry-After hints for each phase. Seeded '
+            'rows are committed, because the workers use their own connections, and removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each phase.')
+        parser.add_argument('--student-threads', type=int, default=16)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--hostels', type=int, default=5)
+        parser.add_argument('--rooms-per-hostel', type=int, default=40)
+        parser.add_argument('--bookings', type=int, default=3000)
+        parser.add_argument('--custodian-interval', type=float, default=0.02,
+                            help='Seconds the custodian waits between requests.')
+        parser.add_argument('--ignore-retry-after', action='store_true',
+                            help='Students retry at once instead of waiting for Retry-After.')
+        parser.add_argument('--capacity', help='Override the site-wide capacity rates, e.g. 6000/min.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON report to this file as well.')
+
+    def handle(self, *args, **options):
+        prefix = f'throttle-{uuid.uuid4().hex[:8]}'
+        dataset = seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                               students=options['students'], bookings=options['bookings'],
+                               seed=options['seed'], prefix=prefix)
+        hostel_ids = dataset.pop('hostel_ids')
+        rates = dict(settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {}))
+        if options['capacity']:
+            rates.update({key: options['capacity'] for key in rates if key.split('.')[0] == 'capacity'})
+        rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}
+        try:
+            with override_settings(ALLOWED_HOSTS=['*'], DEBUG=False, REST_FRAMEWORK=rest_framework):
+                self.prepare(prefix, hostel_ids, options)
+                results = {}
+                for phase in PHASES:
+                    cache.clear()
+                    with override_settings(THROTTLE_ENABLED=phase == 'throttled'):
+                        results[phase] = self.run_phase(phase, options)
+        finally:
+            connections.close_all()
+            Hostel.objects.filter(pk__in=hostel_ids).delete()
+            CustomUser.objects.filter(email__startswith=f'{prefix}-').delete()
+
+        report = {
+            'meta': {
+                'database': connection.vendor,
+                'seconds': options['seconds'],
+                'student_threads': options['student_threads'],
+                'students_wait_for_retry_after': not options['ignore_retry_after'],
+                'throttle_rates': rates,
+                'reserved_share': getattr(settings, 'THROTTLE_RESERVED_SHARE', 0),
+            },
+            'dataset': dataset,
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+
+    def prepare(self, prefix, hostel_ids, options):
+        custodian = CustomUser.objects.get(email=f'{prefix}-custodian0@example.com')
+        students = list(CustomUser.objects.filter(email__startswith=f'{prefix}-student').order_by('pk'))
+        self.custodian_token = Token.objects.get_or_create(user=custodian)[0].key
+        self.student_tokens = [Token.objects.get_or_create(user=student)[0].key for student in students]
+        self.room_ids = [str(pk) for pk in Rooms.objects.filter(hostel__in=hostel_ids).values_list('pk', flat=True)]
+        self.pending = list(Booking.objects.filter(room_id__hostel__in=hostel_ids, status='pending')
+                            .values_list('pk', flat=True))
+        self.handler = WSGIHandler()
+
+    def run_phase(self, phase, options):
+        flood = phase != 'custodian_alone'
+        stop = threading.Event()
+        student_samples, retry_after = [], []
+        threads = []
+        if flood:
+            for number in range(options['student_threads']):
+                # A fresh sequence per phase, so requests do not repeat the previous phase's bookings.
+                rng = random.Random(f'{phase}:{options["seed"]}:{number}')
+                thread = threading.Thread(target=self.student, args=(
+                    rng, stop, student_samples, retry_after, options['ignore_retry_after']))
+                thread.start()
+                threads.append(thread)
+        custodian_samples = []
+        custodian = threading.Thread(target=self.custodian, args=(stop, custodian_samples, options))
+        custodian.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads + [custodian]:
+            thread.join()
+
+        result = {'custodian': latency_summary(custodian_samples)}
+        if flood:
+            statuses = Counter(str(status) for _, status in student_samples)
+            result['students'] = {
+                'requests_per_second': round(len(student_samples) / options['seconds'], 1),
+                'throttled_share': round(statuses['429'] / max(1, len(student_samples)), 3),
+                'status': dict(statuses),
+                'retry_after_p50_s': percentile(retry_after, 50),
+                'retry_after_max_s': max(retry_after, default=0),
+            }
+        return result
+
+    def timed(self, samples, path, token, query='', method='GET', body=b'', headers=None):
+        started = time.perf_counter()
+        status, _ = wsgi_request(self.handler, path, query, token, method, body, headers)
+        samples.append(((time.perf_counter() - started) * 1000, status))
+        return status
+
+    def student(self, rng, stop, samples, retry_after, ignore_retry_after):
+        bookings_url = reverse('bookings-list-create')
+        rooms_url = reverse('room-list-create')
+        try:
+            while not stop.is_set():
+                token = rng.choice(self.student_tokens)
+                headers = {}
+                if rng.random() < 0.5:
+                    check_in = date(2026, 1, 1) + timedelta(days=rng.randrange(300))
+                    body = json.dumps({'room_id': rng.choice(self.room_ids), 'check_in_date': str(check_in),
+                                       'check_out_date': str(check_in + timedelta(days=120))}).encode()
+                    status = self.timed(samples, bookings_url, token, method='POST', body=body, headers=headers)
+                else:
+                    query = urlencode({'page': rng.randrange(1, 10), 'ordering': rng.choice(
+                        ['price_per_semester', '-created_at', 'room_number'])})
+                    status = self.timed(samples, rooms_url, token, query, headers=headers)
+                if status == 429:
+                    wait = int(headers.get('Retry-After', 0))
+                    retry_after.append(wait)
+                    if not ignore_retry_after:
+                        stop.wait(wait)
+        finally:
+            connection.close()
+
+    def custodian(self, stop, samples, options):
+        bookings_url = reverse('bookings-list-create')
+        try:
+            while not stop.is_set():
+                self.timed(samples, bookings_url, self.custodian_token, urlencode({'status': 'pending'}))
+                if self.pending:
+                    url = reverse('booking-detail', args=[self.pending.pop()])
+                    self.timed(samples, url, self.custodian_token, method='PATCH',
+                               body=json.dumps({'status': 'rejected'}).encode())
+                time.sleep(options['custodian_interval'])
+        finally:
+            connection.close()
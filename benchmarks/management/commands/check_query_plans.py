@@ -0,0 +1,72 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.rollups import rebuild_rollups
+from search.index import registered_indexes
+from benchmarks.query_plans import capture_plans, enumerate_shapes, plan_clients, unaccepted
+from benchmarks.seeding import rolled_back, seed_dataset
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN the SQL of every filter, ordering and search combination of every list view and '
+            'flag full scans and filesorts on the large tables. Fails when a flagged query path is not '
+            'in benchmarks.query_plans.ACCEPTED.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=20)
+        parser.add_argument('--rooms-per-hostel', type=int, default=100)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--existing', action='store_true',
+                            help='Explain against the rows already in the database instead of a '
+                                 'rolled-back seeded dataset. Plans depend on table sizes.')
+        parser.add_argument('--route', action='append', default=[],
+                            help='Only check this route (URL name); repeatable.')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Include the SQL and plan of every statement, not just flagged ones.')
+        parser.add_argument('--output', help='Write the JSON report to this file as well.')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            if not options['existing']:
+                seed_dataset(hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+                             students=options['students'], bookings=options['bookings'], admins=1)
+                rebuild_rollups()
+                if settings.SEARCH_INDEX_ENABLED:
+                    for index in registered_indexes():
+                        index.rebuild()
+            if connection.vendor == 'mysql':
+                # Fresh statistics, so the plans are the ones production would get.
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE TABLE ' + ', '.join(connection.introspection.table_names()))
+                    cursor.fetchall()
+            elif connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            clients = plan_clients()
+            shapes = [shape for shape in enumerate_shapes(clients)
+                      if not options['route'] or shape.route in options['route']]
+            results = capture_plans(shapes, clients)
+
+        if not options['verbose_plans']:
+            for result in results.values():
+                result['statements'] = [statement for statement in result['statements'] if statement['problems']]
+        failures = unaccepted(results)
+        report = {
+            'database': connection.vendor,
+            'shapes': len(results),
+            'flagged': Counter(problem for result in results.values() for problem in result['problems']),
+            'unaccepted': [' '.join(entry) for entry in failures],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+        if failures:
+            raise CommandError(f'{len(failures)} query path(s) scan or sort a large table without an index.')
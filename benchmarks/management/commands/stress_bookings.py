@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from bookings.services import find_overlapping_approved
+from hostels.models import Hostel, Rooms
+from benchmarks.client import api_client
+from benchmarks.timing import percentile
+
+
+class Command(BaseCommand):
+    help = ('Fire concurrent booking and approval requests at a handful of rooms, then assert that '
+            'no overlapping approved bookings exist. Seeded rows are committed and removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=3)
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--approvals', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows for inspection.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f'stress-{uuid.uuid4().hex[:8]}'
+        custodian = CustomUser.objects.create_user(
+            email=f'{prefix}-custodian@example.com', password=None, role='custodian',
+            first_name='Stress', last_name='Custodian', username=f'{prefix}-custodian')
+        hostel = Hostel.objects.create(name=prefix, location='Stress', capacity=options['rooms'],
+                                       custodian_id=custodian)
+        rooms = Rooms.objects.bulk_create([
+            Rooms(hostel=hostel, room_number=str(number), price_per_semester=Decimal('500'), is_available=True)
+            for number in range(options['rooms'])])
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'{prefix}-student{number}@example.com', username=f'{prefix}-student{number}',
+                       first_name='Stress', last_name=str(number), role='student')
+            for number in range(options['students'])])
+        students = list(CustomUser.objects.filter(email__startswith=f'{prefix}-student'))
+
+        work = queue.Queue()
+        tasks = [('book', student) for student in students] + [('approve', None)] * options['approvals']
+        rng.shuffle(tasks)
+        for task in tasks:
+            work.put(task)
+
+        room_ids = [room.pk for room in rooms]
+        latencies = defaultdict(list)
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def worker(worker_rng):
+            clients = {}
+            try:
+                while True:
+                    try:
+                        kind, student = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    if kind == 'book':
+                        client = api_client(student, raise_request_exception=False)
+                        check_in = date(2026, 1, 1) + timedelta(days=worker_rng.randrange(0, 150, 15))
+                        started = time.perf_counter()
+                        response = client.post(reverse('bookings-list-create'), {
+                            'room_id': str(worker_rng.choice(room_ids)),
+                            'check_in_date': check_in.isoformat(),
+                            'check_out_date': (check_in + timedelta(days=worker_rng.choice([30, 60, 120]))).isoformat(),
+                        }, format='json')
+                    else:
+                        client = clients.setdefault('custodian', api_client(custodian, raise_request_exception=False))
+                        pending = list(Booking.objects.filter(room_id__in=room_ids, status='pending')
+                                       .values_list('pk', flat=True)[:20])
+                        if not pending:
+                            continue
+                        started = time.perf_counter()
+                        response = client.patch(reverse('booking-detail', args=[worker_rng.choice(pending)]),
+                                                {'status': 'approved'}, format='json')
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        latencies[kind].append(elapsed)
+                        statuses[f'{kind}:{response.status_code}'] += 1
+            finally:
+                connections.close_all()
+
+        # Expected 400s (room already taken) would otherwise flood stderr.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with override_settings(ALLOWED_HOSTS=['*'], THROTTLE_ENABLED=False):
+            started = time.perf_counter()
+            threads = [threading.Thread(target=worker, args=(random.Random(rng.random()),))
+                       for _ in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        overlaps = find_overlapping_approved(Booking.objects.filter(room_id__in=room_ids))
+        operations = sum(len(samples) for samples in latencies.values())
+        report = {
+            'threads': options['threads'],
+            'operations': operations,
+            'seconds': round(elapsed, 3),
+            'throughput_per_second': round(operations / elapsed, 1) if elapsed else None,
+            'statuses': dict(sorted(statuses.items())),
+            'latency_ms': {kind: {'p50': round(percentile(samples, 50), 2),
+                                  'p99': round(percentile(samples, 99), 2)}
+                           for kind, samples in latencies.items()},
+            'approved': Booking.objects.filter(room_id__in=room_ids, status='approved').count(),
+            'overlapping_approved_pairs': len(overlaps),
+        }
+        if not options['keep']:
+            hostel.delete()
+            CustomUser.objects.filter(email__startswith=prefix).delete()
+        self.stdout.write(json.dumps(report, indent=2))
+        if overlaps:
+            raise CommandError(f'{len(overlaps)} overlapping approved booking pairs found.')
+        if any(code.endswith(':500') for code in statuses):
+            raise CommandError('Some requests failed with a server error.')
@@ -0,0 +1,255 @@
+import re
+from fnmatch import fnmatchcase
+
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostels.models import Rooms
+from hostel_booking_system.pagination import HybridPagination
+from search.models import SearchSuffix
+from benchmarks.client import api_client
+from benchmarks.endpoints import REQUIRED_PARAMS, VIEW_MODELS, discover_routes
+
+# Tables that grow with usage; scans and sorts on the others stay cheap.
+LARGE_MODELS = (Booking, Rooms, CustomUser, SearchSuffix)
+
+# Flagged paths that are accepted on purpose: (route pattern, shape pattern,
+# table, issue) -> reason. Anything flagged that is not listed here fails the check.
+ACCEPTED = {
+    ('*', 'search', '*', 'full_scan'):
+        'Substring search cannot seek a B-tree. The search index narrows selective terms; '
+        'terms it does not narrow fall back to LIKE.',
+    ('*room-list*', 'filter_is_available*', 'hostels_rooms', 'full_scan'):
+        'Most rooms are available, so walking the ordering index and skipping the rest beats any index.',
+    ('*room-list*', 'filter_room_type+ordering_*', 'hostels_rooms', 'full_scan'):
+        'Three room types: the ordering index fills a page after about three rows per result.',
+    ('bookings-list-create', 'filter_status+ordering_*', 'bookings_booking', 'full_scan'):
+        'Three statuses: the ordering index fills a page after about three rows per result.',
+    ('room-availability', '*', 'hostels_rooms', 'full_scan'):
+        'Every open room is probed for a clashing booking through booking_room_status_dates; '
+        'per-hostel lookups can use the interval index instead.',
+    ('users-list', 'ordering_-username+cursor', 'accounts_customuser', 'full_scan'):
+        'Usernames can be NULL and NULLs sort last descending, so the seek is "<= x OR IS NULL"; '
+        'SQLite walks the username index for it.',
+}
+
+
+class QueryShape:
+    def __init__(self, route, name, path, params, role):
+        self.route = route
+        self.name = name
+        self.path = path
+        self.params = params
+        self.role = role
+
+    @property
+    def key(self):
+        return f'{self.role} {self.route}:{self.name}'
+
+
+def large_tables():
+    return {model._meta.db_table for model in LARGE_MODELS}
+
+
+def enumerate_shapes(users):
+    """
+    Every filter, ordering (both directions), filter and ordering pair, and
+    search shape of every list view, as each role that can read it, plus the
+    keyset page that follows the first one on HybridPagination views. Filter
+    values and search words are taken from real rows.
+    """
+    shapes = []
+    for template, name, view, methods, is_list in discover_routes():
+        if not is_list or 'get' not in methods or not name or '<' in template:
+            continue
+        queryset = getattr(view, 'queryset', None)
+        model = queryset.model if queryset is not None else VIEW_MODELS.get(name)
+        if model is None:
+            continue
+        path = reverse(name)
+        base = dict(REQUIRED_PARAMS.get(name, {}))
+        rows = model._default_manager.order_by('pk')
+        filters = {}
+        for field in getattr(view, 'filterset_fields', None) or []:
+            value = rows.values_list(field, flat=True).first()
+            if value is not None:
+                filters[field] = str(value).lower() if isinstance(value, bool) else str(value)
+        orderings = [f'{sign}{field}' for field in getattr(view, 'ordering_fields', None) or []
+                     for sign in ('', '-')]
+        variants = [('default', {})]
+        variants += [(f'filter_{field}', {field: value}) for field, value in filters.items()]
+        variants += [(f'ordering_{ordering}', {'ordering': ordering}) for ordering in orderings]
+        variants += [(f'filter_{field}+ordering_{ordering}', {field: value, 'ordering': ordering})
+                     for field, value in filters.items() for ordering in orderings]
+        search_fields = getattr(view, 'search_fields', None) or []
+        if search_fields:
+            total = rows.count()
+            text = rows.values_list(search_fields[0], flat=True)[total // 2] if total else ''
+            words = re.findall(r'\w+', str(text))
+            if words:
+                variants.append(('search', {'search': max(words, key=len)}))
+        if getattr(view, 'pagination_class', None) is HybridPagination:
+            variants += [(f'{variant}+cursor', {**params, 'pagination': 'cursor'}) for variant, params in
+                         variants if not variant.startswith('search')]
+        for role in users:
+            shapes += [QueryShape(name, variant, path, {**base, **params}, role) for variant, params in variants]
+    return shapes
+
+
+class PlanRecorder:
+    """Collects the SQL and parameters of every SELECT the wrapped code runs."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params):
+    """EXPLAIN a statement and return its plan as a list of (table, access, extra) rows."""
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [('', detail, '') for _, _, _, detail in cursor.fetchall()]
+        if vendor == 'mysql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            columns = [column[0] for column in cursor.description]
+            return [(row['table'] or '', row['type'] or '', f'{row["key"] or ""} {row["Extra"] or ""}'.strip())
+                    for row in (dict(zip(columns, values)) for values in cursor.fetchall())]
+    raise NotImplementedError(f'Query plans are not supported on {vendor}.')
+
+
+def aliases(sql):
+    """Map table aliases (Django's U0, U1... in subqueries) back to table names."""
+    found = {table: table for table in re.findall(r'(?:FROM|JOIN) [`"]?(\w+)[`"]?', sql)}
+    found.update({alias: table for table, alias in re.findall(r'[`"](\w+)[`"] (U\d+)\b', sql)})
+    return found
+
+
+def ordered_table(sql, names):
+    """The table of the leading ORDER BY term of the outer query (its ORDER BY comes last)."""
+    tables = re.findall(r'ORDER BY [`"]?(\w+)[`"]?\.', sql)
+    return names.get(tables[-1], tables[-1]) if tables else None
+
+
+def problems(sql, plan):
+    """
+    Return the (table, issue) pairs a plan shows on large tables.
+
+    'full_scan': a statement with a WHERE clause reads a whole large table or
+    one of its indexes. Unfiltered reads are fine: COUNT(*) has to see every
+    row and an index-ordered page stops at the LIMIT.
+    'filesort': the rows are sorted before the LIMIT applies, unless the
+    sorted table was first narrowed by an index on a filtered column, which
+    bounds the sort to that slice (one hostel's rooms, one student's
+    bookings...).
+    """
+    large = large_tables()
+    names = aliases(sql)
+    where = sql.split(' WHERE ', 1)[1] if ' WHERE ' in sql else ''
+    found = []
+    narrowed = set()
+    sorted_ = False
+    if connection.vendor == 'sqlite':
+        for _, detail, _ in plan:
+            match = re.match(r'(SCAN|SEARCH) (?:TABLE )?(\w+)', detail)
+            if match:
+                access, table = match.group(1), names.get(match.group(2), match.group(2))
+                if access == 'SCAN' and table in large and where:
+                    found.append((table, 'full_scan'))
+                columns = re.findall(r'[(\s](\w+)[=<>]', detail)
+                if access == 'SEARCH' and any(column == 'rowid' or f'."{column}"' in where or
+                                              f'.`{column}`' in where for column in columns):
+                    narrowed.add(table)
+            elif re.match(r'USE TEMP B-TREE FOR .*ORDER BY', detail):
+                sorted_ = True
+    else:
+        for table, access, extra in plan:
+            table = names.get(table, table)
+            if access in ('ref', 'range', 'eq_ref', 'const', 'ref_or_null', 'index_merge') and where:
+                narrowed.add(table)
+            if table in large and (access == 'ALL' or access == 'index' and where):
+                found.append((table, 'full_scan'))
+            sorted_ = sorted_ or 'Using filesort' in extra
+    table = ordered_table(sql, names)
+    if sorted_ and table in large and table not in narrowed:
+        found.append((table, 'filesort'))
+    return sorted(set(found))
+
+
+def capture_plans(shapes, clients):
+    """
+    Run each shape through the API with the catalog cache off and return a
+    report per shape: every SELECT it issued, its plan and what was flagged.
+    """
+    results = {}
+    with override_settings(ALLOWED_HOSTS=['*'], CATALOG_CACHE_ENABLED=False, THROTTLE_ENABLED=False):
+        for shape in shapes:
+            client = clients[shape.role]
+            response = client.get(shape.path, shape.params)
+            if response.status_code != 200:
+                continue
+            request = (shape.path, shape.params)
+            if shape.name.endswith('+cursor'):
+                # The page after the first one adds the keyset condition.
+                url = response.data.get('next')
+                if not url:
+                    continue
+                request = (url,)
+            recorder = PlanRecorder()
+            with connection.execute_wrapper(recorder):
+                client.get(*request)
+            statements = []
+            for sql, params in recorder.statements:
+                plan = explain(sql, params)
+                statements.append({
+                    'sql': sql,
+                    'plan': [' '.join(part for part in row if part) for row in plan],
+                    'problems': [f'{table}:{issue}' for table, issue in problems(sql, plan)],
+                })
+            results[shape.key] = {
+                'route': shape.route,
+                'shape': shape.name,
+                'role': shape.role,
+                'params': shape.params,
+                'statements': statements,
+                'problems': sorted({problem for statement in statements for problem in statement['problems']}),
+            }
+    return results
+
+
+def accepted(route, shape, table, issue):
+    return any(fnmatchcase(route, route_pattern) and fnmatchcase(shape, shape_pattern)
+               and fnmatchcase(table, table_pattern) and issue == accepted_issue
+               for route_pattern, shape_pattern, table_pattern, accepted_issue in ACCEPTED)
+
+
+def unaccepted(results):
+    """Flagged (route, shape, table, issue) tuples that ACCEPTED does not cover."""
+    found = []
+    for result in results.values():
+        for problem in result['problems']:
+            table, issue = problem.split(':')
+            if not accepted(result['route'], result['shape'], table, issue):
+                found.append((result['route'], result['shape'], table, issue))
+    return sorted(set(found))
+
+
+def plan_clients(roles=('admin', 'student')):
+    """An authenticated API client per role, for the first user with that role."""
+    clients = {}
+    for role in roles:
+        user = CustomUser.objects.filter(role=role).order_by('pk').first()
+        if role == 'student':
+            student_id = Booking.objects.order_by('created_at', 'pk').values_list('student_id', flat=True).first()
+            user = CustomUser.objects.filter(pk=student_id).first() or user
+        if user is not None:
+            clients[role] = api_client(user, raise_request_exception=False)
+    return clients
@@ -0,0 +1,101 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostels.models import Hostel, Rooms
+
+ROOM_TYPES = [room_type for room_type, _ in Rooms.ROOM_TYPES]
+STATUS_WEIGHTS = [('approved', 3), ('pending', 5), ('rejected', 2)]
+
+
+@contextmanager
+def rolled_back(using='default'):
+    """
+    Run a benchmark inside a transaction that is always rolled back, so seeded
+    rows never leak into the database the command was pointed at.
+    """
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
+
+
+def seed_dataset(hostels=10, rooms_per_hostel=100, students=1000, bookings=10000,
+                 start=date(2022, 1, 1), years=3, seed=0, batch_size=1000, prefix='bench', admins=0):
+    """
+    Generate a deterministic dataset with batched bulk_create calls.
+
+    The same arguments always produce the same rows (apart from primary keys
+    and timestamps), so results can be compared across commits.
+    """
+    rng = random.Random(seed)
+    password = make_password(None)
+
+    CustomUser.objects.bulk_create([
+        CustomUser(email=f'{prefix}-admin{n}@example.com', username=f'{prefix}-admin{n}',
+                   first_name='Admin', last_name=str(n), role='admin', password=password)
+        for n in range(admins)
+    ], batch_size=batch_size)
+    custodians = CustomUser.objects.bulk_create([
+        CustomUser(email=f'{prefix}-custodian{n}@example.com', username=f'{prefix}-custodian{n}',
+                   first_name='Custodian', last_name=str(n), role='custodian', password=password)
+        for n in range(hostels)
+    ], batch_size=batch_size)
+    student_rows = CustomUser.objects.bulk_create([
+        CustomUser(email=f'{prefix}-student{n}@example.com', username=f'{prefix}-student{n}',
+                   first_name='Student', last_name=str(n), role='student', password=password)
+        for n in range(students)
+    ], batch_size=batch_size)
+    if not student_rows or student_rows[0].pk is None:
+        # Backends that cannot return ids from bulk inserts.
+        student_rows = list(CustomUser.objects.filter(
+            email__startswith=f'{prefix}-student').order_by('pk'))
+        custodians = list(CustomUser.objects.filter(
+            email__startswith=f'{prefix}-custodian').order_by('pk'))
+
+    hostel_rows = Hostel.objects.bulk_create([
+        Hostel(name=f'{prefix.title()} Hostel {n}', location=f'Block {n % 7}',
+               capacity=rooms_per_hostel * 2, description='Seeded for benchmarks.',
+               custodian_id=custodians[n])
+        for n in range(hostels)
+    ], batch_size=batch_size)
+
+    room_rows = Rooms.objects.bulk_create([
+        Rooms(hostel=hostel, room_number=f'{n:04d}', room_type=rng.choice(ROOM_TYPES),
+              price_per_semester=Decimal(rng.randrange(300, 1500)), is_available=rng.random() < 0.9)
+        for hostel in hostel_rows
+        for n in range(rooms_per_hostel)
+    ], batch_size=batch_size)
+
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    bookings = min(bookings, len(student_rows) * len(room_rows))
+    pairs = set()
+    booking_rows = []
+    while len(booking_rows) < bookings:
+        student = rng.randrange(len(student_rows))
+        room = rng.randrange(len(room_rows))
+        if (student, room) in pairs:
+            continue
+        pairs.add((student, room))
+        check_in = start + timedelta(days=rng.randrange(years * 365))
+        booking_rows.append(Booking(
+            student_id=student_rows[student], room_id=room_rows[room],
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=rng.randrange(30, 180)),
+            status=rng.choice(statuses)))
+    Booking.objects.bulk_create(booking_rows, batch_size=batch_size)
+
+    return {
+        'admins': admins,
+        'custodians': len(custodians),
+        'students': len(student_rows),
+        'hostels': len(hostel_rows),
+        'rooms': len(room_rows),
+        'bookings': len(booking_rows),
+        'hostel_ids': [hostel.pk for hostel in hostel_rows],
+    }
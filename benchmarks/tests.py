@@ -0,0 +1,57 @@
+from datetime import date, datetime
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bookings.archive import archive_bookings
+from bookings.models import Booking
+from .endpoints import Planner
+from .query_plans import PlanRecorder, capture_plans, enumerate_shapes, explain, plan_clients, problems, unaccepted
+from .management.commands.bench_endpoints import send
+from .seeding import seed_dataset
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class EndpointPlannerTests(TestCase):
+    def setUp(self):
+        seed_dataset(hostels=2, rooms_per_hostel=15, students=30, bookings=120, admins=1)
+        archive_bookings(date(2022, 7, 1))
+
+    def test_every_route_gets_a_scenario_that_answers(self):
+        planner = Planner(cursor_hops=1)
+        scenarios = planner.plan()
+        # Logging out only takes POST and would end the session the other scenarios use.
+        self.assertEqual(sorted(planner.uncovered), ['logout', 'rest_framework:logout'])
+        self.assertTrue({'anonymous', 'student', 'custodian', 'admin'} <= {s.role for s in scenarios})
+        for scenario in scenarios:
+            with self.subTest(scenario.key):
+                code = send(planner.clients[scenario.role], scenario).status_code
+                self.assertTrue(code < 400 or code in (401, 403), code)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Expected plans are recorded for SQLite.')
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        seed_dataset(hostels=3, rooms_per_hostel=20, students=40, bookings=200, admins=1)
+
+    def test_every_list_query_path_is_indexed(self):
+        clients = plan_clients()
+        results = capture_plans(enumerate_shapes(clients), clients)
+        self.assertGreater(len(results), 300)
+        self.assertEqual(unaccepted(results), [])
+
+    def test_unindexed_filter_and_sort_are_flagged(self):
+        recorder = PlanRecorder()
+        since = timezone.make_aware(datetime(2025, 1, 1))
+        with connection.execute_wrapper(recorder):
+            list(Booking.objects.filter(updated_at__gte=since).order_by('updated_at')[:10])
+            list(Booking.objects.order_by('updated_at')[:10])
+            list(Booking.objects.filter(status='approved').order_by('-created_at')[:10])
+        flagged = [problems(sql, explain(sql, params)) for sql, params in recorder.statements]
+        self.assertEqual(flagged, [
+            [('bookings_booking', 'filesort'), ('bookings_booking', 'full_scan')],
+            [('bookings_booking', 'filesort')],
+            [],
+        ])
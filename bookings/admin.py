@@ -1,8 +1,71 @@
-from django.contrib import admin
-from .models import Booking
+from django.contrib import admin, messages
+
+from hostel_booking_system.pagination import EstimatedCountPaginator
+from .models import ArchivedBooking, Booking
+from .services import decide_bookings
+
+# Bookings decided per transaction by the bulk actions.
+DECISION_BATCH_SIZE = 500
+
 
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('id', 'student_id', 'room_id', 'status', 'check_in_date', 'check_out_date')
     list_filter = ('status', 'check_in_date')
+    list_select_related = ('student_id', 'room_id__hostel')
+    search_fields = ('^student_id__email', '^room_id__room_number')
+    autocomplete_fields = ('student_id', 'room_id')
+    actions = ('approve_selected', 'reject_selected')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        # The change form, delete confirmation and action pages print
+        # Booking.__str__ too; the changelist skips list_select_related when
+        # the queryset already selects related rows.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    def decide(self, request, queryset, status):
+        ids = list(queryset.order_by('created_at', 'pk').values_list('pk', flat=True))
+        totals = {'updated': 0, 'unchanged': 0, 'conflicts': 0, 'auto_rejected': 0}
+        for start in range(0, len(ids), DECISION_BATCH_SIZE):
+            summary = decide_bookings(ids[start:start + DECISION_BATCH_SIZE], status)
+            for key in ('updated', 'unchanged', 'conflicts'):
+                totals[key] += len(summary[key])
+            totals['auto_rejected'] += summary['auto_rejected']
+        self.message_user(
+            request, f"{totals['updated']} booking(s) {status}, {totals['unchanged']} already {status}, "
+                     f"{totals['conflicts']} skipped for clashing with an approved stay, "
+                     f"{totals['auto_rejected']} competing request(s) rejected.",
+            messages.WARNING if totals['conflicts'] else messages.SUCCESS)
+
+    @admin.action(description='Approve selected bookings', permissions=['change'])
+    def approve_selected(self, request, queryset):
+        self.decide(request, queryset, 'approved')
+
+    @admin.action(description='Reject selected bookings', permissions=['change'])
+    def reject_selected(self, request, queryset):
+        self.decide(request, queryset, 'rejected')
+
+
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'student_id', 'room_id', 'status', 'check_in_date', 'check_out_date', 'archived_at')
+    list_filter = ('status',)
+    list_select_related = ('student_id', 'room_id__hostel')
+    search_fields = ('^student_id__email', '^room_id__room_number')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 admin.site.register(Booking, BookingAdmin)
+admin.site.register(ArchivedBooking, ArchivedBookingAdmin)
@@ -0,0 +1,195 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from hostels.models import Rooms
+from .events import statuses_changed
+from .models import Booking
+from .rollups import add_booking_changes, apply_deltas, new_deltas
+from .services import lock_rooms
+from .signals import bookings_bulk_updated
+
+WRITE_BATCH_SIZE = 1000
+
+
+class Calendar:
+    """
+    Occupied periods of one room (or one student), kept sorted and merged so
+    they never overlap. An overlap test then only has to look at the periods
+    immediately before and after the requested check-in.
+    """
+
+    def __init__(self):
+        self.stays = []
+
+    def is_free(self, check_in_date, check_out_date):
+        position = bisect_left(self.stays, (check_in_date, check_out_date))
+        if position and self.stays[position - 1][1] > check_in_date:
+            return False
+        return position == len(self.stays) or self.stays[position][0] >= check_out_date
+
+    def add(self, check_in_date, check_out_date):
+        start = bisect_left(self.stays, (check_in_date, check_out_date))
+        if start and self.stays[start - 1][1] >= check_in_date:
+            start -= 1
+            check_in_date = self.stays[start][0]
+        end = start
+        while end < len(self.stays) and self.stays[end][0] <= check_out_date:
+            check_out_date = max(check_out_date, self.stays[end][1])
+            end += 1
+        self.stays[start:end] = [(check_in_date, check_out_date)]
+
+
+class Allocator:
+    """
+    In-memory matcher used by allocate_rooms().
+
+    ``rooms`` is an iterable of (room_id, hostel_id, room_type, is_available);
+    ``approved`` of (student_id, room_id, check_in_date, check_out_date) for
+    stays that are already approved; ``taken_pairs`` of (student_id, room_id)
+    pairs that already have a booking, since a student can only request a
+    given room once.
+    """
+
+    def __init__(self, rooms, approved=(), taken_pairs=(), reassign=True):
+        self.reassign = reassign
+        # Rooms are addressed by position internally; hashing and comparing
+        # UUIDs dominated the candidate scan.
+        self.room_ids = []
+        self.positions = {}
+        self.rooms = []
+        self.pools = defaultdict(list)
+        for position, (room_id, hostel_id, room_type, is_available) in enumerate(rooms):
+            self.room_ids.append(room_id)
+            self.positions[room_id] = position
+            self.rooms.append(((hostel_id, room_type), is_available))
+            if is_available:
+                self.pools[hostel_id, room_type].append(position)
+        self.calendars = [Calendar() for _ in self.room_ids]
+        self.student_calendars = defaultdict(Calendar)
+        for student_id, room_id, check_in_date, check_out_date in approved:
+            position = self.positions.get(room_id)
+            if position is not None:
+                self.calendars[position].add(check_in_date, check_out_date)
+            self.student_calendars[student_id].add(check_in_date, check_out_date)
+        self.taken_pairs = {(student_id, self.positions[room_id]) for student_id, room_id in taken_pairs
+                            if room_id in self.positions}
+        # Windows already known to be fully booked in a pool. Allocation only
+        # ever adds stays, so a full window stays full for the whole run.
+        self.full_windows = set()
+
+    def find_room(self, student_id, position, check_in_date, check_out_date):
+        pool_key, is_available = self.rooms[position]
+        if is_available and self.calendars[position].is_free(check_in_date, check_out_date):
+            return position
+        if not self.reassign:
+            return None
+        window = (pool_key, check_in_date, check_out_date)
+        if window in self.full_windows:
+            return None
+        calendars = self.calendars
+        for candidate in self.pools[pool_key]:
+            if (candidate != position and calendars[candidate].is_free(check_in_date, check_out_date)
+                    and (student_id, candidate) not in self.taken_pairs):
+                return candidate
+        self.full_windows.add(window)
+        return None
+
+    def allocate(self, requests):
+        """
+        ``requests`` are (booking_id, student_id, room_id, check_in_date,
+        check_out_date) in priority order. Yields (booking_id, room_id) with
+        room_id None for requests that cannot be placed.
+        """
+        for booking_id, student_id, room_id, check_in_date, check_out_date in requests:
+            position = self.positions.get(room_id)
+            if position is None or not self.student_calendars[student_id].is_free(check_in_date, check_out_date):
+                yield booking_id, None
+                continue
+            assigned = self.find_room(student_id, position, check_in_date, check_out_date)
+            if assigned is None:
+                yield booking_id, None
+                continue
+            self.calendars[assigned].add(check_in_date, check_out_date)
+            self.student_calendars[student_id].add(check_in_date, check_out_date)
+            self.taken_pairs.add((student_id, assigned))
+            yield booking_id, self.room_ids[assigned]
+
+
+def _update_in_batches(ids, **values):
+    for start in range(0, len(ids), WRITE_BATCH_SIZE):
+        Booking.objects.filter(pk__in=ids[start:start + WRITE_BATCH_SIZE]).update(**values)
+
+
+def allocate_rooms(hostel_id=None, reassign=True, dry_run=False):
+    """
+    Resolve every pending booking in one pass, oldest request first.
+
+    Each request gets its requested room when that room is open and free for
+    its dates; otherwise, with ``reassign``, the first free open room of the
+    same type in the same hostel. Requests that cannot be placed, or whose
+    student already holds a room for overlapping dates, are rejected.
+    Candidates are loaded in bulk, matched in memory and written back with
+    batched UPDATE statements in one transaction.
+    """
+    started = time.perf_counter()
+    summary = {'pending': 0, 'approved': 0, 'reassigned': 0, 'rejected': 0, 'dry_run': dry_run}
+    with transaction.atomic():
+        rooms = Rooms.objects.all()
+        if hostel_id is not None:
+            rooms = rooms.filter(hostel_id=hostel_id)
+        room_rows = list(rooms.values_list('pk', 'hostel_id', 'room_type', 'is_available'))
+        room_ids = [row[0] for row in room_rows]
+        hostels = lock_rooms(room_ids)
+
+        scoped = Booking.objects.filter(room_id__in=rooms.values('pk'))
+        pending = list(scoped.filter(status='pending').order_by('created_at', 'pk').values_list(
+            'pk', 'student_id', 'room_id', 'check_in_date', 'check_out_date'))
+        summary['pending'] = len(pending)
+        students = scoped.filter(status='pending').values('student_id')
+        approved = scoped.approved().values_list('student_id', 'room_id', 'check_in_date', 'check_out_date')
+        # A student's other approved stays count even when they are in a hostel outside the scope.
+        student_approved = Booking.objects.approved().filter(student_id__in=students).exclude(
+            room_id__in=rooms.values('pk')).values_list('student_id', 'room_id', 'check_in_date', 'check_out_date')
+        taken_pairs = Booking.objects.filter(student_id__in=students).values_list('student_id', 'room_id')
+
+        allocator = Allocator(room_rows, list(approved) + list(student_approved), taken_pairs, reassign)
+        original_rooms = {row[0]: row[2] for row in pending}
+        decisions = list(allocator.allocate(pending))
+
+        now = timezone.now()
+        outcome = defaultdict(list)
+        moves = defaultdict(list)
+        for booking_id, room_id in decisions:
+            outcome['rejected' if room_id is None else 'approved'].append(booking_id)
+            if room_id is not None and room_id != original_rooms[booking_id]:
+                moves[room_id].append(booking_id)
+        summary['approved'] = len(outcome['approved'])
+        summary['rejected'] = len(outcome['rejected'])
+        summary['reassigned'] = sum(len(ids) for ids in moves.values())
+        if not dry_run:
+            # Plain UPDATE ... WHERE pk IN (...) statements; bulk_update's
+            # per-row CASE expressions are far slower at this volume.
+            for status, ids in outcome.items():
+                _update_in_batches(ids, status=status, updated_at=now)
+            for room_id, ids in moves.items():
+                _update_in_batches(ids, room_id=room_id, updated_at=now)
+            students = {row[0]: row[1] for row in pending}
+            rooms_by_booking = {**original_rooms, **{pk: room_id for pk, room_id in decisions if room_id}}
+            check_in_dates = {row[0]: row[3] for row in pending}
+            deltas = new_deltas()
+            add_booking_changes(deltas, [
+                (original_rooms[pk], rooms_by_booking[pk], check_in_dates[pk], 'pending', status)
+                for status, ids in outcome.items() for pk in ids])
+            apply_deltas(deltas)
+            for status, ids in outcome.items():
+                statuses_changed([(pk, students[pk], rooms_by_booking[pk]) for pk in ids], status, 'pending')
+
+    if decisions and not dry_run:
+        bookings_bulk_updated.send(sender=Booking, room_ids=set(room_ids), hostel_ids=set(hostels.values()),
+                                   reassigned_ids=[pk for ids in moves.values() for pk in ids])
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
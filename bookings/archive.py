@@ -0,0 +1,105 @@
+import time
+from contextvars import ContextVar
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from hostel_booking_system.caching import bump_generation
+from hostels.models import Rooms
+from search.index import get_index, search_index_enabled
+from .availability import interval_index_enabled, invalidate_interval_index
+from .models import ArchivedBooking, Booking
+
+ARCHIVABLE_STATUSES = ('approved', 'rejected')
+ARCHIVED_FIELDS = ('id', 'student_id_id', 'room_id_id', 'check_in_date', 'check_out_date',
+                   'status', 'created_at', 'updated_at')
+
+# Set while archive_batch deletes the bookings it has just copied. The
+# per-booking delete receivers then leave rollups alone, since archived
+# bookings stay counted, and leave the rest to the batch.
+_archiving = ContextVar('archiving', default=False)
+
+
+def archiving():
+    return _archiving.get()
+
+
+def archive_cutoff(keep_semesters, today=None):
+    """
+    The first day of the semester ``keep_semesters`` semesters before the
+    current one; keep_semesters=0 is the start of the current semester.
+    """
+    today = today or timezone.localdate()
+    index = today.year * 2 + (today.month > 6) - keep_semesters
+    return date(index // 2, 7 if index % 2 else 1, 1)
+
+
+def archivable(cutoff):
+    """Approved and rejected bookings whose stay ended before ``cutoff``."""
+    return Booking.objects.filter(status__in=ARCHIVABLE_STATUSES, check_out_date__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size=1000):
+    """
+    Move up to ``batch_size`` archivable bookings, oldest stays first, into
+    the archive in one transaction. Returns the room ids of the bookings
+    moved; an empty list means there is nothing left to archive.
+    """
+    with transaction.atomic():
+        rows = list(archivable(cutoff).select_for_update().order_by(
+            'check_out_date', 'id').values_list(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return []
+        ArchivedBooking.objects.bulk_create(
+            [ArchivedBooking(**dict(zip(ARCHIVED_FIELDS, row))) for row in rows], ignore_conflicts=True)
+        ids = [row[0] for row in rows]
+        token = _archiving.set(True)
+        try:
+            Booking.objects.filter(pk__in=ids).delete()
+        finally:
+            _archiving.reset(token)
+        if search_index_enabled():
+            get_index(Booking).remove(ids)
+    return [row[2] for row in rows]
+
+
+def archive_bookings(cutoff, batch_size=1000, max_batches=None, pause=0.0, progress=None):
+    """
+    Archive every approved or rejected booking whose stay ended before
+    ``cutoff``, in batches of ``batch_size``.
+
+    Each batch commits on its own, so an interrupted run (or one limited by
+    ``max_batches``) is resumed by running it again. ``pause`` sleeps
+    between batches to leave room for live traffic, and ``progress`` is
+    called with the running total after each batch.
+    """
+    if cutoff > timezone.localdate():
+        raise ValueError('The cutoff cannot be in the future.')
+    archived = batches = 0
+    room_ids = set()
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        archived += len(moved)
+        batches += 1
+        room_ids.update(moved)
+        if progress:
+            progress(archived)
+        if len(moved) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if archived:
+        bump_generation('availability')
+        if interval_index_enabled():
+            for hostel_id in set(Rooms.objects.filter(pk__in=room_ids).values_list('hostel_id', flat=True)):
+                invalidate_interval_index(hostel_id)
+    return {
+        'cutoff': cutoff.isoformat(),
+        'archived': archived,
+        'batches': batches,
+        'remaining': archivable(cutoff).count(),
+    }
@@ -0,0 +1,102 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from .models import Booking
+
+
+def available_rooms(queryset, check_in_date, check_out_date):
+    """
+    Narrow a Rooms queryset to the rooms with no approved booking overlapping
+    [check_in_date, check_out_date). Runs as a correlated NOT EXISTS that is
+    answered from the (room_id, status, check_in_date, check_out_date) index.
+    """
+    clashes = Booking.objects.approved().overlapping(
+        check_in_date, check_out_date).filter(room_id=OuterRef('pk'))
+    return queryset.filter(~Exists(clashes))
+
+
+class RoomIntervalIndex:
+    """
+    In-memory interval index of the approved stays of every room in one hostel.
+
+    Intervals are kept sorted by check-in date together with a running maximum
+    of check-out dates, so an overlap test is a single bisect.
+    """
+
+    def __init__(self, hostel_id, room_ids, intervals):
+        self.hostel_id = hostel_id
+        self.room_ids = list(room_ids)
+        self.built_at = time.monotonic()
+        self._starts = {}
+        self._max_ends = {}
+        by_room = defaultdict(list)
+        for room_id, check_in_date, check_out_date in intervals:
+            by_room[room_id].append((check_in_date, check_out_date))
+        for room_id, stays in by_room.items():
+            stays.sort()
+            max_ends = []
+            current = None
+            for _, check_out_date in stays:
+                current = check_out_date if current is None else max(current, check_out_date)
+                max_ends.append(current)
+            self._starts[room_id] = [check_in_date for check_in_date, _ in stays]
+            self._max_ends[room_id] = max_ends
+
+    @classmethod
+    def build(cls, hostel_id):
+        from hostels.models import Rooms
+
+        room_ids = Rooms.objects.filter(hostel_id=hostel_id).values_list('pk', flat=True)
+        intervals = Booking.objects.approved().filter(
+            room_id__hostel_id=hostel_id).values_list(
+                'room_id', 'check_in_date', 'check_out_date')
+        return cls(hostel_id, room_ids, intervals)
+
+    def is_free(self, room_id, check_in_date, check_out_date):
+        starts = self._starts.get(room_id)
+        if not starts:
+            return True
+        # Only stays starting before the requested check-out can overlap; of
+        # those, the furthest check-out decides.
+        position = bisect_left(starts, check_out_date)
+        return position == 0 or self._max_ends[room_id][position - 1] <= check_in_date
+
+    def free_room_ids(self, check_in_date, check_out_date):
+        return [room_id for room_id in self.room_ids
+                if self.is_free(room_id, check_in_date, check_out_date)]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def interval_index_enabled():
+    return getattr(settings, 'ROOM_INTERVAL_INDEX_ENABLED', False)
+
+
+def get_interval_index(hostel_id):
+    """
+    Return the cached index for a hostel, rebuilding it once it is older than
+    ROOM_INTERVAL_INDEX_TTL. Writes in this process drop the entry straight
+    away; the TTL bounds staleness from writes made by other processes.
+    """
+    ttl = getattr(settings, 'ROOM_INTERVAL_INDEX_TTL', 30)
+    index = _indexes.get(hostel_id)
+    if index is None or time.monotonic() - index.built_at > ttl:
+        index = RoomIntervalIndex.build(hostel_id)
+        with _indexes_lock:
+            _indexes[hostel_id] = index
+    return index
+
+
+def invalidate_interval_index(hostel_id=None):
+    with _indexes_lock:
+        if hostel_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(hostel_id, None)
@@ -0,0 +1,56 @@
+from django.core.mail import send_mail
+
+from outbox.queue import enqueue_many, handler
+from .models import Booking
+
+# Outbox topics for the booking lifecycle. Payloads carry the booking's id,
+# student, room and status, and ``previous_status`` for status changes.
+BOOKING_CREATED = 'booking.created'
+BOOKING_STATUS_CHANGED = 'booking.status_changed'
+
+
+def booking_created(booking):
+    enqueue_many(BOOKING_CREATED, [{
+        'booking_id': booking.pk, 'student_id': booking.student_id_id,
+        'room_id': booking.room_id_id, 'status': booking.status,
+    }])
+
+
+def statuses_changed(rows, status, previous_status):
+    """Record one status change per (booking_id, student_id, room_id) row."""
+    enqueue_many(BOOKING_STATUS_CHANGED, [{
+        'booking_id': pk, 'student_id': student_id, 'room_id': room_id,
+        'status': status, 'previous_status': previous_status,
+    } for pk, student_id, room_id in rows])
+
+
+def _current(payload):
+    return Booking.objects.select_related('student_id', 'room_id__hostel__custodian_id').filter(
+        pk=payload['booking_id']).first()
+
+
+@handler(BOOKING_CREATED)
+def notify_custodian(payload):
+    booking = _current(payload)
+    if booking is None:
+        return
+    room = booking.room_id
+    send_mail(
+        f'New booking request for room {room.room_number}',
+        f'{booking.student_id.email} requested room {room.room_number} in {room.hostel.name} '
+        f'from {booking.check_in_date} to {booking.check_out_date}.',
+        None, [room.hostel.custodian_id.email])
+
+
+@handler(BOOKING_STATUS_CHANGED)
+def notify_student(payload):
+    booking = _current(payload)
+    # Skip changes that a later one has already superseded.
+    if booking is None or booking.status != payload['status']:
+        return
+    room = booking.room_id
+    send_mail(
+        f'Your booking is {booking.status}',
+        f'Your booking of room {room.room_number} in {room.hostel.name} from {booking.check_in_date} '
+        f'to {booking.check_out_date} is now {booking.status}.',
+        None, [booking.student_id.email])
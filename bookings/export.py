@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CHUNK_SIZE = 500
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (column, lookup) pairs; each row is joined with its student, room and hostel.
+COLUMNS = [
+    ('id', 'id'),
+    ('status', 'status'),
+    ('check_in_date', 'check_in_date'),
+    ('check_out_date', 'check_out_date'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('student_id', 'student_id'),
+    ('student_username', 'student_id__username'),
+    ('student_email', 'student_id__email'),
+    ('student_first_name', 'student_id__first_name'),
+    ('student_last_name', 'student_id__last_name'),
+    ('room_id', 'room_id'),
+    ('room_number', 'room_id__room_number'),
+    ('room_type', 'room_id__room_type'),
+    ('price_per_semester', 'room_id__price_per_semester'),
+    ('hostel_id', 'room_id__hostel_id'),
+    ('hostel_name', 'room_id__hostel__name'),
+    ('hostel_location', 'room_id__hostel__location'),
+]
+HEADER = [column for column, _ in COLUMNS]
+_CREATED_AT, _ID = HEADER.index('created_at'), HEADER.index('id')
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield every row of ``queryset`` as a tuple of COLUMNS values, oldest
+    first.
+
+    Rows are read in keyset chunks over the (created_at, id) index. Each
+    chunk is its own query that resumes after the last row of the previous
+    one. Memory stays flat even on drivers such as mysqlclient, which load a
+    whole result set client-side.
+    """
+    lookups = [lookup for _, lookup in COLUMNS]
+    queryset = queryset.order_by('created_at', 'id').values_list(*lookups)
+    position = None
+    while True:
+        chunk = queryset
+        if position is not None:
+            created_at, pk = position
+            chunk = chunk.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        position = (rows[-1][_CREATED_AT], rows[-1][_ID])
+
+
+# Spreadsheets run cells that start with these as formulas.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _text(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _cell(value):
+    """
+    A CSV cell. Text that a spreadsheet would run as a formula, like a
+    username of ``=HYPERLINK(...)``, is prefixed with ``'`` so it stays text.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return _text(value)
+
+
+def iter_csv(rows, rows_per_write=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_cell(value) for value in row])
+        if count % rows_per_write == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_ndjson(rows, rows_per_write=500):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(HEADER, (None if value is None else _text(value) for value in row)))))
+        if len(lines) == rows_per_write:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def iter_export(queryset, fmt, chunk_size=CHUNK_SIZE):
+    rows = export_rows(queryset, chunk_size)
+    return iter_csv(rows) if fmt == 'csv' else iter_ndjson(rows)
+
+
+def streaming_export(queryset, fmt):
+    response = StreamingHttpResponse(iter_export(queryset, fmt), content_type=FORMATS[fmt])
+    filename = f'bookings-{timezone.now():%Y%m%d-%H%M%S}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
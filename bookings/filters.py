@@ -0,0 +1,20 @@
+import django_filters
+
+from .models import Booking
+
+
+class BookingExportFilter(django_filters.FilterSet):
+    """
+    The filters of BookingListCreateView.filterset_fields plus inclusive
+    date ranges on check-in, check-out and creation.
+    """
+    check_in_after = django_filters.DateFilter(field_name='check_in_date', lookup_expr='gte')
+    check_in_before = django_filters.DateFilter(field_name='check_in_date', lookup_expr='lte')
+    check_out_after = django_filters.DateFilter(field_name='check_out_date', lookup_expr='gte')
+    check_out_before = django_filters.DateFilter(field_name='check_out_date', lookup_expr='lte')
+    created_after = django_filters.DateFilter(field_name='created_at', lookup_expr='date__gte')
+    created_before = django_filters.DateFilter(field_name='created_at', lookup_expr='date__lte')
+
+    class Meta:
+        model = Booking
+        fields = ['status', 'room_id', 'student_id']
@@ -0,0 +1,21 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from bookings.allocation import allocate_rooms
+
+
+class Command(BaseCommand):
+    help = ('Approve or reject every pending booking in one pass, oldest request first, '
+            'moving requests to a free room of the same type when the requested one is taken.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostel', help='Only allocate rooms in this hostel (UUID).')
+        parser.add_argument('--no-reassign', action='store_true',
+                            help='Only ever grant the room that was requested.')
+        parser.add_argument('--dry-run', action='store_true', help='Report the outcome without writing.')
+
+    def handle(self, *args, **options):
+        summary = allocate_rooms(hostel_id=options['hostel'], reassign=not options['no_reassign'],
+                                 dry_run=options['dry_run'])
+        self.stdout.write(json.dumps(summary, indent=2))
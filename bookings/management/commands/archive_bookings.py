@@ -0,0 +1,35 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.archive import archivable, archive_bookings, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = ('Move approved and rejected bookings whose stay ended before a cutoff into the archive table, '
+            'in batches that each commit on their own. Run it again to resume an interrupted run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-semesters', type=int, default=2,
+                            help='Keep this many semesters before the current one live (default 2).')
+        parser.add_argument('--before', type=date.fromisoformat,
+                            help='Archive stays that ended before this date instead (YYYY-MM-DD).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches.')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived.')
+
+    def handle(self, *args, **options):
+        cutoff = options['before'] or archive_cutoff(options['keep_semesters'])
+        if options['dry_run']:
+            summary = {'cutoff': cutoff.isoformat(), 'archivable': archivable(cutoff).count()}
+        else:
+            try:
+                summary = archive_bookings(
+                    cutoff, batch_size=options['batch_size'], max_batches=options['max_batches'],
+                    pause=options['pause'],
+                    progress=lambda archived: self.stderr.write(f'{archived} bookings archived'))
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.rollups import rebuild_rollups, rollup_drift
+
+
+class Command(BaseCommand):
+    help = 'Compare the stored booking rollups with a full recompute and report any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostel', action='append', help='Only check this hostel (UUID); repeatable.')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the rollups when drift is found.')
+
+    def handle(self, *args, **options):
+        drift = rollup_drift(options['hostel'])
+        if not drift:
+            self.stdout.write('Rollups are consistent.')
+            return
+        self.stdout.write(json.dumps(drift, indent=2, default=str))
+        if options['fix']:
+            rebuild_rollups(options['hostel'])
+            self.stdout.write(f'Rebuilt rollups after {len(drift)} mismatches.')
+            return
+        raise CommandError(f'{len(drift)} rollup fields differ from a full recompute.')
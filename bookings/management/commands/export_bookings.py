@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.export import CHUNK_SIZE, FORMATS, iter_export
+from bookings.filters import BookingExportFilter
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = ('Stream bookings, joined with student, room and hostel fields, as CSV or NDJSON. '
+            'Accepts the same filters as /api/bookings/export/.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write; standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        for name in BookingExportFilter.base_filters:
+            parser.add_argument(f'--{name.replace("_", "-")}', dest=f'filter_{name}')
+
+    def handle(self, *args, **options):
+        data = {name: options[f'filter_{name}'] for name in BookingExportFilter.base_filters
+                if options[f'filter_{name}'] is not None}
+        filterset = BookingExportFilter(data, queryset=Booking.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(dict(filterset.errors))
+        chunks = iter_export(filterset.qs, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bookings.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-hostel, per-semester booking rollups from the bookings table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostel', action='append', help='Only rebuild this hostel (UUID); repeatable.')
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups(options['hostel'])
+        self.stdout.write(f'Rebuilt {rows} rollup rows.')
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('hostels', '0002_rooms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room_id', 'status', 'check_in_date', 'check_out_date'], name='booking_room_status_dates'),
+        ),
+    ]
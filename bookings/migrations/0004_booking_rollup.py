@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_created_id'),
+        ('hostels', '0003_rooms_created_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(max_length=7)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('expected_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hostel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='hostels.hostel')),
+            ],
+            options={
+                'ordering': ['hostel', 'semester'],
+                'unique_together': {('hostel', 'semester')},
+            },
+        ),
+    ]
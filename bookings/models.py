@@ -1,11 +1,23 @@
 import uuid
 from django.db import models
 from accounts.models import CustomUser
+from hostel_booking_system.tracking import LoadedValuesMixin
 from hostels.models import Rooms, Hostel
 # Create your models here.
 
 
-class Booking(models.Model):
+class BookingQuerySet(models.QuerySet):
+    def approved(self):
+        return self.filter(status='approved')
+
+    def overlapping(self, check_in_date, check_out_date):
+        # Stays are half-open [check_in, check_out): a booking ending on the
+        # day another starts does not clash with it.
+        return self.filter(check_in_date__lt=check_out_date,
+                           check_out_date__gt=check_in_date)
+
+
+class Booking(LoadedValuesMixin, models.Model):
     STATUS = [
         ('pending', 'pending'),
         ('approved', 'approved'),
@@ -23,9 +35,68 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         unique_together = ('student_id', 'room_id')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['room_id', 'status', 'check_in_date', 'check_out_date'],
+                         name='booking_room_status_dates'),
+            models.Index(fields=['created_at', 'id'], name='booking_created_id'),
+            # Filters and orderings of the booking list; see check_query_plans.
+            models.Index(fields=['status', 'created_at', 'id'], name='booking_status_created_id'),
+            models.Index(fields=['check_in_date', 'id'], name='booking_check_in_id'),
+            models.Index(fields=['check_out_date', 'id'], name='booking_check_out_id'),
+        ]
 
     def __str__(self):
         return f"Booking {self.id} by {self.student_id.username} for Room {self.room_id.room_number}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    A finished (approved or rejected) booking moved out of the live table by
+    bookings.archive, keeping its id, dates, status and timestamps. Archived
+    bookings still count towards their semester's BookingRollup.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    student_id = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_bookings')
+    room_id = models.ForeignKey(Rooms, on_delete=models.CASCADE, related_name='archived_bookings')
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    status = models.CharField(max_length=20, choices=Booking.STATUS)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-check_out_date']
+        indexes = [
+            models.Index(fields=['check_out_date', 'id'], name='archived_check_out_id'),
+        ]
+
+    def __str__(self):
+        return f"Archived booking {self.id}"
+
+
+class BookingRollup(models.Model):
+    """
+    Booking totals per hostel and semester, live and archived, kept up to
+    date by the signal handlers in bookings.signals. ``expected_revenue``
+    sums one semester's room price per approved booking.
+    """
+    hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='rollups')
+    semester = models.CharField(max_length=7)
+    approved_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    expected_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hostel', 'semester')
+        ordering = ['hostel', 'semester']
+
+    def __str__(self):
+        return f"{self.hostel_id} {self.semester}"
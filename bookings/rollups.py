@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from hostels.models import Rooms
+from .models import ArchivedBooking, Booking, BookingRollup
+
+STATUS_FIELDS = {'approved': 'approved_count', 'pending': 'pending_count', 'rejected': 'rejected_count'}
+ROLLUP_FIELDS = ['approved_count', 'pending_count', 'rejected_count', 'expected_revenue']
+
+
+def semester_of(day):
+    """Semesters run January-June (S1) and July-December (S2) by check-in date."""
+    return f'{day.year}-S{1 if day.month <= 6 else 2}'
+
+
+def new_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def add_bookings(deltas, hostel_id, price, status, check_in_date, count=1):
+    """Add ``count`` bookings' share of a rollup; a negative count removes it."""
+    fields = deltas[hostel_id, semester_of(check_in_date)]
+    fields[STATUS_FIELDS[status]] += count
+    if status == 'approved':
+        fields['expected_revenue'] += count * price
+
+
+def add_booking_changes(deltas, changes):
+    """
+    Add the deltas of bookings written in bulk, given as (old room_id, new
+    room_id, check_in_date, old status, new status) tuples. The rooms'
+    hostels and prices are read with one query.
+    """
+    changes = [(old_room_id, new_room_id, check_in_date, old_status, new_status)
+               for old_room_id, new_room_id, check_in_date, old_status, new_status in changes
+               if (old_room_id, old_status) != (new_room_id, new_status)]
+    rooms = {pk: (hostel_id, price) for pk, hostel_id, price in Rooms.objects.filter(
+        pk__in={room_id for change in changes for room_id in change[:2]}).values_list(
+        'pk', 'hostel_id', 'price_per_semester')}
+    for old_room_id, new_room_id, check_in_date, old_status, new_status in changes:
+        add_bookings(deltas, *rooms[old_room_id], old_status, check_in_date, -1)
+        add_bookings(deltas, *rooms[new_room_id], new_status, check_in_date)
+
+
+def add_room_moves(deltas, moves):
+    """
+    Move the bookings of rooms whose hostel or price changed between rollups,
+    given {room_id: ((old hostel_id, old price), (new hostel_id, new price))},
+    with one grouped query per booking table.
+    """
+    if not moves:
+        return
+    for model in (Booking, ArchivedBooking):
+        groups = model.objects.filter(room_id__in=list(moves)).order_by().values(
+            'room_id', 'status', year=ExtractYear('check_in_date'), month=ExtractMonth('check_in_date')
+        ).annotate(count=Count('pk'))
+        for group in groups:
+            old, new = moves[group['room_id']]
+            # Any day in the right half-year identifies the semester.
+            check_in_date = date(group['year'], group['month'], 1)
+            add_bookings(deltas, *old, group['status'], check_in_date, -group['count'])
+            add_bookings(deltas, *new, group['status'], check_in_date, group['count'])
+
+
+def apply_deltas(deltas, create=True):
+    """
+    Apply accumulated deltas with F() expressions, so concurrent writers
+    never overwrite each other's counts. Missing rows are created unless
+    ``create`` is False, which removals use so that a cascading hostel delete
+    does not resurrect rollups that were just deleted.
+    """
+    for (hostel_id, semester), fields in deltas.items():
+        changes = {field: value for field, value in fields.items() if value}
+        if not changes:
+            continue
+        rows = BookingRollup.objects.filter(hostel_id=hostel_id, semester=semester)
+        expressions = {field: F(field) + value for field, value in changes.items()}
+        if rows.update(**expressions) or not create:
+            continue
+        try:
+            with transaction.atomic():
+                BookingRollup.objects.create(hostel_id=hostel_id, semester=semester, **changes)
+        except IntegrityError:
+            rows.update(**expressions)
+
+
+def compute_rollups(hostel_ids=None):
+    """
+    Recompute rollups from the live and archived bookings with one grouped
+    query each. Returns {(hostel_id, semester): {field: value}}.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    for model in (Booking, ArchivedBooking):
+        bookings = model.objects.all()
+        if hostel_ids is not None:
+            bookings = bookings.filter(room_id__hostel_id__in=hostel_ids)
+        _add_grouped_rows(totals, bookings)
+    return totals
+
+
+def _add_grouped_rows(totals, bookings):
+    rows = bookings.order_by().values(
+        hostel_id=F('room_id__hostel_id'), year=ExtractYear('check_in_date'),
+        month=ExtractMonth('check_in_date'),
+    ).annotate(
+        approved_count=Count('pk', filter=Q(status='approved')),
+        pending_count=Count('pk', filter=Q(status='pending')),
+        rejected_count=Count('pk', filter=Q(status='rejected')),
+        expected_revenue=Sum('room_id__price_per_semester', filter=Q(status='approved')),
+    )
+    for row in rows:
+        semester = f"{row['year']}-S{1 if row['month'] <= 6 else 2}"
+        fields = totals[row['hostel_id'], semester]
+        for field in ROLLUP_FIELDS:
+            fields[field] += row[field] or 0
+
+
+def rebuild_rollups(hostel_ids=None):
+    """Replace the stored rollups (for the given hostels, or all) with a fresh recompute."""
+    with transaction.atomic():
+        totals = compute_rollups(hostel_ids)
+        stored = BookingRollup.objects.all()
+        if hostel_ids is not None:
+            stored = stored.filter(hostel_id__in=hostel_ids)
+        stored.delete()
+        BookingRollup.objects.bulk_create([
+            BookingRollup(hostel_id=hostel_id, semester=semester, **fields)
+            for (hostel_id, semester), fields in totals.items()
+        ], batch_size=1000)
+    return len(totals)
+
+
+def rollup_drift(hostel_ids=None):
+    """
+    Compare the stored rollups with a full recompute. Returns one entry per
+    mismatching field; an empty list means the rollups are consistent.
+    """
+    expected = compute_rollups(hostel_ids)
+    stored = BookingRollup.objects.all()
+    if hostel_ids is not None:
+        stored = stored.filter(hostel_id__in=hostel_ids)
+    actual = {(row['hostel_id'], row['semester']): row
+              for row in stored.values('hostel_id', 'semester', *ROLLUP_FIELDS)}
+    empty = dict.fromkeys(ROLLUP_FIELDS, 0)
+    drift = []
+    for key in sorted(expected.keys() | actual.keys(), key=lambda key: (str(key[0]), key[1])):
+        want, have = expected.get(key, empty), actual.get(key, empty)
+        for field in ROLLUP_FIELDS:
+            if Decimal(want[field]) != Decimal(have[field]):
+                drift.append({'hostel': key[0], 'semester': key[1], 'field': field,
+                              'stored': have[field], 'expected': want[field]})
+    return drift
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Booking
+from .models import ArchivedBooking, Booking, BookingRollup
 from hostels.models import Rooms
 
 
@@ -29,7 +29,39 @@ class StudentBookingSerializer(serializers.ModelSerializer):
         if data['check_in_date'] >= data['check_out_date']:
             raise serializers.ValidationError(
                 "Check-out date must be after check-in date.")
-        elif Booking.objects.filter(room_id=data['room_id'], status='approved').exists():
+        elif Booking.objects.approved().overlapping(
+                data['check_in_date'], data['check_out_date']).filter(room_id=data['room_id']).exists():
             raise serializers.ValidationError(
-                "The room has already been booked")
+                "The room has already been booked for these dates")
         return data
+
+
+class BookingDecisionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=5000)
+    status = serializers.ChoiceField(choices=['approved', 'rejected'])
+
+
+class AllocationSerializer(serializers.Serializer):
+    hostel = serializers.UUIDField(required=False)
+    reassign = serializers.BooleanField(default=True)
+    dry_run = serializers.BooleanField(default=False)
+
+
+class BookingExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+
+
+class BookingRollupSerializer(serializers.ModelSerializer):
+    hostel_name = serializers.ReadOnlyField(source='hostel.name')
+
+    class Meta:
+        model = BookingRollup
+        fields = ['hostel', 'hostel_name', 'semester', 'approved_count', 'pending_count',
+                  'rejected_count', 'expected_revenue', 'updated_at']
+
+
+class ArchivedBookingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedBooking
+        fields = '__all__'
@@ -0,0 +1,198 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from hostels.models import Rooms
+from .events import booking_created, statuses_changed
+from .models import Booking
+from .rollups import add_booking_changes, apply_deltas, new_deltas
+from .signals import bookings_bulk_updated
+
+# Upper bound on OR-ed date windows per UPDATE statement.
+CONFLICT_CHUNK_SIZE = 200
+
+
+def lock_rooms(room_ids):
+    """
+    Take row locks on the given rooms, always in primary-key order so that
+    concurrent callers cannot deadlock. Returns {room_id: hostel_id}.
+    """
+    return dict(Rooms.objects.select_for_update().filter(
+        pk__in=room_ids).order_by('pk').values_list('pk', 'hostel_id'))
+
+
+def _clash(stays, check_in_date, check_out_date):
+    return any(start < check_out_date and check_in_date < end for start, end in stays)
+
+
+def reject_conflicting_pending(approved, now=None):
+    """
+    Reject every pending booking that overlaps one of the ``approved``
+    (room_id, check_in_date, check_out_date) stays, using a few set-based
+    statements instead of one write per booking. The caller must hold the
+    rooms' locks. Returns the rejected (booking_id, student_id, room_id) rows.
+    """
+    now = now or timezone.now()
+    rejected = []
+    changes = []
+    for start in range(0, len(approved), CONFLICT_CHUNK_SIZE):
+        windows = [Q(room_id=room_id, check_in_date__lt=check_out_date,
+                     check_out_date__gt=check_in_date)
+                   for room_id, check_in_date, check_out_date in approved[start:start + CONFLICT_CHUNK_SIZE]]
+        rows = list(Booking.objects.filter(status='pending').filter(
+            reduce(or_, windows)).values_list('pk', 'student_id', 'room_id', 'check_in_date'))
+        if rows:
+            Booking.objects.filter(pk__in=[pk for pk, *_ in rows]).update(status='rejected', updated_at=now)
+            rejected += [(pk, student_id, room_id) for pk, student_id, room_id, _ in rows]
+            changes += [(room_id, room_id, check_in_date, 'pending', 'rejected')
+                        for _, _, room_id, check_in_date in rows]
+    deltas = new_deltas()
+    add_booking_changes(deltas, changes)
+    apply_deltas(deltas)
+    statuses_changed(rejected, 'rejected', 'pending')
+    return rejected
+
+
+def create_booking(serializer, student):
+    """
+    Save a new booking request while holding the room's row lock, so an
+    approval for the same room cannot slip in between the availability check
+    and the insert. Only requests for the same room wait on each other.
+    """
+    data = serializer.validated_data
+    room = data['room_id']
+    with transaction.atomic():
+        lock_rooms([room.pk])
+        if Booking.objects.approved().overlapping(
+                data['check_in_date'], data['check_out_date']).filter(room_id=room).exists():
+            raise ValidationError("The room has already been booked for these dates")
+        try:
+            with transaction.atomic():
+                booking = serializer.save(student_id=student)
+        except IntegrityError:
+            raise ValidationError("You have already requested this room.")
+        booking_created(booking)
+    return booking
+
+
+def update_booking(serializer, precondition=None):
+    """
+    Apply a booking update under the room lock. Approving is refused when it
+    would overlap another approved stay, and pending requests that compete
+    with the approval are rejected. ``precondition``, when given, runs once
+    the rooms are locked and raises to abort the update.
+    """
+    instance = serializer.instance
+    data = serializer.validated_data
+    room = data.get('room_id', instance.room_id)
+    check_in_date = data.get('check_in_date', instance.check_in_date)
+    check_out_date = data.get('check_out_date', instance.check_out_date)
+    previous_status = instance.status
+    rejected = []
+    with transaction.atomic():
+        hostels = lock_rooms({instance.room_id_id, room.pk})
+        if precondition is not None:
+            precondition()
+        if check_in_date >= check_out_date:
+            raise ValidationError("Check-out date must be after check-in date.")
+        approving = data.get('status', instance.status) == 'approved'
+        if approving and Booking.objects.approved().overlapping(check_in_date, check_out_date).filter(
+                room_id=room).exclude(pk=instance.pk).exists():
+            raise ValidationError("The room has already been booked for these dates")
+        booking = serializer.save()
+        if booking.status != previous_status:
+            statuses_changed([(booking.pk, booking.student_id_id, booking.room_id_id)],
+                             booking.status, previous_status)
+        if approving:
+            rejected = reject_conflicting_pending([(room.pk, check_in_date, check_out_date)])
+    if rejected:
+        bookings_bulk_updated.send(sender=Booking, room_ids={room.pk},
+                                   hostel_ids={hostels[room.pk]})
+    return booking
+
+
+def find_overlapping_approved(queryset=None):
+    """
+    Return pairs of approved bookings for the same room whose stays overlap.
+    Used by consistency checks; an empty list means the invariant holds.
+    """
+    queryset = Booking.objects.all() if queryset is None else queryset
+    rows = queryset.approved().order_by('room_id', 'check_in_date').values_list(
+        'pk', 'room_id', 'check_in_date', 'check_out_date')
+    overlaps = []
+    previous = None
+    for row in rows.iterator(chunk_size=2000):
+        if previous and previous[1] == row[1] and row[2] < previous[3]:
+            overlaps.append((previous[0], row[0]))
+        if not previous or previous[1] != row[1] or row[3] > previous[3]:
+            previous = row
+    return overlaps
+
+
+def decide_bookings(booking_ids, status):
+    """
+    Approve or reject many bookings in one transaction.
+
+    The rooms involved are locked first. Approvals are applied oldest request
+    first and skipped when they overlap a stay that is already approved (or
+    approved earlier in the same batch); pending requests that compete with
+    a new approval are rejected automatically.
+    """
+    booking_ids = list(dict.fromkeys(booking_ids))
+    now = timezone.now()
+    with transaction.atomic():
+        room_ids = set(Booking.objects.filter(pk__in=booking_ids).values_list('room_id', flat=True))
+        hostels = lock_rooms(room_ids)
+        # Re-read under the room locks so statuses cannot change underneath us.
+        bookings = list(Booking.objects.filter(pk__in=booking_ids).order_by('created_at', 'pk').values_list(
+            'pk', 'room_id', 'check_in_date', 'check_out_date', 'status', 'student_id'))
+        found = {pk for pk, *_ in bookings}
+        summary = {
+            'status': status,
+            'updated': [],
+            'unchanged': [pk for pk, *_, current, _ in bookings if current == status],
+            'conflicts': [],
+            'not_found': [pk for pk in booking_ids if pk not in found],
+            'auto_rejected': 0,
+        }
+        candidates = [booking for booking in bookings if booking[4] != status]
+
+        approved = []
+        if status == 'approved':
+            stays = defaultdict(list)
+            for room_id, check_in_date, check_out_date in Booking.objects.approved().filter(
+                    room_id__in=room_ids).values_list('room_id', 'check_in_date', 'check_out_date'):
+                stays[room_id].append((check_in_date, check_out_date))
+            for pk, room_id, check_in_date, check_out_date, *_ in candidates:
+                if _clash(stays[room_id], check_in_date, check_out_date):
+                    summary['conflicts'].append(pk)
+                    continue
+                stays[room_id].append((check_in_date, check_out_date))
+                approved.append((room_id, check_in_date, check_out_date))
+                summary['updated'].append(pk)
+        else:
+            summary['updated'] = [pk for pk, *_ in candidates]
+
+        if summary['updated']:
+            Booking.objects.filter(pk__in=summary['updated']).update(status=status, updated_at=now)
+            updated = set(summary['updated'])
+            deltas = new_deltas()
+            add_booking_changes(deltas, [(room_id, room_id, check_in_date, current, status)
+                                         for pk, room_id, check_in_date, _, current, _ in candidates
+                                         if pk in updated])
+            apply_deltas(deltas)
+            for previous_status in sorted({booking[4] for booking in candidates}):
+                statuses_changed([(pk, student_id, room_id) for pk, room_id, *_, current, student_id in candidates
+                                  if pk in updated and current == previous_status], status, previous_status)
+        if approved:
+            summary['auto_rejected'] = len(reject_conflicting_pending(approved, now))
+
+    if summary['updated']:
+        bookings_bulk_updated.send(sender=Booking, room_ids=room_ids,
+                                   hostel_ids=set(hostels.values()))
+    return summary
@@ -0,0 +1,146 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from hostel_booking_system.caching import bump_generation
+from hostels.models import Rooms
+from hostels.signals import rooms_bulk_saved
+from .archive import archiving
+from .availability import interval_index_enabled, invalidate_interval_index
+from .models import ArchivedBooking, Booking
+from .rollups import add_bookings, add_room_moves, apply_deltas, new_deltas
+
+# Sent after booking statuses are changed with queryset.update(), which skips
+# the per-instance save signals. ``reassigned_ids``, when given, lists the
+# bookings that were also moved to another room.
+bookings_bulk_updated = Signal()
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    if archiving():
+        # archive_bookings invalidates once all its batches are done.
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'approved' in (instance.status, loaded.get('status')):
+        bump_generation('availability')
+    if interval_index_enabled():
+        invalidate_interval_index(instance.room_id.hostel_id)
+
+
+@receiver([post_save, post_delete], sender=Rooms)
+def room_changed(sender, instance, **kwargs):
+    if interval_index_enabled():
+        invalidate_interval_index(instance.hostel_id)
+
+
+@receiver(rooms_bulk_saved)
+def rooms_bulk_changed(sender, hostel_ids, **kwargs):
+    if interval_index_enabled():
+        for hostel_id in hostel_ids:
+            invalidate_interval_index(hostel_id)
+
+
+@receiver(bookings_bulk_updated)
+def bookings_bulk_changed(sender, room_ids, hostel_ids, **kwargs):
+    bump_generation('availability')
+    if interval_index_enabled():
+        for hostel_id in hostel_ids:
+            invalidate_interval_index(hostel_id)
+
+
+ROLLUP_BOOKING_FIELDS = ('room_id_id', 'status', 'check_in_date')
+ROLLUP_ROOM_FIELDS = ('hostel_id', 'price_per_semester')
+
+
+def _room_values(booking, room_id):
+    if type(booking).room_id.is_cached(booking) and booking.room_id.pk == room_id:
+        return booking.room_id.hostel_id, booking.room_id.price_per_semester
+    return Rooms.objects.filter(pk=room_id).values_list(
+        'hostel_id', 'price_per_semester').first() or (None, None)
+
+
+def _stored_state(instance, fields):
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or any(field not in loaded for field in fields):
+        return None
+    return tuple(loaded[field] for field in fields)
+
+
+def _read_deferred_state(instance, fields):
+    # An instance loaded with some of these fields deferred does not know
+    # their stored values; read them before the save overwrites them.
+    loaded = getattr(instance, '_loaded_values', None)
+    missing = [field for field in fields if loaded is not None and field not in loaded]
+    if missing:
+        loaded.update(type(instance).objects.filter(pk=instance.pk).values(*missing).first() or {})
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving_rollup(sender, instance, **kwargs):
+    _read_deferred_state(instance, ROLLUP_BOOKING_FIELDS)
+
+
+@receiver(pre_save, sender=Rooms)
+def room_saving_rollup(sender, instance, **kwargs):
+    _read_deferred_state(instance, ROLLUP_ROOM_FIELDS)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved_rollup(sender, instance, created, **kwargs):
+    old = None if created else _stored_state(instance, ROLLUP_BOOKING_FIELDS)
+    new = tuple(getattr(instance, field) for field in ROLLUP_BOOKING_FIELDS)
+    if old == new:
+        return
+    deltas = new_deltas()
+    if old is not None:
+        hostel_id, price = _room_values(instance, old[0])
+        if hostel_id is not None:
+            add_bookings(deltas, hostel_id, price, old[1], old[2], -1)
+    hostel_id, price = _room_values(instance, new[0])
+    add_bookings(deltas, hostel_id, price, new[1], new[2])
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=ArchivedBooking)
+def booking_deleted_rollup(sender, instance, **kwargs):
+    if sender is Booking and archiving():
+        return
+    room_id, status, check_in_date = (_stored_state(instance, ROLLUP_BOOKING_FIELDS)
+                                      or tuple(getattr(instance, field) for field in ROLLUP_BOOKING_FIELDS))
+    hostel_id, price = _room_values(instance, room_id)
+    if hostel_id is None:
+        return
+    deltas = new_deltas()
+    add_bookings(deltas, hostel_id, price, status, check_in_date, -1)
+    apply_deltas(deltas, create=False)
+
+
+def _room_moves(rooms):
+    moves = {}
+    for room in rooms:
+        old = _stored_state(room, ROLLUP_ROOM_FIELDS)
+        new = tuple(getattr(room, field) for field in ROLLUP_ROOM_FIELDS)
+        if old is not None and old != new:
+            moves[room.pk] = (old, new)
+    return moves
+
+
+@receiver(post_save, sender=Rooms)
+def room_saved_rollup(sender, instance, created, **kwargs):
+    if created:
+        return
+    deltas = new_deltas()
+    add_room_moves(deltas, _room_moves([instance]))
+    apply_deltas(deltas)
+
+
+@receiver(rooms_bulk_saved)
+def rollups_rooms_bulk_changed(sender, rooms=(), fields=(), created=False, **kwargs):
+    # New rooms have no bookings yet, and only a new hostel or price moves
+    # the bookings of a room between rollups.
+    if created or not {'hostel', 'price_per_semester'} & set(fields):
+        return
+    deltas = new_deltas()
+    add_room_moves(deltas, _room_moves(rooms))
+    apply_deltas(deltas)
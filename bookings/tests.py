@@ -1,3 +1,962 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from itertools import count
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
+from django.conf import settings
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.models import CustomUser
+from hostel_booking_system import db_routing
+from hostel_booking_system.db_routing import ReplicaHealth
+from hostel_booking_system.pagination import EstimatedCountPaginator, estimated_count
+from hostel_booking_system.testing import QueryBudgetMixin, walk_cursor_pages
+from hostel_booking_system.throttling import RoleRateThrottle, SlidingWindow
+from hostels.bulk import bulk_update_rooms
+from hostels.models import Hostel, Rooms
+from benchmarks.seeding import seed_dataset
+from search.index import get_index
+from search.models import SearchSuffix
+from .allocation import Calendar, allocate_rooms
+from .archive import archive_bookings, archive_cutoff
+from .availability import RoomIntervalIndex
+from .services import find_overlapping_approved
+from .models import ArchivedBooking, Booking, BookingRollup
+from .rollups import rollup_drift
+
+
+class BookingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pass12345!', role='admin',
+            first_name='Ad', last_name='Min', username='admin')
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.other_student = CustomUser.objects.create_user(
+            email='other@example.com', password='pass12345!', role='student',
+            first_name='Oth', last_name='Er', username='other')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        self.room = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'), is_available=True)
+
+
+class BookingCreateTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        Booking.objects.create(
+            student_id=self.other_student, room_id=self.room, status='approved',
+            check_in_date=date(2025, 1, 10), check_out_date=date(2025, 5, 10))
+        self.client.force_authenticate(self.student)
+
+    def book(self, check_in, check_out):
+        return self.client.post(reverse('bookings-list-create'), {
+            'room_id': str(self.room.pk), 'check_in_date': check_in, 'check_out_date': check_out})
+
+    def test_overlapping_dates_are_rejected(self):
+        response = self.book('2025-04-01', '2025-07-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_overlapping_dates_are_accepted(self):
+        response = self.book('2025-05-10', '2025-09-01')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class RoomIntervalIndexTests(SimpleTestCase):
+    def test_is_free(self):
+        index = RoomIntervalIndex('hostel', ['a', 'b'], [
+            ('a', date(2025, 1, 1), date(2025, 6, 1)),
+            ('a', date(2025, 2, 1), date(2025, 3, 1)),
+            ('a', date(2025, 9, 1), date(2025, 12, 1)),
+        ])
+        self.assertFalse(index.is_free('a', date(2025, 5, 1), date(2025, 7, 1)))
+        self.assertTrue(index.is_free('a', date(2025, 6, 1), date(2025, 9, 1)))
+        self.assertFalse(index.is_free('a', date(2024, 12, 1), date(2026, 1, 1)))
+        self.assertTrue(index.is_free('a', date(2024, 1, 1), date(2025, 1, 1)))
+        self.assertEqual(index.free_room_ids(date(2025, 2, 1), date(2025, 2, 2)), ['b'])
+
+
+class BookingQueryBudgetTests(QueryBudgetMixin, BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.numbers = count()
+
+    def make_booking(self):
+        # A fresh hostel and room per booking, so any per-row lookup shows up.
+        hostel = Hostel.objects.create(
+            name=f'Hostel {next(self.numbers)}', location='Campus', capacity=10,
+            custodian_id=self.custodian)
+        room = Rooms.objects.create(
+            hostel=hostel, room_number='1', price_per_semester=Decimal('500'))
+        return Booking.objects.create(
+            student_id=self.student, room_id=room,
+            check_in_date=date(2025, 1, 1), check_out_date=date(2025, 6, 1))
+
+    def test_booking_list(self):
+        for user in (self.student, self.admin):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                self.assertQueryBudget(reverse('bookings-list-create'), self.make_booking, budget=2)
+
+    def test_booking_detail(self):
+        booking = self.make_booking()
+        for user in (self.student, self.admin):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                # The booking, then the timestamps behind its ETag that the role's fields leave out.
+                self.assertLessEqual(self.count_queries(reverse('booking-detail', args=[booking.pk])), 2)
+
+
+class BookingListTestCase(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        statuses = ['pending', 'approved', 'rejected']
+        for number in range(11):
+            room = Rooms.objects.create(
+                hostel=self.hostel, room_number=f'2{number:02d}', price_per_semester=Decimal('500'))
+            Booking.objects.create(
+                student_id=self.student if number % 2 else self.other_student, room_id=room,
+                status=statuses[number % 3],
+                check_in_date=date(2025, 1, 1 + number % 4), check_out_date=date(2025, 6, 1))
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('bookings-list-create')
+
+
+class BookingKeysetPaginationTests(BookingListTestCase):
+    def test_walks_every_ordering_and_filter(self):
+        for params in ({}, {'ordering': 'status'}, {'ordering': '-check_in_date'},
+                       {'status': 'pending'}, {'ordering': 'check_out_date', 'student_id': self.student.pk}):
+            with self.subTest(**params):
+                filters = {key: value for key, value in params.items() if key != 'ordering'}
+                ordering = params.get('ordering', '-created_at')
+                expected = [str(pk) for pk in Booking.objects.filter(**filters).order_by(
+                    ordering, '-pk' if ordering.startswith('-') else 'pk').values_list('pk', flat=True)]
+                forward, backward = walk_cursor_pages(self.client, self.url, {**params, 'page_size': 3})
+                self.assertEqual(forward, expected)
+                self.assertEqual(backward, forward)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 11)
+        self.assertIsNone(response.data['next'])
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(response.data['count'], 11)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncStudentBookingTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(7):
+            room = Rooms.objects.create(
+                hostel=self.hostel, room_number=f'3{number:02d}', price_per_semester=Decimal('500'))
+            Booking.objects.create(
+                student_id=self.student if number % 3 else self.other_student, room_id=room,
+                status=['pending', 'approved'][number % 2],
+                check_in_date=date(2025, 1, 1 + number % 4), check_out_date=date(2025, 6, 1))
+        self.client.force_authenticate(self.student)
+        self.url = reverse('bookings-list-create')
+        self.async_url = reverse('async-student-bookings')
+
+    def test_matches_sync_list(self):
+        for params in ({}, {'page': 2, 'page_size': 2}, {'ordering': 'check_in_date', 'status': 'pending'}):
+            with self.subTest(**params):
+                expected = self.client.get(self.url, params)
+                actual = self.client.get(self.async_url, params)
+                self.assertEqual(actual.status_code, status.HTTP_200_OK)
+                self.assertEqual(actual.content, expected.content.replace(
+                    self.url.encode(), self.async_url.encode()))
+                self.assertEqual(actual['ETag'], expected['ETag'])
+                self.assertEqual(self.client.get(self.async_url, params, HTTP_IF_NONE_MATCH=actual['ETag'])
+                                 .status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cursor_pages_cover_only_own_bookings(self):
+        expected = [str(pk) for pk in Booking.objects.filter(student_id=self.student).order_by(
+            '-created_at', '-pk').values_list('pk', flat=True)]
+        forward, backward = walk_cursor_pages(self.client, self.async_url, {'page_size': 2})
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, forward)
+
+    def test_only_students(self):
+        for user in (self.admin, self.custodian):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                self.assertEqual(self.client.get(self.async_url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookingRowSerializationTests(BookingListTestCase):
+    def assertSameContent(self, url, params):
+        fast = self.client.get(url, params)
+        with self.settings(FAST_LIST_SERIALIZATION_ENABLED=False):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_lists_match_serializers(self):
+        for user in (self.admin, self.student):
+            for params in ({}, {'page': 2, 'page_size': 4}, {'status': 'pending', 'ordering': 'check_in_date'},
+                           {'pagination': 'cursor', 'page_size': 4, 'ordering': '-status'}):
+                with self.subTest(role=user.role, **params):
+                    self.client.force_authenticate(user)
+                    self.assertSameContent(self.url, params)
+        self.client.force_authenticate(self.student)
+        self.assertSameContent(reverse('async-student-bookings'), {'ordering': 'check_out_date'})
+
+    def test_sparse_fieldsets(self):
+        self.client.force_authenticate(self.student)
+        for params in ({'fields': 'status,room_number,id'}, {'exclude': 'hostel_name,price',
+                                                              'pagination': 'cursor', 'page_size': 4}):
+            with self.subTest(**params):
+                self.assertSameContent(self.url, params)
+        response = self.client.get(self.url, {'fields': 'status,room_number,id'})
+        self.assertEqual(list(response.data['results'][0]), ['room_number', 'id', 'status'])
+        # room_id is write-only for students.
+        self.assertEqual(self.client.get(self.url, {'fields': 'room_id'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'fields': 'id,status'})
+        self.assertNotIn('JOIN', ctx.captured_queries[-1]['sql'])
+
+
+class BookingRequestTestCase(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.numbers = count()
+        self.client.force_authenticate(self.custodian)
+        self.url = reverse('booking-decisions')
+
+    def request(self, start, end, room=None):
+        number = next(self.numbers)
+        student = CustomUser.objects.create(
+            email=f'applicant{number}@example.com', username=f'applicant{number}', role='student',
+            first_name='App', last_name=str(number))
+        return Booking.objects.create(student_id=student, room_id=room or self.room,
+                                      check_in_date=start, check_out_date=end)
+
+    def statuses(self, *bookings):
+        return [Booking.objects.get(pk=booking.pk).status for booking in bookings]
+
+    def decide(self, bookings, decision):
+        return self.client.post(self.url, {'ids': [str(booking.pk) for booking in bookings],
+                                           'status': decision}, format='json')
+
+
+class BookingDecisionTests(BookingRequestTestCase):
+    def test_approval_rejects_competing_pending_requests(self):
+        winner = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        overlapping = self.request(date(2025, 5, 1), date(2025, 9, 1))
+        later = self.request(date(2025, 6, 1), date(2025, 9, 1))
+        response = self.decide([winner], 'approved')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], [winner.pk])
+        self.assertEqual(response.data['auto_rejected'], 1)
+        self.assertEqual(self.statuses(winner, overlapping, later), ['approved', 'rejected', 'pending'])
+
+    def test_oldest_request_wins_within_a_batch(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        second = self.request(date(2025, 3, 1), date(2025, 7, 1))
+        response = self.decide([second, first], 'approved')
+        self.assertEqual(response.data['updated'], [first.pk])
+        self.assertEqual(response.data['conflicts'], [second.pk])
+        self.assertEqual(self.statuses(first, second), ['approved', 'rejected'])
+
+    def test_existing_approval_blocks_new_one(self):
+        self.request(date(2025, 1, 1), date(2025, 6, 1))
+        Booking.objects.update(status='approved')
+        clash = self.request(date(2025, 2, 1), date(2025, 3, 1))
+        response = self.decide([clash], 'approved')
+        self.assertEqual(response.data['conflicts'], [clash.pk])
+        self.assertEqual(self.statuses(clash), ['pending'])
+
+    def test_bulk_reject_and_summary(self):
+        pending = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        rejected = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        Booking.objects.filter(pk=rejected.pk).update(status='rejected')
+        missing = '00000000-0000-0000-0000-000000000000'
+        response = self.client.post(self.url, {'ids': [str(pending.pk), str(rejected.pk), missing],
+                                               'status': 'rejected'}, format='json')
+        self.assertEqual(response.data['updated'], [pending.pk])
+        self.assertEqual(response.data['unchanged'], [rejected.pk])
+        self.assertEqual([str(pk) for pk in response.data['not_found']], [missing])
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def run(size):
+            bookings = []
+            for _ in range(size):
+                room = Rooms.objects.create(hostel=self.hostel, room_number=f'r{next(self.numbers)}',
+                                            price_per_semester=Decimal('500'))
+                bookings.append(self.request(date(2025, 1, 1), date(2025, 6, 1), room))
+                self.request(date(2025, 2, 1), date(2025, 3, 1), room)
+            with CaptureQueriesContext(connection) as ctx:
+                self.decide(bookings, 'approved')
+            return len(ctx.captured_queries)
+        self.assertEqual(run(2), run(20))
+
+    def test_students_cannot_decide(self):
+        self.client.force_authenticate(self.student)
+        booking = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        self.assertEqual(self.decide([booking], 'approved').status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class BookingAdminTests(QueryBudgetMixin, BookingRequestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.superuser = CustomUser.objects.create_superuser(
+            email='root@example.com', password='pass12345!', role='admin',
+            first_name='Ro', last_name='Ot', username='root')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:bookings_booking_changelist')
+
+    def make_booking(self):
+        number = next(self.numbers)
+        room = Rooms.objects.create(hostel=self.hostel, room_number=f'A{number}',
+                                    price_per_semester=Decimal('500'))
+        return self.request(date(2025, 1, 1), date(2025, 6, 1), room)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        # The first request also loads the session's user.
+        self.count_queries(self.url)
+        self.assertQueryBudget(self.url, self.make_booking, budget=4)
+        self.assertQueryBudget(self.url, self.make_booking, budget=4, params={'status__exact': 'pending'})
+
+    def test_bulk_approve_skips_clashes_and_rejects_competitors(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        clashing = self.request(date(2025, 3, 1), date(2025, 7, 1))
+        competitor = self.request(date(2025, 5, 1), date(2025, 8, 1))
+        other = self.make_booking()
+        with patch('bookings.admin.DECISION_BATCH_SIZE', 2):
+            response = self.client.post(self.url, {
+                'action': 'approve_selected',
+                '_selected_action': [str(booking.pk) for booking in (clashing, first, other)]}, follow=True)
+        self.assertEqual(self.statuses(first, clashing, competitor, other),
+                         ['approved', 'rejected', 'rejected', 'approved'])
+        self.assertContains(response, '2 booking(s) approved')
+
+    def test_bulk_reject(self):
+        bookings = [self.request(date(2025, 1, 1), date(2025, 6, 1)) for _ in range(3)]
+        self.client.post(self.url, {'action': 'reject_selected',
+                                    '_selected_action': [str(booking.pk) for booking in bookings[:2]]})
+        self.assertEqual(self.statuses(*bookings), ['rejected', 'rejected', 'pending'])
+
+
+class EstimatedCountTests(BookingRequestTestCase):
+    def test_unfiltered_tables_use_the_estimate(self):
+        bookings = [self.request(date(2025, 1, 1), date(2025, 6, 1)) for _ in range(3)]
+        bookings[1].delete()
+        self.assertEqual(estimated_count(Booking.objects.all()), 3)
+        self.assertIsNone(estimated_count(Booking.objects.filter(status='pending')))
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=3):
+            self.assertEqual(EstimatedCountPaginator(Booking.objects.all(), 50).count, 3)
+            self.assertEqual(EstimatedCountPaginator(Booking.objects.filter(status='pending'), 50).count, 2)
+        self.assertEqual(EstimatedCountPaginator(Booking.objects.all(), 50).count, 2)
+
+
+class BookingContentionTests(BookingRequestTestCase):
+    def test_patch_approval_refuses_overlap(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        second = self.request(date(2025, 3, 1), date(2025, 7, 1))
+        url = reverse('booking-detail', args=[first.pk])
+        self.assertEqual(self.client.patch(url, {'status': 'approved'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.statuses(second), ['rejected'])
+
+        Booking.objects.filter(pk=second.pk).update(status='pending')
+        response = self.client.patch(reverse('booking-detail', args=[second.pk]), {'status': 'approved'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(find_overlapping_approved(), [])
+
+    def test_duplicate_request_is_a_validation_error(self):
+        self.client.force_authenticate(self.student)
+        payload = {'room_id': str(self.room.pk), 'check_in_date': '2025-01-01', 'check_out_date': '2025-02-01'}
+        url = reverse('bookings-list-create')
+        self.assertEqual(self.client.post(url, payload).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(url, payload).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_status_changes_honour_if_match(self):
+        booking = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        url = reverse('booking-detail', args=[booking.pk])
+        etag = self.client.get(url)['ETag']
+        self.decide([booking], 'rejected')
+        response = self.client.patch(url, {'status': 'approved'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.statuses(booking), ['rejected'])
+
+        etag = self.client.get(url)['ETag']
+        response = self.client.patch(url, {'status': 'approved'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.statuses(booking), ['approved'])
+
+    def test_polling_students_get_not_modified(self):
+        booking = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        self.client.force_authenticate(booking.student_id)
+        urls = [reverse('bookings-list-create'), reverse('booking-detail', args=[booking.pk])]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+        self.client.force_authenticate(self.custodian)
+        self.decide([booking], 'approved')
+        self.client.force_authenticate(booking.student_id)
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_find_overlapping_approved(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        inner = self.request(date(2025, 2, 1), date(2025, 3, 1))
+        tail = self.request(date(2025, 5, 1), date(2025, 7, 1))
+        self.request(date(2025, 7, 1), date(2025, 8, 1))
+        Booking.objects.update(status='approved')
+        self.assertEqual(sorted(find_overlapping_approved()),
+                         sorted([(first.pk, inner.pk), (first.pk, tail.pk)]))
+
+
+class CalendarTests(SimpleTestCase):
+    def test_overlapping_stays_are_merged(self):
+        calendar = Calendar()
+        calendar.add(date(2025, 3, 1), date(2025, 4, 1))
+        calendar.add(date(2025, 1, 1), date(2025, 6, 1))
+        calendar.add(date(2025, 9, 1), date(2025, 10, 1))
+        calendar.add(date(2025, 5, 1), date(2025, 7, 1))
+        self.assertEqual(calendar.stays, [(date(2025, 1, 1), date(2025, 7, 1)),
+                                          (date(2025, 9, 1), date(2025, 10, 1))])
+        self.assertFalse(calendar.is_free(date(2025, 6, 15), date(2025, 8, 1)))
+        self.assertTrue(calendar.is_free(date(2025, 7, 1), date(2025, 9, 1)))
+        self.assertFalse(calendar.is_free(date(2024, 1, 1), date(2026, 1, 1)))
+
+
+class BookingAllocationTests(BookingRequestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('booking-allocate')
+        self.twin = Rooms.objects.create(hostel=self.hostel, room_number='102', is_available=True,
+                                         price_per_semester=Decimal('500'))
+        self.suite = Rooms.objects.create(hostel=self.hostel, room_number='103', room_type='suite',
+                                          is_available=True, price_per_semester=Decimal('900'))
+
+    def rooms(self, *bookings):
+        return [Booking.objects.get(pk=booking.pk).room_id_id for booking in bookings]
+
+    def test_oldest_request_keeps_room_and_later_one_moves(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        second = self.request(date(2025, 3, 1), date(2025, 7, 1))
+        third = self.request(date(2025, 2, 1), date(2025, 4, 1))
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['approved'], response.data['reassigned'], response.data['rejected']),
+                         (2, 1, 1))
+        self.assertEqual(self.statuses(first, second, third), ['approved', 'approved', 'rejected'])
+        self.assertEqual(self.rooms(first, second), [self.room.pk, self.twin.pk])
+        self.assertEqual(find_overlapping_approved(), [])
+
+    def test_reassign_can_be_disabled(self):
+        self.request(date(2025, 1, 1), date(2025, 6, 1))
+        second = self.request(date(2025, 3, 1), date(2025, 7, 1))
+        allocate_rooms(reassign=False)
+        self.assertEqual(self.statuses(second), ['rejected'])
+        self.assertEqual(self.rooms(second), [self.room.pk])
+
+    def test_closed_rooms_and_existing_stays_are_respected(self):
+        Rooms.objects.filter(pk=self.twin.pk).update(is_available=False)
+        held = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        Booking.objects.filter(pk=held.pk).update(status='approved')
+        clash = self.request(date(2025, 2, 1), date(2025, 3, 1))
+        allocate_rooms()
+        self.assertEqual(self.statuses(clash), ['rejected'])
+
+    def test_student_gets_one_room_per_period(self):
+        first = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        second = Booking.objects.create(student_id=first.student_id, room_id=self.twin,
+                                        check_in_date=date(2025, 2, 1), check_out_date=date(2025, 3, 1))
+        allocate_rooms()
+        self.assertEqual(self.statuses(first, second), ['approved', 'rejected'])
+
+    def test_dry_run_writes_nothing(self):
+        booking = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        response = self.client.post(self.url, {'dry_run': True}, format='json')
+        self.assertEqual(response.data['approved'], 1)
+        self.assertEqual(self.statuses(booking), ['pending'])
+
+    def test_hostel_scope(self):
+        other = Hostel.objects.create(name='South', location='Campus', capacity=5, custodian_id=self.custodian)
+        outside = self.request(date(2025, 1, 1), date(2025, 6, 1), Rooms.objects.create(
+            hostel=other, room_number='1', is_available=True, price_per_semester=Decimal('500')))
+        inside = self.request(date(2025, 1, 1), date(2025, 6, 1))
+        self.client.post(self.url, {'hostel': str(self.hostel.pk)}, format='json')
+        self.assertEqual(self.statuses(inside, outside), ['approved', 'pending'])
+
+    def test_query_count_does_not_grow(self):
+        def run(size):
+            Booking.objects.all().delete()
+            for _ in range(size):
+                self.request(date(2025, 1, 1), date(2025, 6, 1))
+            with CaptureQueriesContext(connection) as ctx:
+                allocate_rooms()
+            return len(ctx.captured_queries)
+        self.assertEqual(run(3), run(30))
+
+    def test_only_admins_can_allocate(self):
+        self.client.force_authenticate(self.custodian)
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookingRollupTests(BookingRequestTestCase):
+    def rollup(self, semester='2025-S1', hostel=None):
+        return BookingRollup.objects.filter(hostel=hostel or self.hostel, semester=semester).values(
+            'approved_count', 'pending_count', 'rejected_count', 'expected_revenue').first()
+
+    def test_single_writes_keep_rollups_in_step(self):
+        first = self.request(date(2025, 1, 1), date(2025, 3, 1))
+        second = self.request(date(2025, 8, 1), date(2025, 9, 1))
+        self.client.patch(reverse('booking-detail', args=[first.pk]), {'status': 'approved'})
+        self.assertEqual(self.rollup(), {'approved_count': 1, 'pending_count': 0, 'rejected_count': 0,
+                                         'expected_revenue': Decimal('500')})
+        self.client.patch(reverse('booking-detail', args=[second.pk]), {'check_in_date': '2025-06-01'})
+        self.assertEqual(self.rollup()['pending_count'], 1)
+        self.assertEqual(self.rollup('2025-S2')['pending_count'], 0)
+        self.room.price_per_semester = Decimal('650')
+        self.room.save()
+        self.assertEqual(self.rollup()['expected_revenue'], Decimal('650'))
+        Booking.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.rollup()['approved_count'], 0)
+        deferred = Booking.objects.only('pk').get(pk=second.pk)
+        deferred.status = 'rejected'
+        deferred.save()
+        self.assertEqual(self.rollup()['rejected_count'], 1)
+        self.assertEqual(rollup_drift(), [])
+
+    def test_room_moving_hostel_moves_its_totals(self):
+        booking = self.request(date(2025, 1, 1), date(2025, 3, 1))
+        Booking.objects.filter(pk=booking.pk).update(status='approved')
+        call_command('rebuild_rollups', stdout=StringIO())
+        other = Hostel.objects.create(name='South', location='Campus', capacity=5, custodian_id=self.custodian)
+        room = Rooms.objects.get(pk=self.room.pk)
+        room.hostel = other
+        room.save()
+        self.assertEqual(self.rollup(hostel=other)['expected_revenue'], Decimal('500'))
+        self.assertEqual(self.rollup()['approved_count'], 0)
+        self.assertEqual(rollup_drift(), [])
+
+    def test_bulk_paths_and_cascades_stay_consistent(self):
+        bookings = [self.request(date(2025, 1, 1), date(2025, 3, 1)) for _ in range(3)]
+        self.decide(bookings[:1], 'approved')
+        self.assertEqual(self.rollup()['rejected_count'], 2)
+        twin = Rooms.objects.create(hostel=self.hostel, room_number='102', is_available=True,
+                                    price_per_semester=Decimal('300'))
+        self.request(date(2025, 1, 1), date(2025, 3, 1), twin)
+        allocate_rooms()
+        self.assertEqual(rollup_drift(), [])
+        Rooms.objects.get(pk=twin.pk).delete()
+        self.assertEqual(rollup_drift(), [])
+        Hostel.objects.get(pk=self.hostel.pk).delete()
+        self.assertFalse(BookingRollup.objects.exists())
+
+    def test_bulk_writes_apply_deltas_without_rebuilding(self):
+        bookings = [self.request(date(2025, 1, 1), date(2025, 3, 1)) for _ in range(2)]
+        self.request(date(2025, 8, 1), date(2025, 9, 1))
+        # A rebuild would repair drift in a semester the writes never touch.
+        BookingRollup.objects.filter(semester='2025-S2').update(rejected_count=9)
+        self.decide(bookings[:1], 'approved')
+        bulk_update_rooms([{'room_id': str(self.room.pk), 'price_per_semester': '700'}])
+        bulk_update_rooms([{'room_id': str(self.room.pk), 'is_available': False}])
+        self.assertEqual(self.rollup(), {'approved_count': 1, 'pending_count': 0, 'rejected_count': 1,
+                                         'expected_revenue': Decimal('700')})
+        self.assertEqual([(row['semester'], row['field']) for row in rollup_drift()],
+                         [('2025-S2', 'rejected_count')])
+
+    def test_read_endpoint_is_admin_only_and_flat(self):
+        for _ in range(5):
+            self.request(date(2025, 1, 1), date(2025, 3, 1))
+        self.assertEqual(self.client.get(reverse('booking-rollups')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('booking-rollups'), {'hostel': str(self.hostel.pk)})
+        self.assertEqual(response.data['results'][0]['pending_count'], 5)
+        # Count, page and the hostel filter's own lookup.
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+
+    def test_checker_reports_drift(self):
+        self.request(date(2025, 1, 1), date(2025, 3, 1))
+        BookingRollup.objects.update(pending_count=7)
+        with self.assertRaises(CommandError):
+            call_command('check_rollups', stdout=StringIO())
+        call_command('check_rollups', '--fix', stdout=StringIO())
+        self.assertEqual(rollup_drift(), [])
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class BookingArchiveTests(BookingRequestTestCase):
+    def history(self):
+        old = [self.request(date(2022, 1, 1), date(2022, 5, 1)) for _ in range(5)]
+        Booking.objects.filter(pk__in=[booking.pk for booking in old[:3]]).update(status='approved')
+        Booking.objects.filter(pk__in=[booking.pk for booking in old[3:]]).update(status='rejected')
+        pending = self.request(date(2022, 1, 1), date(2022, 5, 1))
+        recent = self.request(date(2025, 1, 1), date(2025, 5, 1))
+        Booking.objects.filter(pk=recent.pk).update(status='approved')
+        call_command('rebuild_rollups', stdout=StringIO())
+        return old, pending, recent
+
+    def test_cutoff_counts_back_whole_semesters(self):
+        self.assertEqual(archive_cutoff(0, date(2025, 3, 15)), date(2025, 1, 1))
+        self.assertEqual(archive_cutoff(1, date(2025, 3, 15)), date(2024, 7, 1))
+        self.assertEqual(archive_cutoff(3, date(2025, 9, 1)), date(2024, 1, 1))
+
+    def test_only_finished_decisions_move_and_rollups_keep_them(self):
+        old, pending, recent = self.history()
+        summary = archive_bookings(date(2024, 1, 1), batch_size=2)
+        self.assertEqual((summary['archived'], summary['batches'], summary['remaining']), (5, 3, 0))
+        self.assertEqual(set(ArchivedBooking.objects.values_list('pk', flat=True)),
+                         {booking.pk for booking in old})
+        self.assertEqual(set(Booking.objects.values_list('pk', flat=True)), {pending.pk, recent.pk})
+        index = get_index(Booking)
+        self.assertFalse(SearchSuffix.objects.filter(
+            model=index.label, object_id__in=[index.object_id(booking.pk) for booking in old]).exists())
+        self.assertTrue(SearchSuffix.objects.filter(model=index.label, object_id=index.object_id(recent.pk)).exists())
+        archived = ArchivedBooking.objects.get(pk=old[0].pk)
+        self.assertEqual((archived.status, archived.room_id_id, archived.created_at),
+                         ('approved', self.room.pk, old[0].created_at))
+        self.assertEqual(rollup_drift(), [])
+        self.room.price_per_semester = Decimal('650')
+        self.room.save()
+        self.assertEqual(rollup_drift(), [])
+        Rooms.objects.get(pk=self.room.pk).delete()
+        self.assertFalse(ArchivedBooking.objects.exists())
+        self.assertEqual(rollup_drift(), [])
+
+    def test_interrupted_runs_resume(self):
+        self.history()
+        out = StringIO()
+        call_command('archive_bookings', '--before', '2024-01-01', '--batch-size', '2',
+                     '--max-batches', '1', stdout=out, stderr=StringIO())
+        self.assertEqual(json.loads(out.getvalue())['remaining'], 3)
+        summary = archive_bookings(date(2024, 1, 1), batch_size=2)
+        self.assertEqual((summary['archived'], summary['remaining']), (3, 0))
+        self.assertEqual(ArchivedBooking.objects.count(), 5)
+        with self.assertRaises(CommandError):
+            call_command('archive_bookings', '--before', '2999-01-01', stdout=StringIO())
+
+    def test_archived_student_can_book_the_room_again(self):
+        old, _, _ = self.history()
+        archive_bookings(date(2024, 1, 1))
+        self.client.force_authenticate(old[0].student_id)
+        response = self.client.post(reverse('bookings-list-create'), {
+            'room_id': str(self.room.pk), 'check_in_date': '2026-01-01', 'check_out_date': '2026-05-01'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_archive_endpoint_is_admin_only_and_read_only(self):
+        old, _, _ = self.history()
+        archive_bookings(date(2024, 1, 1))
+        url = reverse('booking-archive')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url, {'status': 'rejected', 'room_id__hostel': str(self.hostel.pk)})
+        self.assertEqual(response.data['count'], 2)
+        detail = reverse('archived-booking-detail', args=[old[0].pk])
+        self.assertEqual(self.client.get(detail).data['id'], str(old[0].pk))
+        self.assertEqual(self.client.delete(detail).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(self.client.post(url, {}).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class BookingExportTests(BookingRequestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('booking-export')
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_rows_are_joined_and_filtered(self):
+        early = self.request(date(2025, 1, 1), date(2025, 3, 1))
+        late = self.request(date(2025, 9, 1), date(2025, 12, 1))
+        Booking.objects.filter(pk=late.pk).update(status='approved')
+        rows = list(csv.DictReader(StringIO(self.export())))
+        self.assertEqual([row['id'] for row in rows], [str(early.pk), str(late.pk)])
+        self.assertEqual((rows[0]['hostel_name'], rows[0]['room_number'], rows[0]['price_per_semester']),
+                         ('North', '101', '500.00'))
+        self.assertEqual(rows[0]['student_email'], early.student_id.email)
+
+        rows = list(csv.DictReader(StringIO(self.export(status='approved'))))
+        self.assertEqual([row['id'] for row in rows], [str(late.pk)])
+        lines = self.export(output='ndjson', check_in_after='2025-06-01').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [str(late.pk)])
+
+    def test_csv_cells_are_not_formulas(self):
+        booking = self.request(date(2025, 1, 1), date(2025, 3, 1))
+        CustomUser.objects.filter(pk=booking.student_id.pk).update(
+            first_name='=HYPERLINK("http://example.com")', last_name='-1+2')
+        Hostel.objects.filter(pk=self.hostel.pk).update(location='@SUM(A1)')
+        row = next(csv.DictReader(StringIO(self.export())))
+        self.assertEqual((row['student_first_name'], row['student_last_name'], row['hostel_location']),
+                         ('\'=HYPERLINK("http://example.com")', "'-1+2", "'@SUM(A1)"))
+        self.assertEqual(row['price_per_semester'], '500.00')
+        # NDJSON is not opened by spreadsheets and keeps the values as stored.
+        line = json.loads(self.export(output='ndjson'))
+        self.assertEqual(line['hostel_location'], '@SUM(A1)')
+
+    def test_chunks_resume_without_gaps(self):
+        bookings = [self.request(date(2025, 1, 1), date(2025, 2, 1)) for _ in range(7)]
+        Booking.objects.update(created_at=timezone.now())
+        out = StringIO()
+        call_command('export_bookings', '--format', 'ndjson', '--chunk-size', '3', stdout=out)
+        self.assertEqual(sorted(json.loads(line)['id'] for line in out.getvalue().splitlines()),
+                         sorted(str(booking.pk) for booking in bookings))
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.custodian)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_memory_stays_bounded_on_a_large_table(self):
+        seed_dataset(hostels=5, rooms_per_hostel=200, students=2000, bookings=20000)
+        response = self.client.get(self.url)
+        size = 0
+        tracemalloc.start()
+        for chunk in response.streaming_content:
+            size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertGreater(size, 4_000_000)
+        # One chunk of rows at a time, a small fraction of the full export.
+        self.assertLess(peak, size / 2)
+
+
+THROTTLE_RATES = {
+    'student': '100/min',
+    'student.bookings_write': '2/min',
+    'custodian': '100/min',
+    'capacity.bookings': '5/min',
+}
+
+
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_RESERVED_SHARE=0.4,
+                   REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': THROTTLE_RATES})
+class BookingThrottleTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # A fixed clock, so no window boundary falls inside a test.
+        clock = patch.object(RoleRateThrottle, 'timer', return_value=6000.0)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.url = reverse('bookings-list-create')
+        self.rooms = [Rooms.objects.create(hostel=self.hostel, room_number=f'4{number:02d}',
+                                           price_per_semester=Decimal('500')) for number in range(3)]
+
+    def request_room(self, room):
+        return self.client.post(self.url, {'room_id': room.pk, 'check_in_date': '2025-01-01',
+                                           'check_out_date': '2025-06-01'})
+
+    def test_booking_requests_are_limited_per_student(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.request_room(self.rooms[0]).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.request_room(self.rooms[1]).status_code, status.HTTP_201_CREATED)
+        response = self.request_room(self.rooms[2])
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(self.other_student)
+        self.assertEqual(self.request_room(self.rooms[2]).status_code, status.HTTP_201_CREATED)
+
+    def test_capacity_is_reserved_for_staff(self):
+        # Students may use 3 of the 5 requests a minute; the last 2 are kept for staff.
+        self.client.force_authenticate(self.student)
+        codes = [self.client.get(self.url).status_code for _ in range(2)]
+        self.client.force_authenticate(self.other_student)
+        codes += [self.client.get(self.url).status_code for _ in range(2)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+        self.client.force_authenticate(self.custodian)
+        codes = [self.client.get(self.url).status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_can_be_disabled(self):
+        self.client.force_authenticate(self.student)
+        for room in self.rooms:
+            self.assertEqual(self.request_room(room).status_code, status.HTTP_201_CREATED)
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_previous_window_slides_out(self):
+        window = SlidingWindow('test', 60)
+        for _ in range(10):
+            self.assertIsNone(window.acquire(10, now=600))
+        # Full: the next window has to start and slide 10% past this one.
+        self.assertAlmostEqual(window.acquire(10, now=659), 7, places=3)
+        # Halfway through the next window half of the previous one still counts.
+        self.assertAlmostEqual(window.acquire(5, now=690), 6, places=3)
+        self.assertIsNone(window.acquire(10, now=690))
+        self.assertIsNone(window.acquire(10, now=719))
+
+    def test_rejected_hits_are_not_counted(self):
+        window = SlidingWindow('test', 1)
+        self.assertIsNone(window.acquire(1, now=5.0))
+        for _ in range(5):
+            self.assertIsNotNone(window.acquire(1, now=5.5))
+        self.assertAlmostEqual(window.acquire(1, now=6.5), 0.5, places=3)
+        self.assertIsNone(window.acquire(1, now=7.0))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5, CATALOG_CACHE_ENABLED=False,
+                   ALLOWED_HOSTS=['*'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    A second SQLite file stands in for the replica; replicate() copies the
+    primary into it, and it lags the primary until then.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.settings['replica'] = {**connections.settings['default'],
+                                           'NAME': os.path.join(cls.directory.name, 'replica.sqlite3')}
+        # Added after the test runner has set up its databases, which it
+        # would otherwise try to create for this alias.
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.directory.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        patcher = patch.object(db_routing, 'health', ReplicaHealth())
+        self.health = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        self.room = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'), is_available=True)
+        self.replicate()
+        self.url = reverse('bookings-list-create')
+        self.client = APIClient()
+
+    def replicate(self):
+        connections['default'].ensure_connection()
+        connections['replica'].ensure_connection()
+        connections['default'].connection.backup(connections['replica'].connection)
+
+    def listed(self, user, url=None):
+        self.client.force_authenticate(user)
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_reads_come_from_the_replica(self):
+        booking = Booking.objects.create(student_id=self.student, room_id=self.room,
+                                         check_in_date=date(2025, 1, 1), check_out_date=date(2025, 6, 1))
+        self.assertEqual(self.listed(self.custodian), [])
+        self.assertEqual(self.listed(self.student, reverse('async-student-bookings')), [])
+        self.replicate()
+        self.assertEqual(self.listed(self.custodian), [str(booking.pk)])
+
+    def test_writers_read_their_own_writes(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(self.url, {'room_id': self.room.pk, 'check_in_date': '2025-01-01',
+                                               'check_out_date': '2025-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        booking_id = response.data['id']
+        self.assertEqual(self.listed(self.student), [booking_id])
+        self.assertEqual(self.listed(self.student, reverse('async-student-bookings')), [booking_id])
+        # Others still read the replica, and so does the student once the window has passed.
+        self.assertEqual(self.listed(self.custodian), [])
+        cache.delete(db_routing.pin_key(self.student.pk))
+        self.assertEqual(self.listed(self.student), [])
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        replica = connections['replica']
+        replica.close()
+        name, replica.settings_dict['NAME'] = replica.settings_dict['NAME'], '/nonexistent/replica.sqlite3'
+        self.addCleanup(replica.settings_dict.__setitem__, 'NAME', name)
+        booking = Booking.objects.create(student_id=self.student, room_id=self.room,
+                                         check_in_date=date(2025, 1, 1), check_out_date=date(2025, 6, 1))
+        self.assertEqual(self.listed(self.custodian), [str(booking.pk)])
+        self.assertFalse(self.health.is_healthy('replica'))
+        self.assertIn('replica', self.health.down_until)
+
+    @override_settings(REPLICA_RETRY_SECONDS=30, REPLICA_CHECK_INTERVAL=5)
+    def test_replicas_are_rechecked(self):
+        now = [100.0]
+        with patch.object(ReplicaHealth, 'timer', lambda self: now[0]):
+            self.assertTrue(self.health.is_healthy('replica'))
+            with patch.object(db_routing, 'replica_lag', side_effect=AssertionError):
+                now[0] += 4
+                self.assertTrue(self.health.is_healthy('replica'))
+            with patch.object(db_routing, 'replica_lag', return_value=None):
+                now[0] += 2
+                self.assertFalse(self.health.is_healthy('replica'))
+            now[0] += 29
+            self.assertFalse(self.health.is_healthy('replica'))
+            now[0] += 2
+            self.assertTrue(self.health.is_healthy('replica'))
+
+    def test_transactions_read_the_primary(self):
+        router = db_routing.PrimaryReplicaRouter()
+        token = db_routing._read_alias.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Booking), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Booking), 'default')
+        finally:
+            db_routing._read_alias.reset(token)
+        self.assertEqual(router.db_for_read(Booking), 'default')
+        self.assertEqual(router.db_for_write(Booking), 'default')
+
+
+    @override_settings(CATALOG_CACHE_ENABLED=True)
+    def test_catalog_cache_is_filled_from_the_primary(self):
+        self.client.force_authenticate(self.student)
+        urls = [reverse('room-list-create'), reverse('async-room-list')]
+        for url in urls:
+            self.assertEqual(self.client.get(url).data['count'], 1)
+        etag = self.client.get(urls[0])['ETag']
+        # Not yet on the lagging replica; the commit bumps the rooms generation.
+        Rooms.objects.create(hostel=self.hostel, room_number='102', price_per_semester=Decimal('500'))
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).data['count'], 2)
+        self.assertNotEqual(self.client.get(urls[0], HTTP_IF_NONE_MATCH=etag).status_code,
+                            status.HTTP_304_NOT_MODIFIED)
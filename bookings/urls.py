@@ -1,9 +1,25 @@
 from django.urls import path
-from .views import BookingListCreateView, BookingRetrieveUpdateDestroyView
+from .views import (BookingListCreateView, BookingRetrieveUpdateDestroyView, BookingDecisionView,
+                    BookingAllocationView, BookingRollupListView, BookingExportView,
+                    AsyncStudentBookingListView, ArchivedBookingListView, ArchivedBookingRetrieveView)
 
 urlpatterns = [
     path('bookings/', BookingListCreateView.as_view(),
          name='bookings-list-create'),
+    path('bookings/decisions/', BookingDecisionView.as_view(),
+         name='booking-decisions'),
+    path('bookings/allocate/', BookingAllocationView.as_view(),
+         name='booking-allocate'),
+    path('bookings/export/', BookingExportView.as_view(),
+         name='booking-export'),
+    path('bookings/rollups/', BookingRollupListView.as_view(),
+         name='booking-rollups'),
+    path('bookings/archive/', ArchivedBookingListView.as_view(),
+         name='booking-archive'),
+    path('bookings/archive/<uuid:pk>/', ArchivedBookingRetrieveView.as_view(),
+         name='archived-booking-detail'),
     path('bookings/<uuid:pk>/',
          BookingRetrieveUpdateDestroyView.as_view(), name='booking-detail'),
+    path('async/bookings/', AsyncStudentBookingListView.as_view(),
+         name='async-student-bookings'),
 ]
@@ -1,25 +1,42 @@
 from django.shortcuts import render
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions
-# from rest_framework.response import Response
-from .serializers import BookingSerializer, StudentBookingSerializer
-from .models import Booking
-from accounts.permissions import IsStudent, IsCustodianOrAdmin
+from rest_framework.response import Response
+from .allocation import allocate_rooms
+from .export import streaming_export
+from .filters import BookingExportFilter
+from .serializers import (BookingSerializer, StudentBookingSerializer, BookingDecisionSerializer,
+                          AllocationSerializer, BookingRollupSerializer, BookingExportQuerySerializer,
+                          ArchivedBookingSerializer)
+from .services import create_booking, decide_bookings, update_booking
+from .models import ArchivedBooking, Booking, BookingRollup
+from accounts.permissions import IsAdmin, IsStudent, IsCustodianOrAdmin
+from hostel_booking_system.async_views import AsyncListMixin
+from hostel_booking_system.conditional import ConditionalDetailMixin, ConditionalListMixin
+from hostel_booking_system.db_routing import ReplicaReadMixin
+from hostel_booking_system.fieldsets import SparseFieldsetMixin
+from hostel_booking_system.pagination import HybridPagination
+from hostel_booking_system.row_serializers import RowSerializerMixin
 
 # Create your views here.
 
 
-class BookingListCreateView(generics.ListCreateAPIView):
+class BookingListCreateView(ReplicaReadMixin, ConditionalListMixin, SparseFieldsetMixin, RowSerializerMixin,
+                            generics.ListCreateAPIView):
+    throttle_scope = 'bookings'
     # serializer_class = BookingSerializer
     # permission_classes = [permissions.IsAuthenticated]
+    pagination_class = HybridPagination
     filterset_fields = ['status', 'room_id', 'student_id']
     search_fields = ['student_id__username', 'room_id__room_number']
     ordering_fields = ['created_at', 'check_in_date', 'check_out_date', 'status']
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Booking.objects.select_related('room_id__hostel')
         if user.role == 'student':
-            return Booking.objects.filter(student_id=user)
-        return Booking.objects.all()
+            return queryset.filter(student_id=user)
+        return queryset
 
     def get_serializer_class(self):
         user = self.request.user
@@ -33,11 +50,20 @@ class BookingListCreateView(generics.ListCreateAPIView):
         return [permissions.IsAuthenticated()]
 
     def perform_create(self, serializer):
-        serializer.save(student_id=self.request.user)
+        create_booking(serializer, self.request.user)
 
 
-class BookingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Booking.objects.all()
+class AsyncStudentBookingListView(AsyncListMixin, BookingListCreateView):
+    """A student's own bookings, read with the async ORM when served over ASGI."""
+
+    def get_permissions(self):
+        return [IsStudent()]
+
+
+class BookingRetrieveUpdateDestroyView(ReplicaReadMixin, ConditionalDetailMixin, SparseFieldsetMixin,
+                                       generics.RetrieveUpdateDestroyAPIView):
+    throttle_scope = 'bookings'
+    queryset = Booking.objects.select_related('room_id__hostel')
     # serializer_class = BookingSerializer
     # permission_classes = [permissions.IsAuthenticated]
 
@@ -51,3 +77,97 @@ class BookingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         if user.role == 'student':
             return StudentBookingSerializer
         return BookingSerializer
+
+    def perform_update(self, serializer):
+        # If-Match is checked once the rooms are locked, the order every booking write locks in.
+        update_booking(serializer, precondition=self.check_write_preconditions)
+
+
+class BookingDecisionView(generics.GenericAPIView):
+    """
+    Approve or reject many bookings at once. Approvals lock the affected
+    rooms, skip requests that clash with an approved stay and reject the
+    pending requests they beat. Responds with a summary of what changed.
+    """
+    serializer_class = BookingDecisionSerializer
+    permission_classes = [IsCustodianOrAdmin]
+    throttle_scope = 'bookings'
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        summary = decide_bookings(serializer.validated_data['ids'],
+                                  serializer.validated_data['status'])
+        return Response(summary)
+
+
+class BookingAllocationView(generics.GenericAPIView):
+    """
+    Run the batch allocator over every pending booking, optionally limited
+    to one hostel. Oldest requests are served first; ``dry_run`` reports the
+    outcome without writing anything.
+    """
+    serializer_class = AllocationSerializer
+    permission_classes = [IsAdmin]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        summary = allocate_rooms(hostel_id=data.get('hostel'), reassign=data['reassign'],
+                                 dry_run=data['dry_run'])
+        return Response(summary)
+
+
+class BookingRollupListView(generics.ListAPIView):
+    """
+    Per-hostel, per-semester booking totals read straight from the rollup
+    table, so the cost does not grow with booking history.
+    """
+    queryset = BookingRollup.objects.select_related('hostel')
+    serializer_class = BookingRollupSerializer
+    permission_classes = [IsAdmin]
+    filterset_fields = ['hostel', 'semester']
+    ordering_fields = ['semester', 'approved_count', 'pending_count', 'expected_revenue']
+
+
+class BookingExportView(generics.GenericAPIView):
+    """
+    Stream every booking matching the filters, joined with its student, room
+    and hostel, as CSV (default) or NDJSON (``?output=ndjson``). Rows are
+    read in keyset chunks and written as they arrive, so memory stays flat
+    however many bookings match.
+    """
+    queryset = Booking.objects.all()
+    permission_classes = [IsAdmin]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BookingExportFilter
+
+    def get(self, request, *args, **kwargs):
+        query = BookingExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return streaming_export(self.filter_queryset(self.get_queryset()), query.validated_data['output'])
+
+
+class ArchivedBookingListView(ReplicaReadMixin, SparseFieldsetMixin, RowSerializerMixin, generics.ListAPIView):
+    """
+    Bookings moved out of the live table by ``manage.py archive_bookings``.
+    Read-only and admin only; filter by ``room_id__hostel`` and a
+    ``check_out_date`` range to look up a hostel's past semesters.
+    """
+    queryset = ArchivedBooking.objects.all()
+    serializer_class = ArchivedBookingSerializer
+    permission_classes = [IsAdmin]
+    pagination_class = HybridPagination
+    filterset_fields = {
+        'status': ['exact'], 'room_id': ['exact'], 'student_id': ['exact'],
+        'room_id__hostel': ['exact'], 'check_out_date': ['gte', 'lt'],
+    }
+    ordering_fields = ['check_in_date', 'check_out_date', 'archived_at']
+
+
+class ArchivedBookingRetrieveView(ReplicaReadMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
+    queryset = ArchivedBooking.objects.all()
+    serializer_class = ArchivedBookingSerializer
+    permission_classes = [IsAdmin]
+
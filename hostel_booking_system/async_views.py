@@ -0,0 +1,125 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+
+from .caching import CachedListMixin, asingle_flight, catalog_cache_enabled
+from .conditional import ConditionalDetailMixin, ConditionalListMixin, has_preconditions, set_validators
+from .db_routing import primary_reads
+from .row_serializers import RowSerializerMixin
+
+
+class AsyncAPIViewMixin:
+    """
+    Async dispatch for DRF views, which only dispatch synchronously.
+
+    Authentication, permissions, throttling and content negotiation run
+    exactly as in APIView.initial(), in a worker thread because they may
+    query the database. The handler itself is awaited, so it can use the
+    async ORM. Responses are finalised and rendered as usual.
+
+    Mix it into a subclass of an existing DRF view and limit
+    ``http_method_names`` to the methods with async handlers: Django requires
+    a view's handlers to be either all sync or all async.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if request.method.lower() == 'options' or handler == self.http_method_not_allowed:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+            else:
+                response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset):
+        # Filter backends may query (django-filter choice fields, the search index).
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+
+class AsyncListMixin(AsyncAPIViewMixin):
+    """
+    Async GET for list views, with the view's own filters, pagination and
+    role-based serializer. Views that use CachedListMixin keep their cache,
+    and views that use ConditionalListMixin their validators and 304s.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        validators = None
+        if isinstance(self, ConditionalListMixin):
+            # The fingerprint is one aggregate, shared with the sync view's cache entry.
+            validators = await sync_to_async(self.list_validators)(request)
+            response = self.evaluate_preconditions(*validators)
+            if response is not None:
+                return response
+        if isinstance(self, CachedListMixin) and catalog_cache_enabled():
+            async def compute():
+                # Misses are filled from the primary, as in CachedListMixin.list().
+                with primary_reads():
+                    return await self.alist_data(request)
+            data = await asingle_flight(await self.aget_cache_key(request), compute,
+                                        timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        else:
+            data = await self.alist_data(request)
+        if validators is None:
+            return Response(data)
+        return set_validators(Response(data), *validators)
+
+    async def alist_data(self, request):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        row_serializer = self.get_row_serializer() if isinstance(self, RowSerializerMixin) else None
+        if row_serializer is not None:
+            queryset = row_serializer.rows(queryset)
+
+        def serialize(rows):
+            if row_serializer is not None:
+                return row_serializer.serialize(rows)
+            return self.get_serializer(rows, many=True).data
+        paginator = self.paginator
+        if paginator is None:
+            return serialize([row async for row in queryset])
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(serialize(page)).data
+
+
+class AsyncRetrieveMixin(AsyncAPIViewMixin):
+    """
+    Async GET for detail views, with the view's lookup and object permissions,
+    and the validators and 304s of views that use ConditionalDetailMixin.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(self, ConditionalDetailMixin):
+            return Response(self.get_serializer(await self.aget_object()).data)
+        validators = None
+        if has_preconditions(request):
+            validators = await sync_to_async(self.get_stored_validators)()
+            response = self.evaluate_preconditions(*validators)
+            if response is not None:
+                return response
+        instance = await self.aget_object()
+        if validators is None:
+            validators = await sync_to_async(self.get_object_validators)(instance)
+        return set_validators(Response(self.get_serializer(instance).data), *validators)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import time
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .db_routing import primary_reads
+
+_MISSING = object()
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def catalog_cache_enabled():
+    return getattr(settings, 'CATALOG_CACHE_ENABLED', True)
+
+
+def generation_key(namespace):
+    return f'catalog:gen:{namespace}'
+
+
+def get_generations(namespaces):
+    cache = get_cache()
+    keys = [generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, 1, None)
+            found[key] = cache.get(key, 1)
+    return [found[key] for key in keys]
+
+
+async def aget_generations(namespaces):
+    cache = get_cache()
+    keys = [generation_key(namespace) for namespace in namespaces]
+    found = await cache.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, 1, None)
+            found[key] = await cache.aget(key, 1)
+    return [found[key] for key in keys]
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every cached response that depends on the given namespaces.
+    Old entries are not deleted; they simply stop being addressed and expire.
+
+    Inside a transaction the bump waits for the commit. Bumping earlier
+    would let a concurrent read cache the rows as they were before the
+    commit under the new generation, and a rollback would bump for nothing.
+    """
+    transaction.on_commit(partial(_bump_generation, namespaces))
+
+
+def _bump_generation(namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        key = generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def single_flight(key, compute, timeout, lock_timeout=10, poll_interval=0.05):
+    """
+    Return the cached value for key, computing it at most once at a time.
+
+    The first caller to miss takes a short lock and recomputes; concurrent
+    callers poll for its result instead of all hitting the database. If the
+    lock holder fails or the lock times out, waiters compute for themselves.
+    """
+    cache = get_cache()
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return compute()
+
+
+async def asingle_flight(key, compute, timeout, lock_timeout=10, poll_interval=0.05):
+    """
+    single_flight() for async callers: ``compute`` is a coroutine function and
+    waiters poll without blocking the event loop.
+    """
+    cache = get_cache()
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f'{key}:lock'
+    if await cache.aadd(lock_key, 1, lock_timeout):
+        try:
+            value = await compute()
+            await cache.aset(key, value, timeout)
+            return value
+        finally:
+            await cache.adelete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_interval)
+        value = await cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if await cache.aget(lock_key) is None:
+            break
+    return await compute()
+
+
+def user_role(user):
+    if user and user.is_authenticated:
+        return user.role
+    return 'anonymous'
+
+
+class CachedListMixin:
+    """
+    Serve GET list responses from the cache.
+
+    Keys combine the view, the generations of ``cache_dependencies``, the
+    requesting role (serializers differ per role) and the normalised query
+    string. Model signals bump the generations when the underlying rows
+    change.
+
+    Misses are computed from the primary. A lagging replica would store the
+    rows from before the write that bumped the generation under the new key,
+    and serve them until the timeout, even to the user who wrote.
+    """
+    cache_dependencies = ()
+
+    def get_cache_key(self, request):
+        return self.build_cache_key(request, get_generations(self.cache_dependencies))
+
+    async def aget_cache_key(self, request):
+        return self.build_cache_key(request, await aget_generations(self.cache_dependencies))
+
+    def build_cache_key(self, request, generations):
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        query = urlencode([(key, value) for key, values in params for value in values])
+        raw = '|'.join([
+            request.get_host(), request.path, user_role(request.user),
+            ','.join(str(generation) for generation in generations), query,
+        ])
+        return f'catalog:{type(self).__name__}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def list(self, request, *args, **kwargs):
+        if not catalog_cache_enabled():
+            return super().list(request, *args, **kwargs)
+        parent_list = super().list
+
+        def compute():
+            with primary_reads():
+                return parent_list(request, *args, **kwargs).data
+        data = single_flight(self.get_cache_key(request), compute,
+                             timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        return Response(data)
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """The content codings an Accept-Encoding header allows (q > 0), lowercased."""
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def compression_min_size():
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def brotli_quality():
+    return getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses of at least COMPRESSION_MIN_SIZE bytes with brotli
+    when the client accepts it and the ``brotli`` package is installed, and
+    with gzip otherwise. Streaming responses, like the booking export, are
+    compressed chunk by chunk whatever their size.
+
+    HTML pages, which carry CSRF tokens, always use Django's gzip with its
+    BREACH padding.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < compression_min_size():
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is None or 'br' not in accepted or \
+                response.get('Content-Type', '').startswith('text/html'):
+            if 'gzip' in accepted:
+                return super().process_response(request, response)
+            patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = self.brotli_stream(response.streaming_content, response.is_async)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=brotli_quality())
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    def brotli_stream(self, chunks, is_async):
+        compressor = brotli.Compressor(quality=brotli_quality())
+        if is_async:
+            async def compress():
+                async for chunk in chunks:
+                    yield compressor.process(chunk) + compressor.flush()
+                yield compressor.finish()
+            return compress()
+
+        def compress():
+            for chunk in chunks:
+                yield compressor.process(chunk) + compressor.flush()
+            yield compressor.finish()
+        return compress()
@@ -0,0 +1,237 @@
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .caching import CachedListMixin, catalog_cache_enabled, single_flight
+from .db_routing import primary_reads
+from .fieldsets import SparseFieldsetMixin, readable_sources
+from .row_serializers import field_path
+
+CONDITIONAL_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+                       'HTTP_IF_UNMODIFIED_SINCE')
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since you last read it.'
+    default_code = 'precondition_failed'
+
+
+def has_preconditions(request):
+    return any(request.META.get(header) for header in CONDITIONAL_HEADERS)
+
+
+def tracked_paths(model, sources):
+    """
+    The ``updated_at`` paths that date a representation: the model's own,
+    then that of every model the sources (source_attrs tuples) reach through
+    non-null forward relations, so renaming a hostel changes its rooms' ETags.
+    """
+    paths = ['updated_at']
+    for source_attrs in sources:
+        if not source_attrs or field_path(model, source_attrs) is None:
+            continue
+        related = model
+        for end in range(1, len(source_attrs)):
+            related = related._meta.get_field(source_attrs[end - 1]).related_model
+            path = '__'.join(source_attrs[:end]) + '__updated_at'
+            if path not in paths and any(field.name == 'updated_at' for field in related._meta.concrete_fields):
+                paths.append(path)
+    return paths
+
+
+def make_validators(parts, timestamps):
+    """
+    (ETag, Last-Modified) for a representation. The ETag hashes ``parts`` and
+    the exact timestamps; Last-Modified is the newest one in whole seconds,
+    the resolution of HTTP dates, or None when there is none.
+    """
+    raw = '|'.join([*map(str, parts), *(value.isoformat() if value else '' for value in timestamps)])
+    last_modified = max((int(value.timestamp()) for value in timestamps if value is not None), default=None)
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest()), last_modified
+
+
+def loaded_timestamps(instance, paths):
+    """
+    The values at ``paths`` when the instance already holds all of them, or
+    None when one is deferred or behind a relation that was not loaded.
+    """
+    timestamps = []
+    for path in paths:
+        value = instance
+        *relations, name = path.split('__')
+        for relation in relations:
+            if not value._meta.get_field(relation).is_cached(value):
+                return None
+            value = getattr(value, relation)
+        if name in value.get_deferred_fields():
+            return None
+        timestamps.append(getattr(value, name))
+    return timestamps
+
+
+def strong_if_match(header, etag):
+    """
+    An If-Match header with the weak form of ``etag`` made strong again. The
+    compression middleware weakens the ETags of the responses it compresses,
+    and clients send those back, but If-Match compares strongly.
+    """
+    tags = parse_etags(header)
+    if tags == ['*']:
+        return header
+    return ', '.join(etag if tag == f'W/{etag}' else tag for tag in tags)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalMixin:
+    """
+    Shared by the conditional list and detail views. Validators only track
+    the related rows of the fields returned, so ``?fields=`` keeps skipping
+    their joins and gets its own ETag.
+    """
+
+    def get_tracked_paths(self):
+        sources = readable_sources(self.get_serializer_class())
+        names = self.get_sparse_fields() if isinstance(self, SparseFieldsetMixin) else None
+        return tracked_paths(self.get_queryset().model,
+                             [sources[name] for name in (sources if names is None else names)])
+
+    def get_validator_parts(self):
+        # Roles with different serializers see different bodies at one URL.
+        serializer_class = self.get_serializer_class()
+        return [f'{serializer_class.__module__}.{serializer_class.__qualname__}']
+
+    def evaluate_preconditions(self, etag, last_modified):
+        """
+        A 304 response for a fresh conditional GET or HEAD, None when the
+        request should be served; raises PreconditionFailed on a failed
+        ``If-Match`` or ``If-Unmodified-Since``.
+        """
+        if_match = self.request.META.get('HTTP_IF_MATCH')
+        if if_match:
+            self.request.META['HTTP_IF_MATCH'] = strong_if_match(if_match, etag)
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            return None
+        if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+        return set_validators(response, etag, last_modified)
+
+
+class ConditionalListMixin(ConditionalMixin):
+    """
+    ETag and Last-Modified on list GETs from an aggregate fingerprint of the
+    filtered rows: their count and newest ``updated_at`` (and those of the
+    related rows the returned fields read), in one query. A matching
+    ``If-None-Match`` or ``If-Modified-Since`` is answered with 304 before
+    anything is serialized. Page-number pagination reuses the count instead
+    of running its own COUNT(*).
+
+    Views that use CachedListMixin cache the fingerprint next to the body,
+    under the same generations and likewise read from the primary, so a warm
+    304 costs no queries.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.list_validators(request)
+        response = self.evaluate_preconditions(etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def list_validators(self, request):
+        """The list's validators, from the catalog cache when the view uses it."""
+        self.list_count = None
+        if isinstance(self, CachedListMixin) and catalog_cache_enabled():
+            def compute():
+                with primary_reads():
+                    return self.get_list_validators()
+            return single_flight(f'{self.get_cache_key(request)}:validators', compute,
+                                 timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        return self.get_list_validators()
+
+    def get_list_validators(self):
+        paths = self.get_tracked_paths()
+        fingerprint = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            count=Count('pk'), **{f'newest_{position}': Max(path) for position, path in enumerate(paths)})
+        self.list_count = fingerprint['count']
+        return make_validators([*self.get_validator_parts(), self.list_count],
+                               [fingerprint[f'newest_{position}'] for position in range(len(paths))])
+
+
+class ConditionalDetailMixin(ConditionalMixin):
+    """
+    ETag and Last-Modified on detail responses, from the ``updated_at`` of the
+    object and of the related rows its returned fields read.
+
+    Conditional GETs read just those timestamps first and answer 304 when
+    they match. Plain GETs take them from the object when it holds them and
+    otherwise read them with the same lightweight query. Updates and deletes
+    honour ``If-Match`` and ``If-Unmodified-Since`` against the row as
+    stored, locked until the write commits, and fail with 412 when it has
+    changed.
+    """
+
+    def get_stored_validators(self, lock=False):
+        """Validators of the stored row, read without loading the object."""
+        queryset = self.filter_queryset(self.get_queryset())
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        paths = self.get_tracked_paths()
+        timestamps = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list(
+            *paths).first()
+        if timestamps is None:
+            raise Http404
+        return make_validators(self.get_validator_parts(), timestamps)
+
+    def get_object_validators(self, instance):
+        timestamps = loaded_timestamps(instance, self.get_tracked_paths())
+        if timestamps is None:
+            return self.get_stored_validators()
+        return make_validators(self.get_validator_parts(), timestamps)
+
+    def check_write_preconditions(self):
+        """
+        Raise PreconditionFailed unless the write's preconditions hold for
+        the stored row. Call it inside the write's transaction.
+        """
+        if has_preconditions(self.request):
+            self.evaluate_preconditions(*self.get_stored_validators(lock=True))
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = None
+        if has_preconditions(request):
+            validators = self.get_stored_validators()
+            response = self.evaluate_preconditions(*validators)
+            if response is not None:
+                return response
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, *(validators or self.get_object_validators(self.object)))
+
+    def get_object(self):
+        self.object = super().get_object()
+        return self.object
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            self.check_write_preconditions()
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.check_write_preconditions()
+            super().perform_destroy(instance)
@@ -0,0 +1,177 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# The replica the current request reads from; None reads from the primary.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, whichever replica the request chose."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def pin_key(user_pk):
+    return f'db:pinned:{user_pk}'
+
+
+def pin_to_primary(user):
+    """Send the user's reads to the primary for the next REPLICA_PIN_SECONDS."""
+    cache.set(pin_key(user.pk), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def pinned_to_primary(user):
+    return bool(user and user.is_authenticated) and cache.get(pin_key(user.pk)) is not None
+
+
+def replica_lag(alias):
+    """
+    Connect to a replica and return its replication lag in seconds: 0 when
+    the database cannot report one, None when replication is stopped.
+    """
+    connection = connections[alias]
+    connection.ensure_connection()
+    if connection.vendor != 'mysql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW REPLICA STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        status = dict(zip([column[0] for column in cursor.description], row))
+    return status.get('Seconds_Behind_Source')
+
+
+class ReplicaHealth:
+    """
+    In-process health of the replicas. Each is checked at most every
+    REPLICA_CHECK_INTERVAL seconds; one that cannot be reached, has stopped
+    replicating or lags by more than REPLICA_MAX_LAG_SECONDS is skipped for
+    REPLICA_RETRY_SECONDS and then checked again.
+    """
+    timer = time.monotonic
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = {}
+        self.down_until = {}
+
+    def is_healthy(self, alias):
+        now = self.timer()
+        with self.lock:
+            if self.down_until.get(alias, now) > now:
+                return False
+            checked_at = self.checked_at.get(alias)
+            if checked_at is not None and now - checked_at < getattr(settings, 'REPLICA_CHECK_INTERVAL', 5):
+                return True
+            # Other threads keep using the replica while this one checks it.
+            self.checked_at[alias] = now
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            lag = None
+        if lag is None or lag > getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10):
+            self.mark_down(alias)
+            return False
+        return True
+
+    def mark_down(self, alias):
+        with self.lock:
+            self.down_until[alias] = self.timer() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+            self.checked_at.pop(alias, None)
+
+
+health = ReplicaHealth()
+_rotation = itertools.count()
+
+
+def choose_replica():
+    """The next healthy replica in turn, or None when none is healthy."""
+    replicas = replica_aliases()
+    start = next(_rotation)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if health.is_healthy(alias):
+            return alias
+    return None
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to the primary. Reads go to the replica chosen for the current
+    request by ReplicaReadMixin, except inside transactions, which read what
+    they are about to write from the primary. Everything else, including
+    management commands and the admin, reads from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS if replica_aliases() else None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        return False if db in replica_aliases() else None
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a healthy replica, chosen once per request so
+    every query of a response sees the same snapshot. Users who wrote within
+    the last REPLICA_PIN_SECONDS read from the primary, so they see their
+    own writes; so does everyone when no replica is healthy.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_aliases() and not pinned_to_primary(request.user):
+            _read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _read_alias.set(None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimaryPinningMiddleware:
+    """
+    Pin users to the primary after any successful unsafe request, whichever
+    view handled it. DRF copies the user it authenticates onto the Django
+    request, so token-authenticated writes are pinned too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user)
+        return response
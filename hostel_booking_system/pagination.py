@@ -0,0 +1,318 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimated_count(queryset):
+    """
+    The row count of an unfiltered queryset's table from the database's own
+    statistics, without scanning it, or None when there is no cheap estimate.
+    """
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                           'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table])
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+        elif connection.vendor == 'sqlite':
+            # Two B-tree seeks; deleted rows make it an overestimate.
+            cursor.execute(f'SELECT MAX(rowid) - MIN(rowid) + 1 FROM {connection.ops.quote_name(table)}')
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Django paginator for the admin that reports the statistics estimate
+    for unfiltered tables above ADMIN_ESTIMATED_COUNT_THRESHOLD rows instead
+    of running COUNT(*) over all of them. Filtered lists count exactly.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list) if hasattr(self.object_list, 'query') else None
+        if estimate is not None and estimate >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000):
+            return estimate
+        return super().count
+
+
+class StandardPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # ConditionalListMixin has already counted the same queryset for its fingerprint.
+        self.known_count = getattr(view, 'list_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        if getattr(self, 'known_count', None) is not None:
+            paginator.count = self.known_count
+        return paginator
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views: the count and the page rows are
+        read with the async ORM.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Fill Paginator's cached count so page() does not query, reusing the
+        # fingerprint's count as paginate_queryset() does.
+        known_count = getattr(view, 'list_count', None)
+        paginator.count = known_count if known_count is not None else await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over the active ordering plus the primary key.
+
+    Instead of OFFSET, each page is fetched with a WHERE clause that continues
+    after the last row of the previous page, and no COUNT(*) is issued, so a
+    deep page costs the same as the first one. The ordering comes from the
+    queryset (OrderingFilter or the model default), so ``?ordering=`` keeps
+    working; nullable fields are ordered with NULLs first ascending and last
+    descending on every backend.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size, values, reverse = self.page_queryset(queryset, request)
+        return self.set_page(list(queryset[:page_size + 1]), page_size, values, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, page_size, values, reverse = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset[:page_size + 1]], page_size, values, reverse)
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        self.set_keys(queryset)
+        values, reverse = self.decode_cursor(request)
+
+        keys = [(field, desc != reverse) for field, desc in self.keys]
+        queryset = queryset.order_by(*[self.order_expression(field, desc) for field, desc in keys])
+        if values is not None:
+            queryset = queryset.filter(self.after(keys, values))
+        return queryset, page_size, values, reverse
+
+    def set_page(self, rows, page_size, values, reverse):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def set_keys(self, queryset):
+        self.keys = self.get_keys(queryset)
+        self.ordering_token = ','.join(('-' if desc else '') + field.name
+                                       for field, desc in self.keys)
+
+    def get_keys(self, queryset):
+        opts = queryset.model._meta
+        ordering = list(queryset.query.order_by or opts.ordering)
+        keys = []
+        for term in ordering:
+            if not isinstance(term, str):
+                raise NotFound('Keyset pagination needs plain field ordering.')
+            desc = term.startswith('-')
+            name = term.lstrip('-')
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                raise NotFound(f'Keyset pagination cannot order by "{name}".')
+            if not field.concrete or field.is_relation and not field.many_to_one:
+                raise NotFound(f'Keyset pagination cannot order by "{name}".')
+            keys.append((field, desc))
+            if field.primary_key:
+                break
+        else:
+            # The primary key breaks ties so every row has a unique position.
+            keys.append((opts.pk, keys[-1][1] if keys else False))
+        return keys
+
+    @staticmethod
+    def order_expression(field, desc):
+        if not field.null:
+            return ('-' if desc else '') + field.attname
+        if desc:
+            return F(field.attname).desc(nulls_last=True)
+        return F(field.attname).asc(nulls_first=True)
+
+    def after(self, keys, values):
+        condition = None
+        for (field, desc), value in reversed(list(zip(keys, values))):
+            beyond = self.beyond(field, desc, value)
+            if condition is not None:
+                equal = Q(**{f'{field.attname}__isnull': True}) if value is None \
+                    else Q(**{field.attname: value})
+                tail = equal & condition
+                beyond = tail if beyond is None else beyond | tail
+            condition = beyond if beyond is not None else Q(pk__in=[])
+        field, desc = keys[0]
+        if values[0] is not None:
+            # Redundant with the OR chain, but lets the planner seek the index
+            # on the leading column instead of scanning it.
+            seek = Q(**{f'{field.attname}__{"lte" if desc else "gte"}': values[0]})
+            if desc and field.null:
+                # NULLs sort last descending, so they are all still ahead.
+                seek |= Q(**{f'{field.attname}__isnull': True})
+            condition &= seek
+        return condition
+
+    @staticmethod
+    def beyond(field, desc, value):
+        name = field.attname
+        if value is None:
+            # NULLs sort first ascending and last descending.
+            return None if desc else Q(**{f'{name}__isnull': False})
+        if desc:
+            beyond = Q(**{f'{name}__lt': value})
+            return beyond | Q(**{f'{name}__isnull': True}) if field.null else beyond
+        return Q(**{f'{name}__gt': value})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != self.ordering_token or len(payload['v']) != len(self.keys):
+                raise ValueError
+            values = [None if value is None else field.to_python(value)
+                      for (field, _), value in zip(self.keys, payload['v'])]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def cursor_for(self, row, reverse=False):
+        payload = {
+            'o': self.ordering_token,
+            'v': [None if getattr(row, field.attname) is None else field.value_to_string(row)
+                  for field, _ in self.keys],
+        }
+        if reverse:
+            payload['r'] = 1
+        return base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()).decode('ascii')
+
+    def encode_cursor(self, row, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   self.cursor_for(row, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class HybridPagination(BasePagination):
+    """
+    Page-number pagination by default, for backward compatibility; keyset
+    pagination when the client sends ``?pagination=cursor`` or a ``cursor``.
+    """
+    mode_query_param = 'pagination'
+    page_number_class = StandardPagination
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.choose(request).paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await self.choose(request).apaginate_queryset(queryset, request, view)
+
+    def choose(self, request):
+        if (request.query_params.get(self.mode_query_param) == 'cursor'
+                or KeysetPagination.cursor_query_param in request.query_params):
+            self.delegate = self.keyset_class()
+        else:
+            self.delegate = self.page_number_class()
+        return self.delegate
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.delegate, 'display_page_controls', False)
+
+    def get_results(self, data):
+        return data['results']
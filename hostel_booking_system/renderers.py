@@ -0,0 +1,34 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer's output, rendered by orjson when it is installed.
+
+    orjson writes strings, numbers, dicts, lists, UUIDs, dates and datetimes
+    itself, in the same format as DRF's encoder, so only values it does not
+    know (Decimal, lazy translations, querysets...) reach the encoder's
+    default(). Indented output (the browsable API), ``UNICODE_JSON=False``,
+    ``COMPACT_JSON=False`` and anything orjson refuses, such as integers
+    beyond 64 bits, are rendered by JSONRenderer as before, as is
+    everything when orjson is missing.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # The same escapes as JSONRenderer, keeping the output a JavaScript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
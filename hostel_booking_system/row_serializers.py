@@ -0,0 +1,149 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Field classes whose to_representation() only depends on the value.
+VALUE_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.DateField,
+    serializers.DateTimeField, serializers.DecimalField, serializers.FloatField, serializers.IntegerField,
+)
+
+
+def fast_serialization_enabled():
+    return getattr(settings, 'FAST_LIST_SERIALIZATION_ENABLED', True)
+
+
+def identity(value):
+    return value
+
+
+class RowSerializer:
+    """
+    Builds the same dicts as a read-only ModelSerializer, in the same key
+    order, from ``values_list()`` rows instead of model instances.
+
+    Each readable field is compiled once into a column (its source path
+    joined with ``__``) and a converter, which is the field's own
+    to_representation() or a cheaper exact equivalent. No serializer,
+    field or model instances are created per row.
+    """
+
+    def __init__(self, columns):
+        # (output name, values_list() path, converter)
+        self.columns = columns
+        self.paths = list(dict.fromkeys(path for _, path, _ in columns))
+
+    def subset(self, names):
+        """A RowSerializer for only the named output fields."""
+        return RowSerializer([column for column in self.columns if column[0] in names])
+
+    def rows(self, queryset):
+        """
+        The queryset as named rows carrying every serialized column plus
+        the fields it is ordered by and its primary key, which keyset
+        pagination reads from each row by attribute name.
+        """
+        opts = queryset.model._meta
+        extra = [opts.pk.attname]
+        for term in queryset.query.order_by or opts.ordering:
+            if isinstance(term, str):
+                name = term.lstrip('-')
+                try:
+                    extra.append(opts.pk.attname if name == 'pk' else opts.get_field(name).attname)
+                except FieldDoesNotExist:
+                    pass
+        return queryset.values_list(*dict.fromkeys(self.paths + extra), named=True)
+
+    def serialize(self, rows):
+        columns = self.columns
+        data = []
+        for row in rows:
+            item = {}
+            for name, path, convert in columns:
+                value = getattr(row, path)
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+def field_path(model, source_attrs):
+    """
+    The values() path for a source, or None unless every step but the last
+    is a non-null forward relation and the last is a concrete field.
+    """
+    for position, attr in enumerate(source_attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        if position < len(source_attrs) - 1:
+            if not (field.many_to_one or field.one_to_one) or field.null:
+                return None
+            model = field.related_model
+    return '__'.join(source_attrs)
+
+
+def converter(field):
+    if type(field) is serializers.ReadOnlyField:
+        return identity
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # The pk itself, as DRF returns it for PKOnlyObject.
+        return identity if field.pk_field is None else None
+    if isinstance(field, serializers.UUIDField):
+        return str if field.uuid_format == 'hex_verbose' else field.to_representation
+    if isinstance(field, VALUE_FIELDS):
+        return field.to_representation
+    return None
+
+
+@lru_cache(maxsize=None)
+def compile_row_serializer(serializer_class):
+    """
+    Compile a read-only ModelSerializer into a RowSerializer, or return None
+    when it has fields that need model instances (method fields, nested
+    serializers, callables, nullable relations...) or its own
+    to_representation().
+    """
+    if not issubclass(serializer_class, serializers.ModelSerializer) or \
+            serializer_class.to_representation is not serializers.Serializer.to_representation:
+        return None
+    model = serializer_class.Meta.model
+    columns = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        path = field_path(model, field.source_attrs) if field.source != '*' else None
+        convert = converter(field)
+        if path is None or convert is None:
+            return None
+        columns.append((name, path, convert))
+    return RowSerializer(columns)
+
+
+class RowSerializerMixin:
+    """
+    Answer list GETs from values_list() rows through the compiled
+    RowSerializer of the view's (role-based) serializer class. The JSON is
+    byte-identical to the regular path, which writes, other actions and
+    serializers that cannot be compiled keep using.
+    """
+
+    def get_row_serializer(self):
+        if not fast_serialization_enabled():
+            return None
+        return compile_row_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        row_serializer = self.get_row_serializer()
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = row_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize(page))
+        return Response(row_serializer.serialize(queryset))
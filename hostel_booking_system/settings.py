@@ -45,16 +45,21 @@ INSTALLED_APPS = [
     'accounts',
     'hostels',
     'bookings',
+    'benchmarks',
+    'search',
+    'outbox',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hostel_booking_system.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'hostel_booking_system.db_routing.PrimaryPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'hostel_booking_system.urls'
@@ -92,6 +97,80 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite runs the project (tests, benchmarks) without MySQL.
+# IMMEDIATE transactions take the write lock up front, so concurrent writers
+# queue on the timeout instead of failing with "database is locked".
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+        }
+    }
+
+# Read replicas of the primary. Safe requests to the catalog, booking and user
+# views read from them (see hostel_booking_system.db_routing); set
+# DB_REPLICA_HOSTS to comma-separated MySQL hosts, or SQLITE_REPLICA_PATHS to
+# copies of the SQLite file. Test runs use the primary's test database.
+if os.getenv('DB_ENGINE') == 'sqlite':
+    _replicas = [{'NAME': path} for path in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if path]
+else:
+    _replicas = [{'HOST': host} for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host]
+DATABASE_REPLICAS = []
+for _number, _replica in enumerate(_replicas, 1):
+    DATABASES[f'replica{_number}'] = {**DATABASES['default'], **_replica, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{_number}')
+
+DATABASE_ROUTERS = ['hostel_booking_system.db_routing.PrimaryReplicaRouter']
+
+# Users who wrote read from the primary for REPLICA_PIN_SECONDS afterwards.
+# Replicas are checked every REPLICA_CHECK_INTERVAL seconds; one that is down,
+# or lags by more than REPLICA_MAX_LAG_SECONDS, is skipped for
+# REPLICA_RETRY_SECONDS.
+REPLICA_PIN_SECONDS = 5
+REPLICA_CHECK_INTERVAL = 5
+REPLICA_MAX_LAG_SECONDS = 10
+REPLICA_RETRY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per process. Catalog pages and their invalidations,
+# throttling windows, replica pins, and the invalidations the outbox worker and
+# management commands make, are only shared between processes through Redis
+# (REDIS_URL, e.g. redis://redis:6379/0) or Memcached (MEMCACHED_LOCATION,
+# comma-separated host:port pairs; needs pymemcache).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hostel-booking',
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+elif os.getenv('MEMCACHED_LOCATION'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('MEMCACHED_LOCATION').split(','),
+    }
+
+# Response cache for the hostel and room catalog endpoints.
+CATALOG_CACHE_ENABLED = True
+CATALOG_CACHE_TIMEOUT = 300
+
+# Serve room and booking list GETs from values_list() rows instead of model instances.
+FAST_LIST_SERIALIZATION_ENABLED = os.getenv('FAST_LIST_SERIALIZATION_ENABLED', 'True') == 'True'
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with brotli
+# (when the brotli package is installed) or gzip, as the client accepts.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = 4
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,24 +217,78 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Token and session lookups are cached so warm requests skip the auth queries.
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTH_CACHE_TIMEOUT = 300
+
+# Seconds before an API token must be renewed via /api/api-token-auth/.
+# None keeps tokens valid until they are deleted.
+TOKEN_EXPIRY_SECONDS = None
+
 REST_FRAMEWORK = {
+    # Renders with orjson when it is installed, with the stdlib json otherwise.
+    'DEFAULT_RENDERER_CLASSES': [
+        'hostel_booking_system.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'search.filters.IndexedSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'hostel_booking_system.pagination.StandardPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'hostel_booking_system.throttling.RoleRateThrottle',
+    ],
+    # Per user: '<role>[.<scope>]'. Site-wide: 'capacity[.<scope>]'. Writes use '<scope>_write'.
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '60/min',
+        'student': '300/min',
+        'student.bookings_write': '20/min',
+        'custodian': '1200/min',
+        'admin': '1200/min',
+        'capacity': '12000/min',
+        'capacity.bookings_write': '1200/min',
+    },
     'EXCEPTION_HANDLER': 'hostel_booking_system.exception_handler.custom_exception_handler',
 }
 
+# Request limits are counted in the default cache, so share it between workers.
+# THROTTLE_RESERVED_SHARE of each site-wide capacity is kept for the reserved roles.
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True') == 'True'
+THROTTLE_RESERVED_ROLES = ('custodian', 'admin')
+THROTTLE_RESERVED_SHARE = 0.2
+
+# Unfiltered admin changelists of tables above this many rows show the
+# database's row estimate instead of running COUNT(*).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Optional in-process interval index for /api/rooms/available/?hostel=...
+# Entries are dropped on local writes and rebuilt after TTL seconds.
+ROOM_INTERVAL_INDEX_ENABLED = os.getenv('ROOM_INTERVAL_INDEX_ENABLED', 'False') == 'True'
+ROOM_INTERVAL_INDEX_TTL = 30
+
+# Post-commit side effects (notifications) are recorded in the outbox and run by
+# `manage.py run_outbox`. Failed tasks are retried after OUTBOX_RETRY_DELAY
+# seconds, doubling each time, and kept as failed after OUTBOX_MAX_ATTEMPTS.
+# A claimed task is offered to another worker after OUTBOX_LEASE_SECONDS.
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_LEASE_SECONDS = 300
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+
+# Word-suffix index behind ?search=; run `manage.py rebuild_search_index` after enabling.
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True') == 'True'
+
 LOGOUT_REDIRECT_URL = '/api/login/'
 LOGIN_REDIRECT_URL = '/api/profile/'
 
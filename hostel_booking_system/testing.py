@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Assertions that keep list endpoints at a fixed number of queries, however
+    many rows end up on the page.
+    """
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(ctx.captured_queries)
+
+    def make_rows(self, make_row, rows=1):
+        # TestCase never commits, so run what would run on commit, such as
+        # cache invalidation.
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(rows):
+                make_row()
+
+    def assertQueryBudget(self, url, make_row, budget, params=None, rows=15):
+        self.make_rows(make_row)
+        small = self.count_queries(url, params)
+        self.make_rows(make_row, rows)
+        large = self.count_queries(url, params)
+        self.assertEqual(small, large,
+                         f'{url} issues {small} queries for one row but {large} for a full page')
+        self.assertLessEqual(large, budget, f'{url} exceeds its query budget')
+
+
+def walk_cursor_pages(client, url, params, key='id'):
+    """
+    Follow ``next`` links from the first keyset page to the last one and then
+    ``previous`` links back again, returning both sequences of ``key`` values.
+    """
+    forward, backward = [], []
+    response = client.get(url, {**params, 'pagination': 'cursor'})
+    pages = []
+    while True:
+        assert response.status_code == 200, response.content
+        assert 'count' not in response.data
+        pages.append(response.data)
+        forward.extend(row[key] for row in response.data['results'])
+        if not response.data['next']:
+            break
+        response = client.get(response.data['next'])
+    backward = [row[key] for row in pages[-1]['results']]
+    previous = pages[-1]['previous']
+    while previous:
+        response = client.get(previous)
+        assert response.status_code == 200, response.content
+        backward[:0] = [row[key] for row in response.data['results']]
+        previous = response.data['previous']
+    return forward, backward
@@ -0,0 +1,138 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_cache():
+    return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def throttling_enabled():
+    return getattr(settings, 'THROTTLE_ENABLED', True)
+
+
+def parse_rate(rate):
+    """'300/min' -> (300, 60). The period is read from its first letter, as DRF does."""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class SlidingWindow:
+    """
+    A sliding-window request counter kept in the cache under ``key``.
+
+    Hits are counted per fixed window; the previous window's count is
+    weighted by how much of it still overlaps the sliding window. Counting
+    uses add() and incr(), which are atomic on shared caches, so any number
+    of processes can share one window.
+    """
+
+    def __init__(self, key, period):
+        self.key = key
+        self.period = period
+
+    def acquire(self, limit, now=None):
+        """
+        Count one hit if the window has room for it under ``limit``. Returns
+        None when it was counted, otherwise the seconds until it would fit.
+        """
+        cache = get_cache()
+        now = time.time() if now is None else now
+        window, offset = divmod(now, self.period)
+        elapsed = offset / self.period
+        current_key = f'throttle:{self.key}:{int(window)}'
+        previous = cache.get(f'throttle:{self.key}:{int(window) - 1}', 0)
+        cache.add(current_key, 0, self.period * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr().
+            cache.set(current_key, 1, self.period * 2)
+            current = 1
+        if previous * (1 - elapsed) + current <= limit:
+            self.counted_key = current_key
+            return None
+        # Rejected requests do not count against the window.
+        cache.decr(current_key)
+        return self.wait(limit, previous, current - 1, elapsed)
+
+    def release(self):
+        """Uncount the last hit acquire() counted."""
+        get_cache().decr(self.counted_key)
+
+    def wait(self, limit, previous, current, elapsed):
+        if limit < 1:
+            return self.period
+        if current + 1 <= limit:
+            # Room appears as the previous window slides out.
+            fits_at = 1 - (limit - current - 1) / previous
+            return max(0.0, fits_at - elapsed) * self.period
+        # This window is full: wait until enough of it has slid out of the next one.
+        return (1 - elapsed + max(0.0, 1 - (limit - 1) / current)) * self.period
+
+
+class RoleRateThrottle(BaseThrottle):
+    """
+    Per-user limits by role and endpoint, plus a site-wide capacity that a
+    share is reserved from for custodians and admins.
+
+    Views name their endpoint with ``throttle_scope``; writes use the
+    ``<scope>_write`` limits. Rates come from DEFAULT_THROTTLE_RATES, most
+    specific first: ``student.bookings_write``, then ``student.bookings``,
+    then ``student``. ``capacity[.<scope>]`` is the site-wide rate of each
+    scope. Roles outside THROTTLE_RESERVED_ROLES can only use the part of it
+    that THROTTLE_RESERVED_SHARE leaves, so staff requests still get through
+    while students are being turned away.
+    """
+    timer = time.time
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if not throttling_enabled():
+            return True
+        user = request.user
+        authenticated = bool(user and user.is_authenticated)
+        role = (getattr(user, 'role', None) or 'authenticated') if authenticated else 'anon'
+        ident = user.pk if authenticated else self.get_ident(request)
+        scope = getattr(view, 'throttle_scope', None) or 'default'
+        scopes = [scope] if request.method in SAFE_METHODS else [f'{scope}_write', scope]
+        now = self.timer()
+
+        rate = self.get_rate(role, scopes)
+        own = None
+        if rate:
+            own = SlidingWindow(f'{role}:{scopes[0]}:{ident}', rate[1])
+            self.wait_seconds = own.acquire(rate[0], now)
+            if self.wait_seconds is not None:
+                return False
+
+        capacity = self.get_rate('capacity', scopes)
+        if capacity:
+            limit, period = capacity
+            if role not in getattr(settings, 'THROTTLE_RESERVED_ROLES', ('custodian', 'admin')):
+                limit = math.floor(limit * (1 - getattr(settings, 'THROTTLE_RESERVED_SHARE', 0.2)))
+            self.wait_seconds = SlidingWindow(f'capacity:{scopes[0]}', period).acquire(limit, now)
+            if self.wait_seconds is not None:
+                if own is not None:
+                    own.release()
+                return False
+        return True
+
+    def get_rate(self, name, scopes):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        for key in [f'{name}.{scope}' for scope in scopes] + [name]:
+            if key in rates:
+                return parse_rate(rates[key])
+        return None
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,17 @@
+class LoadedValuesMixin:
+    """
+    Model mixin that remembers the stored column values of an instance in
+    ``_loaded_values`` ({attname: value}), as loaded and after each save, so
+    signal handlers can tell what a save changed. Deferred fields are absent.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname)
+                               for field in self._meta.concrete_fields}
@@ -16,9 +16,8 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
-from rest_framework.authtoken import views as drf_auth_views
 from rest_framework import routers
-from accounts.views import UserViewSet
+from accounts.views import ObtainExpiringAuthToken, UserViewSet
 
 
 router = routers.DefaultRouter()
@@ -27,7 +26,7 @@ router.register(r'users', UserViewSet, basename='users')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/api-auth/', include('rest_framework.urls')),
-    path('api/api-token-auth/', drf_auth_views.obtain_auth_token),
+    path('api/api-token-auth/', ObtainExpiringAuthToken.as_view()),
     # path('accounts/', include('accounts.urls')),
     path('api/', include('accounts.urls')),
     path('api/', include(router.urls)),
@@ -1,13 +1,76 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+
+from hostel_booking_system.pagination import EstimatedCountPaginator
 from .models import Hostel, Rooms
+from .signals import rooms_bulk_saved
+
+
+class CappedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    A related-object filter that lists at most ``limit`` choices (and the
+    selected one) instead of every row of the related table. Other values
+    still filter when linked to, as the hostel list's room links do.
+    """
+    limit = 50
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or ('pk',)
+        related = field.related_model._default_manager.order_by(*ordering)
+        choices = [(obj.pk, str(obj)) for obj in related[:self.limit]]
+        if self.lookup_val and self.lookup_val[0] not in {str(pk) for pk, _ in choices}:
+            choices += [(obj.pk, str(obj)) for obj in related.filter(pk=self.lookup_val[0])]
+        return choices
+
 
 class HostelAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'location', 'capacity', 'custodian_id')
+    list_display = ('id', 'name', 'location', 'capacity', 'custodian_id', 'rooms_link')
+    list_select_related = ('custodian_id',)
     search_fields = ('name', 'location')
+    ordering = ('name',)
+    autocomplete_fields = ('custodian_id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Rooms')
+    def rooms_link(self, obj):
+        url = reverse('admin:hostels_rooms_changelist') + f'?hostel__id__exact={obj.pk}'
+        return format_html('<a href="{}">Rooms</a>', url)
+
 
 class RoomsAdmin(admin.ModelAdmin):
     list_display = ('room_id', 'room_number', 'room_type', 'price_per_semester', 'hostel', 'is_available')
-    list_filter = ('is_available', 'room_type', 'hostel')
+    list_filter = ('is_available', 'room_type', ('hostel', CappedRelatedFieldListFilter))
+    list_select_related = ('hostel',)
+    search_fields = ('room_number', '^hostel__name')
+    autocomplete_fields = ('hostel',)
+    actions = ('mark_available', 'mark_unavailable')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        # Rooms.__str__ reads the hostel name, also in autocomplete results.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    def set_available(self, request, queryset, is_available):
+        rooms = list(queryset.values_list('pk', 'hostel_id'))
+        updated = Rooms.objects.filter(pk__in=[pk for pk, _ in rooms]).update(
+            is_available=is_available, updated_at=timezone.now())
+        rooms_bulk_saved.send(sender=Rooms, hostel_ids={hostel_id for _, hostel_id in rooms},
+                              room_ids=[pk for pk, _ in rooms], created=False, fields=['is_available'])
+        self.message_user(request, f'{updated} room(s) marked {"available" if is_available else "unavailable"}.',
+                          messages.SUCCESS)
+
+    @admin.action(description='Mark selected rooms available', permissions=['change'])
+    def mark_available(self, request, queryset):
+        self.set_available(request, queryset, True)
+
+    @admin.action(description='Mark selected rooms unavailable', permissions=['change'])
+    def mark_unavailable(self, request, queryset):
+        self.set_available(request, queryset, False)
 
 admin.site.register(Hostel, HostelAdmin)
 admin.site.register(Rooms, RoomsAdmin)
@@ -0,0 +1,168 @@
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .models import Hostel, Rooms
+from .serializers import BulkRoomSerializer
+from .signals import rooms_bulk_saved
+
+BATCH_SIZE = 500
+
+
+class BulkRoomError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+    def as_list(self):
+        return [{'index': index, 'errors': errors} for index, errors in sorted(self.errors.items())]
+
+
+def as_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _load_hostels(items, extra=()):
+    ids = {as_uuid(item.get('hostel')) for item in items if isinstance(item, dict)}
+    ids.update(extra)
+    ids.discard(None)
+    return Hostel.objects.in_bulk(ids)
+
+
+def add_error(errors, index, field, message):
+    errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+
+def validate_item(serializer, item, errors, index):
+    # One serializer validates every item, so its fields are built only once.
+    try:
+        return serializer.run_validation(item)
+    except ValidationError as exc:
+        errors[index] = dict(as_serializer_error(exc))
+        return None
+
+
+def check_unique(rooms, errors, exclude=()):
+    """
+    Check (hostel, room_number) uniqueness for a whole batch: against the
+    other items in the batch and, with a single query, against the database.
+    """
+    seen = {}
+    for index, room in rooms:
+        key = (room.hostel_id, room.room_number)
+        if key in seen:
+            add_error(errors, index, 'room_number',
+                       'Duplicate room number for this hostel in the request.')
+        else:
+            seen[key] = index
+    if not seen:
+        return
+    existing = Rooms.objects.filter(
+        hostel_id__in={hostel_id for hostel_id, _ in seen},
+        room_number__in={room_number for _, room_number in seen},
+    ).exclude(pk__in=exclude).values_list('hostel_id', 'room_number')
+    for key in existing:
+        if key in seen:
+            add_error(errors, seen[key], 'room_number',
+                       'A room with this number already exists in this hostel.')
+
+
+def _write(rooms, errors, write, exclude=()):
+    """
+    Run ``write`` in a savepoint. When a concurrent request has taken one of
+    the room numbers since check_unique ran, report the clash as a
+    BulkRoomError instead of letting the IntegrityError escape.
+    """
+    try:
+        with transaction.atomic():
+            write()
+    except IntegrityError:
+        check_unique(rooms, errors, exclude)
+        if not errors:
+            for index, _ in rooms:
+                add_error(errors, index, 'non_field_errors', 'The room could not be saved; retry the request.')
+        raise BulkRoomError(errors)
+
+
+def bulk_create_rooms(items):
+    """
+    Validate and insert many rooms at once. Either every item is created or,
+    if any item is invalid, nothing is written and BulkRoomError carries the
+    errors keyed by item index.
+    """
+    serializer = BulkRoomSerializer(context={'hostels': _load_hostels(items)})
+    errors = {}
+    rooms = []
+    for index, item in enumerate(items):
+        validated_data = validate_item(serializer, item, errors, index)
+        if validated_data is not None:
+            rooms.append((index, Rooms(**validated_data)))
+    created = [room for _, room in rooms]
+    with transaction.atomic():
+        check_unique(rooms, errors)
+        if errors:
+            raise BulkRoomError(errors)
+        _write(rooms, errors, lambda: Rooms.objects.bulk_create(created, batch_size=BATCH_SIZE))
+    rooms_bulk_saved.send(sender=Rooms, hostel_ids={room.hostel_id for room in created},
+                          room_ids=[room.pk for room in created], created=True)
+    return created
+
+
+def bulk_update_rooms(items):
+    """
+    Apply partial updates, each identified by ``room_id``, with the same
+    all-or-nothing semantics as bulk_create_rooms.
+    """
+    room_ids = [as_uuid(item.get('room_id')) if isinstance(item, dict) else None for item in items]
+    existing = Rooms.objects.in_bulk([room_id for room_id in room_ids if room_id])
+    hostels = _load_hostels(items, extra={room.hostel_id for room in existing.values()})
+    for room in existing.values():
+        room.hostel = hostels[room.hostel_id]
+    serializer = BulkRoomSerializer(partial=True, context={'hostels': hostels})
+
+    errors = {}
+    rooms = []
+    fields = set()
+    affected_hostels = set()
+    claimed = set()
+    for index, (item, room_id) in enumerate(zip(items, room_ids)):
+        room = existing.get(room_id)
+        if room is None:
+            add_error(errors, index, 'room_id', 'Room not found.')
+            continue
+        if room_id in claimed:
+            add_error(errors, index, 'room_id', 'Room appears more than once in the request.')
+            continue
+        claimed.add(room_id)
+        affected_hostels.add(room.hostel_id)
+        validated_data = validate_item(serializer, item, errors, index)
+        if validated_data is None:
+            continue
+        for attr, value in validated_data.items():
+            setattr(room, attr, value)
+        fields.update(validated_data)
+        affected_hostels.add(room.hostel_id)
+        rooms.append((index, room))
+    updated = [room for _, room in rooms]
+    with transaction.atomic():
+        check_unique(rooms, errors, exclude=claimed)
+        if errors:
+            raise BulkRoomError(errors)
+        if not fields:
+            return updated
+        # bulk_update does not run auto_now, so stamp updated_at ourselves.
+        now = timezone.now()
+        for room in updated:
+            room.updated_at = now
+        _write(rooms, errors, lambda: Rooms.objects.bulk_update(
+            updated, sorted(fields | {'updated_at'}), batch_size=BATCH_SIZE), exclude=claimed)
+    rooms_bulk_saved.send(sender=Rooms, hostel_ids=affected_hostels,
+                          room_ids=[room.pk for room in updated], created=False,
+                          rooms=updated, fields=sorted(fields))
+    return updated
@@ -0,0 +1,320 @@
+import csv
+import io
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .bulk import add_error, as_uuid, check_unique, validate_item
+from .models import Hostel, Rooms
+from .serializers import BulkRoomSerializer, ImportHostelSerializer
+from .signals import hostels_bulk_saved, rooms_bulk_saved
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+FORMATS = ('csv', 'ndjson')
+
+
+class CatalogImportError(Exception):
+    pass
+
+
+def detect_format(name):
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    raise CatalogImportError(f'Cannot tell the format of "{name}"; choose csv or ndjson.')
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line number, row) pairs from a binary stream, one row at a time.
+
+    Empty CSV cells are dropped so optional fields fall back to their
+    defaults. NDJSON lines that are not JSON objects yield None as the row.
+    """
+    if fmt not in FORMATS:
+        raise CatalogImportError(f'Unknown format "{fmt}"; choose csv or ndjson.')
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, {key.strip(): value.strip() for key, value in row.items()
+                                        if key and isinstance(value, str) and value.strip()}
+        else:
+            for number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield number, row if isinstance(row, dict) else None
+    finally:
+        # Leave the caller's stream open.
+        text.detach()
+
+
+def _group_by_name(queryset, names):
+    groups = defaultdict(list)
+    for instance in queryset.filter(name__in=names):
+        groups[instance.name].append(instance)
+    return groups
+
+
+class CatalogImporter:
+    """
+    Streams rows from a CSV or NDJSON file and writes them in batches.
+
+    Each batch is resolved with a fixed number of queries, validated with the
+    API serializers and written with bulk_create/bulk_update in its own
+    transaction, so memory depends on the batch size and not on the file.
+    Invalid rows are skipped and reported by line number, and so are rows
+    that a concurrent writer makes invalid before the batch is written. With
+    ``upsert``, rows that already exist are updated instead of reported;
+    ``dry_run`` runs the whole import in one transaction that is rolled back.
+    """
+    model = None
+
+    def __init__(self, dry_run=False, upsert=False, batch_size=BATCH_SIZE):
+        self.dry_run = dry_run
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.summary = {'rows': 0, 'created': 0, 'updated': 0, 'invalid': 0, 'errors': [],
+                        'dry_run': dry_run, 'upsert': upsert}
+
+    def run(self, stream, fmt):
+        started = time.perf_counter()
+        rows = read_rows(stream, fmt)
+        with transaction.atomic() if self.dry_run else nullcontext():
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch)
+            if self.dry_run:
+                transaction.set_rollback(True)
+        self.summary['seconds'] = round(time.perf_counter() - started, 3)
+        return self.summary
+
+    def import_batch(self, batch):
+        errors = {}
+        rows = []
+        for line, row in batch:
+            if row is None:
+                add_error(errors, line, 'non_field_errors', 'Expected a JSON object.')
+            else:
+                rows.append((line, row))
+        with transaction.atomic():
+            created, updated, fields = self.prepare(rows, errors)
+            created, updated = self.save(created, updated, fields, errors)
+        if not self.dry_run:
+            self.send(created, updated, fields)
+        self.summary['rows'] += len(batch)
+        self.summary['created'] += len(created)
+        self.summary['updated'] += len(updated)
+        self.summary['invalid'] += len(errors)
+        for line, row_errors in sorted(errors.items()):
+            if len(self.summary['errors']) >= MAX_REPORTED_ERRORS:
+                break
+            self.summary['errors'].append({'line': line, 'errors': row_errors})
+
+    def prepare(self, rows, errors):
+        """
+        Return the (line, instance) pairs to create, those to update and the
+        fields to update, adding an error for each row that is left out.
+        """
+        raise NotImplementedError
+
+    def save(self, created, updated, fields, errors):
+        """
+        Write the batch in a savepoint and return the instances written.
+
+        When a concurrent writer has taken a room number or removed a related
+        row since prepare() checked, the clashing lines are reported and the
+        rest of the batch is written once more. Lines that still cannot be
+        written are reported too, rather than failing the import halfway.
+        """
+        for retry in (True, False):
+            try:
+                with transaction.atomic():
+                    self.write([instance for _, instance in created], [instance for _, instance in updated], fields)
+                return [instance for _, instance in created], [instance for _, instance in updated]
+            except IntegrityError:
+                before = set(errors)
+                self.check_conflicts(created, updated, errors)
+                if not retry or set(errors) == before:
+                    for line, _ in created + updated:
+                        if line not in errors:
+                            add_error(errors, line, 'non_field_errors', 'The row could not be saved; import it again.')
+                    return [], []
+                created = [(line, instance) for line, instance in created if line not in errors]
+                updated = [(line, instance) for line, instance in updated if line not in errors]
+
+    def check_conflicts(self, created, updated, errors):
+        """Add an error for each line the database no longer accepts."""
+        raise NotImplementedError
+
+    def write(self, created, updated, fields):
+        self.model.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            # bulk_update does not run auto_now, so stamp updated_at ourselves.
+            now = timezone.now()
+            for instance in updated:
+                instance.updated_at = now
+            self.model.objects.bulk_update(updated, sorted(fields | {'updated_at'}), batch_size=self.batch_size)
+
+    def send(self, created, updated, fields):
+        raise NotImplementedError
+
+
+class HostelImporter(CatalogImporter):
+    """
+    Columns: name, location, capacity, description and custodian_email.
+    Hostels are matched by name.
+    """
+    model = Hostel
+
+    def prepare(self, rows, errors):
+        emails = {row['custodian_email'] for _, row in rows if isinstance(row.get('custodian_email'), str)}
+        custodians = {user.email: user for user in CustomUser.objects.filter(email__in=emails)}
+        serializer = ImportHostelSerializer(context={'custodians': custodians})
+        existing = _group_by_name(Hostel.objects.all(), {
+            row['name'] for _, row in rows if isinstance(row.get('name'), str)})
+
+        created, updated, fields, seen = [], [], set(), set()
+        for line, row in rows:
+            data = {key: value for key, value in row.items() if key not in ('custodian_email', 'custodian_id')}
+            if 'custodian_email' in row:
+                data['custodian_id'] = row['custodian_email']
+            validated_data = validate_item(serializer, data, errors, line)
+            if validated_data is None:
+                continue
+            name = validated_data['name']
+            matches = existing.get(name, [])
+            if name in seen:
+                add_error(errors, line, 'name', 'Duplicate hostel name in the file.')
+            elif matches and not self.upsert:
+                add_error(errors, line, 'name', 'A hostel with this name already exists.')
+            elif len(matches) > 1:
+                add_error(errors, line, 'name', 'More than one hostel has this name.')
+            elif matches:
+                hostel = matches[0]
+                for attr, value in validated_data.items():
+                    setattr(hostel, attr, value)
+                # The name matched, so it is not rewritten.
+                fields.update(set(validated_data) - {'name'})
+                updated.append((line, hostel))
+            else:
+                created.append((line, Hostel(**validated_data)))
+            seen.add(name)
+        return created, updated, fields
+
+    def check_conflicts(self, created, updated, errors):
+        rows = created + updated
+        # Hostel names are only unique by convention; the custodian may be gone.
+        custodians = set(CustomUser.objects.filter(
+            pk__in={hostel.custodian_id_id for _, hostel in rows}).values_list('pk', flat=True))
+        for line, hostel in rows:
+            if hostel.custodian_id_id not in custodians:
+                add_error(errors, line, 'custodian_email', 'The custodian no longer exists.')
+
+    def send(self, created, updated, fields):
+        if created:
+            hostels_bulk_saved.send(sender=Hostel, hostel_ids=[hostel.pk for hostel in created], created=True)
+        if updated:
+            hostels_bulk_saved.send(sender=Hostel, hostel_ids=[hostel.pk for hostel in updated], created=False,
+                                    fields=sorted(fields))
+
+
+class RoomImporter(CatalogImporter):
+    """
+    Columns: hostel (its id) or hostel_name, room_number, room_type,
+    price_per_semester and is_available. Rooms are matched by hostel and
+    room number.
+    """
+    model = Rooms
+
+    def resolve_hostels(self, rows, errors):
+        ids = {as_uuid(row['hostel']) for _, row in rows if 'hostel' in row}
+        ids.discard(None)
+        hostels = Hostel.objects.in_bulk(ids)
+        by_name = _group_by_name(Hostel.objects.all(), {
+            row['hostel_name'] for _, row in rows if 'hostel' not in row and isinstance(row.get('hostel_name'), str)})
+        resolved = []
+        for line, row in rows:
+            data = {key: value for key, value in row.items() if key != 'hostel_name'}
+            if 'hostel' not in data and 'hostel_name' in row:
+                matches = by_name.get(row['hostel_name'], [])
+                if len(matches) != 1:
+                    add_error(errors, line, 'hostel_name', 'More than one hostel has this name; use its id.'
+                               if matches else 'No hostel with this name.')
+                    continue
+                hostels[matches[0].pk] = matches[0]
+                data['hostel'] = matches[0].pk
+            resolved.append((line, data))
+        return hostels, resolved
+
+    def prepare(self, rows, errors):
+        hostels, rows = self.resolve_hostels(rows, errors)
+        serializer = BulkRoomSerializer(context={'hostels': hostels})
+        valid = []
+        for line, data in rows:
+            validated_data = validate_item(serializer, data, errors, line)
+            if validated_data is not None:
+                valid.append((line, validated_data))
+        existing = {(room.hostel_id, room.room_number): room for room in Rooms.objects.filter(
+            hostel_id__in={data['hostel'].pk for _, data in valid},
+            room_number__in={data['room_number'] for _, data in valid})}
+
+        created, updated, fields, seen = [], [], set(), set()
+        for line, validated_data in valid:
+            key = (validated_data['hostel'].pk, validated_data['room_number'])
+            room = existing.get(key)
+            if key in seen:
+                add_error(errors, line, 'room_number', 'Duplicate room number for this hostel in the file.')
+            elif room is not None and not self.upsert:
+                add_error(errors, line, 'room_number', 'A room with this number already exists in this hostel.')
+            elif room is not None:
+                for attr, value in validated_data.items():
+                    setattr(room, attr, value)
+                fields.update(validated_data)
+                updated.append((line, room))
+            else:
+                created.append((line, Rooms(**validated_data)))
+            seen.add(key)
+        return created, updated, fields
+
+    def check_conflicts(self, created, updated, errors):
+        check_unique(created, errors)
+        rows = created + updated
+        hostels = set(Hostel.objects.filter(pk__in={room.hostel_id for _, room in rows}).values_list('pk', flat=True))
+        for line, room in rows:
+            if room.hostel_id not in hostels:
+                add_error(errors, line, 'hostel', 'The hostel no longer exists.')
+
+    def send(self, created, updated, fields):
+        if created:
+            rooms_bulk_saved.send(sender=Rooms, hostel_ids={room.hostel_id for room in created},
+                                  room_ids=[room.pk for room in created], created=True)
+        if updated:
+            rooms_bulk_saved.send(sender=Rooms, hostel_ids={room.hostel_id for room in updated},
+                                  room_ids=[room.pk for room in updated], created=False,
+                                  rooms=updated, fields=sorted(fields))
+
+
+IMPORTERS = {
+    'hostels': HostelImporter,
+    'rooms': RoomImporter,
+}
+
+
+def import_catalog(kind, stream, fmt, dry_run=False, upsert=False, batch_size=BATCH_SIZE):
+    """Import hostels or rooms from a binary CSV or NDJSON stream and return a summary."""
+    return IMPORTERS[kind](dry_run=dry_run, upsert=upsert, batch_size=batch_size).run(stream, fmt)
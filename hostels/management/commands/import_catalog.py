@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostels.importer import BATCH_SIZE, FORMATS, IMPORTERS, CatalogImportError, detect_format, import_catalog
+
+
+class Command(BaseCommand):
+    help = ('Stream hostels or rooms from a CSV or NDJSON file into the database in batches. '
+            'Invalid rows are skipped and reported by line number.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='File to read, or - for standard input.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension (.csv, .ndjson or .jsonl).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and roll everything back.')
+        parser.add_argument('--upsert', action='store_true',
+                            help='Update hostels matched by name and rooms matched by hostel and room '
+                                 'number instead of reporting them as duplicates.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            fmt = options['format'] or detect_format(path)
+            if path == '-':
+                summary = self.run(sys.stdin.buffer, fmt, options)
+            else:
+                with open(path, 'rb') as stream:
+                    summary = self.run(stream, fmt, options)
+        except (CatalogImportError, OSError) as exc:
+            raise CommandError(exc)
+        self.stdout.write(json.dumps(summary, indent=2))
+        if summary['invalid']:
+            raise CommandError(f'{summary["invalid"]} invalid row(s) were skipped.')
+
+    def run(self, stream, fmt, options):
+        return import_catalog(options['kind'], stream, fmt, dry_run=options['dry_run'],
+                              upsert=options['upsert'], batch_size=options['batch_size'])
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0002_rooms'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rooms',
+            index=models.Index(fields=['created_at', 'room_id'], name='rooms_created_id'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostels', '0003_rooms_created_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rooms',
+            index=models.Index(fields=['room_type', 'created_at', 'room_id'], name='rooms_type_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='rooms',
+            index=models.Index(fields=['price_per_semester', 'room_id'], name='rooms_price_id'),
+        ),
+        migrations.AddIndex(
+            model_name='rooms',
+            index=models.Index(fields=['room_number', 'room_id'], name='rooms_number_id'),
+        ),
+    ]
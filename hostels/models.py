@@ -2,6 +2,7 @@ import uuid
 from django.db import models
 from django.core.exceptions import ValidationError
 from accounts.models import CustomUser
+from hostel_booking_system.tracking import LoadedValuesMixin
 
 # Create your models here.
 
@@ -31,7 +32,7 @@ class Hostel(models.Model):
         return self.name
 
 
-class Rooms(models.Model):
+class Rooms(LoadedValuesMixin, models.Model):
     ROOM_TYPES = [
         ('single', 'Single'),
         ('double', 'Double'),
@@ -52,6 +53,13 @@ class Rooms(models.Model):
 
     class Meta:
         unique_together = ('hostel', 'room_number')
+        indexes = [
+            models.Index(fields=['created_at', 'room_id'], name='rooms_created_id'),
+            # Filters and orderings of the room lists; see check_query_plans.
+            models.Index(fields=['room_type', 'created_at', 'room_id'], name='rooms_type_created_id'),
+            models.Index(fields=['price_per_semester', 'room_id'], name='rooms_price_id'),
+            models.Index(fields=['room_number', 'room_id'], name='rooms_number_id'),
+        ]
 
     def __str__(self):
         return f"{self.hostel.name} - Room {self.room_number}"
@@ -1,4 +1,7 @@
+import uuid
+
 from rest_framework import serializers
+from accounts.models import CustomUser
 from .models import Hostel, Rooms
 
 
@@ -58,6 +61,54 @@ class RoomSerializer(serializers.ModelSerializer):
         return value
 
 
+class PreloadedHostelField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves hostels from the ``hostels`` dict in the serializer context
+    instead of issuing one query per item.
+    """
+
+    def to_internal_value(self, data):
+        try:
+            return self.context['hostels'][uuid.UUID(str(data))]
+        except (KeyError, ValueError, TypeError, AttributeError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class BulkRoomSerializer(RoomSerializer):
+    hostel = PreloadedHostelField(queryset=Hostel.objects.all())
+
+    class Meta(RoomSerializer.Meta):
+        # (hostel, room_number) uniqueness is checked for the whole batch at once.
+        validators = []
+
+
+class PreloadedCustodianField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves users by email from the ``custodians`` dict in the serializer
+    context, which the importer fills with one query per batch.
+    """
+    default_error_messages = {
+        'does_not_exist': 'No user with email "{pk_value}".',
+    }
+
+    def to_internal_value(self, data):
+        try:
+            return self.context['custodians'][data]
+        except (KeyError, TypeError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class ImportHostelSerializer(HostelSerializer):
+    custodian_id = PreloadedCustodianField(queryset=CustomUser.objects.all())
+
+
+class CatalogImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'ndjson'], required=False)
+    dry_run = serializers.BooleanField(default=False)
+    upsert = serializers.BooleanField(default=False)
+
+
 class StudentRoomSerializer(serializers.ModelSerializer):
     hostel_name = serializers.ReadOnlyField(source='hostel.name')
 
@@ -65,3 +116,15 @@ class StudentRoomSerializer(serializers.ModelSerializer):
         model = Rooms
         fields = ['hostel_name', 'room_number', 'room_type',
                   'price_per_semester', 'is_available']
+
+
+class RoomAvailabilityQuerySerializer(serializers.Serializer):
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    hostel = serializers.UUIDField(required=False)
+
+    def validate(self, data):
+        if data['check_in'] >= data['check_out']:
+            raise serializers.ValidationError(
+                "Check-out date must be after check-in date.")
+        return data
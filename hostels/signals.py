@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from hostel_booking_system.caching import bump_generation
+from .models import Hostel, Rooms
+
+# Sent after rooms are written with bulk_create/bulk_update, which skip the
+# per-instance save signals. ``hostel_ids`` and ``room_ids`` list the hostels
+# and rooms affected; ``created`` tells inserts from updates. Updates also send
+# ``fields``, the names of the fields written, and, when the instances were
+# loaded, ``rooms``, whose ``_loaded_values`` still hold the stored state from
+# before the update.
+rooms_bulk_saved = Signal()
+
+# The same for hostels written in bulk; sent with ``hostel_ids`` and ``created``,
+# and for updates with ``fields``, the names of the fields written.
+hostels_bulk_saved = Signal()
+
+
+@receiver([post_save, post_delete], sender=Hostel)
+def hostel_changed(sender, instance, **kwargs):
+    # Room payloads carry hostel_name, and deleting a hostel cascades to rooms.
+    bump_generation('hostels', 'rooms')
+
+
+@receiver([post_save, post_delete], sender=Rooms)
+def room_changed(sender, instance, **kwargs):
+    bump_generation('rooms')
+
+
+@receiver(rooms_bulk_saved)
+def rooms_bulk_changed(sender, hostel_ids, **kwargs):
+    bump_generation('rooms')
+
+
+@receiver(hostels_bulk_saved)
+def hostels_bulk_changed(sender, hostel_ids, **kwargs):
+    bump_generation('hostels', 'rooms')
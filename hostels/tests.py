@@ -1,3 +1,823 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import tracemalloc
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from itertools import count
 
-# Create your tests here.
+import threading
+import time
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import CustomUser
+from bookings.models import Booking
+from hostel_booking_system import compression, renderers
+from hostel_booking_system.caching import get_generations, single_flight
+from hostel_booking_system.compression import accepted_encodings
+from hostel_booking_system.renderers import FastJSONRenderer
+from hostel_booking_system.row_serializers import compile_row_serializer
+from hostel_booking_system.testing import QueryBudgetMixin, walk_cursor_pages
+from .admin import CappedRelatedFieldListFilter
+from .bulk import check_unique
+from .importer import RoomImporter, import_catalog
+from .models import Hostel, Rooms
+from .serializers import RoomSerializer, StudentRoomSerializer
+
+
+class RoomAvailabilityTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        self.booked = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'), is_available=True)
+        self.free = Rooms.objects.create(
+            hostel=self.hostel, room_number='102', price_per_semester=Decimal('500'), is_available=True)
+        Rooms.objects.create(
+            hostel=self.hostel, room_number='103', price_per_semester=Decimal('500'), is_available=False)
+        Booking.objects.create(
+            student_id=self.student, room_id=self.booked, status='approved',
+            check_in_date=date(2025, 1, 10), check_out_date=date(2025, 5, 10))
+        self.client.force_authenticate(self.student)
+        self.url = reverse('room-availability')
+
+    def room_numbers(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(room['room_number'] for room in response.data['results'])
+
+    def test_overlapping_approved_booking_hides_room(self):
+        self.assertEqual(self.room_numbers(check_in='2025-02-01', check_out='2025-03-01'), ['102'])
+
+    def test_adjacent_stay_does_not_clash(self):
+        self.assertEqual(self.room_numbers(check_in='2025-05-10', check_out='2025-06-01'), ['101', '102'])
+
+    def test_pending_booking_does_not_hide_room(self):
+        Booking.objects.filter(room_id=self.booked).update(status='pending')
+        self.assertEqual(self.room_numbers(check_in='2025-02-01', check_out='2025-03-01'), ['101', '102'])
+
+    def test_interval_index_matches_database(self):
+        params = dict(check_in='2025-02-01', check_out='2025-03-01', hostel=str(self.hostel.pk))
+        expected = self.room_numbers(**params)
+        with self.settings(ROOM_INTERVAL_INDEX_ENABLED=True):
+            self.assertEqual(self.room_numbers(**params), expected)
+            with self.captureOnCommitCallbacks(execute=True):
+                Booking.objects.filter(room_id=self.booked).delete()
+            self.assertEqual(self.room_numbers(**params), ['101', '102'])
+
+    def test_invalid_range_is_rejected(self):
+        response = self.client.get(self.url, {'check_in': '2025-03-01', 'check_out': '2025-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CatalogTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.numbers = count()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pass12345!', role='admin',
+            first_name='Ad', last_name='Min', username='admin')
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+
+    def make_hostel(self):
+        return Hostel.objects.create(name=f'Hostel {next(self.numbers)}', location='Campus',
+                                     capacity=10, custodian_id=self.custodian)
+
+    def make_room(self):
+        return Rooms.objects.create(hostel=self.make_hostel(), room_number=str(next(self.numbers)),
+                                    price_per_semester=Decimal('500'), is_available=True)
+
+    def assertSameContent(self, url, params):
+        # Lists built from values_list() rows against the serializers' output.
+        with self.settings(CATALOG_CACHE_ENABLED=False):
+            fast = self.client.get(url, params)
+            with self.settings(FAST_LIST_SERIALIZATION_ENABLED=False):
+                slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+
+
+class CatalogQueryBudgetTests(CatalogTestCase):
+    def test_hostel_list(self):
+        for user in (self.admin, self.custodian, self.student):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                self.assertQueryBudget(reverse('hostel-list-create'), self.make_hostel, budget=2)
+
+    def test_room_list(self):
+        for user in (self.custodian, self.student):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                self.assertQueryBudget(reverse('room-list-create'), self.make_room, budget=2)
+
+    def test_room_availability(self):
+        self.client.force_authenticate(self.student)
+        self.assertQueryBudget(reverse('room-availability'), self.make_room, budget=2,
+                               params={'check_in': '2025-01-01', 'check_out': '2025-02-01'})
+
+    def test_room_detail(self):
+        self.client.force_authenticate(self.custodian)
+        room = self.make_room()
+        url = reverse('room-retrieve-update-destroy', args=[room.pk])
+        # The room, then the timestamps behind its ETag, which the trimmed row does not hold.
+        self.assertLessEqual(self.count_queries(url), 2)
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class RoomAdminTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.superuser = CustomUser.objects.create_superuser(
+            email='root@example.com', password='pass12345!', role='admin',
+            first_name='Ro', last_name='Ot', username='root')
+        self.client.force_login(self.superuser)
+        self.url = reverse('admin:hostels_rooms_changelist')
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        # The first request also loads the session's user.
+        self.count_queries(self.url)
+        with patch.object(CappedRelatedFieldListFilter, 'limit', 3):
+            self.assertQueryBudget(self.url, self.make_room, budget=5)
+
+    def test_hostel_filter_lists_a_capped_number_of_choices(self):
+        hostels = [self.make_hostel() for _ in range(5)]
+        with patch.object(CappedRelatedFieldListFilter, 'limit', 3):
+            response = self.client.get(self.url, {'hostel__id__exact': hostels[-1].pk})
+        choices = [choice['display'] for choice in response.context['cl'].filter_specs[2].choices(
+            response.context['cl'])][1:]
+        self.assertEqual(len(choices), 4)
+        self.assertIn(hostels[-1].name, choices)
+
+    def test_bulk_availability_invalidates_the_catalog(self):
+        rooms = [self.make_room() for _ in range(3)]
+        before = get_generations(['rooms'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {'action': 'mark_unavailable',
+                                        '_selected_action': [str(room.pk) for room in rooms[:2]]})
+        self.assertEqual(list(Rooms.objects.order_by('created_at').values_list('is_available', flat=True)),
+                         [False, False, True])
+        self.assertNotEqual(get_generations(['rooms']), before)
+
+
+class CatalogCacheTests(CatalogTestCase):
+    def test_repeat_request_is_served_from_cache(self):
+        self.client.force_authenticate(self.student)
+        self.make_room()
+        url = reverse('room-list-create')
+        first = self.client.get(url, {'room_type': 'single', 'ordering': 'room_number'})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'ordering': 'room_number', 'room_type': 'single'})
+        self.assertEqual(first.data, second.data)
+
+    def test_roles_get_their_own_entries(self):
+        self.make_room()
+        url = reverse('room-list-create')
+        self.client.force_authenticate(self.student)
+        student = self.client.get(url).data['results'][0]
+        self.client.force_authenticate(self.custodian)
+        custodian = self.client.get(url).data['results'][0]
+        self.assertNotIn('room_id', student)
+        self.assertIn('room_id', custodian)
+
+    def test_writes_invalidate_dependent_lists(self):
+        self.client.force_authenticate(self.student)
+        room = self.make_room()
+        rooms_url = reverse('room-list-create')
+        hostels_url = reverse('hostel-list-create')
+        self.client.get(rooms_url)
+        self.client.get(hostels_url)
+
+        room.price_per_semester = Decimal('750.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            room.save()
+        self.assertEqual(self.client.get(rooms_url).data['results'][0]['price_per_semester'], '750.00')
+        with self.assertNumQueries(0):
+            self.client.get(hostels_url)
+
+        room.hostel.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            room.hostel.save()
+        self.assertEqual(self.client.get(rooms_url).data['results'][0]['hostel_name'], 'Renamed')
+
+    def test_approved_booking_invalidates_availability(self):
+        self.client.force_authenticate(self.student)
+        room = self.make_room()
+        url = reverse('room-availability')
+        params = {'check_in': '2025-01-01', 'check_out': '2025-02-01'}
+        self.assertEqual(len(self.client.get(url, params).data['results']), 1)
+        booking = Booking.objects.create(student_id=self.student, room_id=room,
+                                         check_in_date=date(2025, 1, 1), check_out_date=date(2025, 3, 1))
+        with self.assertNumQueries(0):
+            self.client.get(url, params)
+        booking.status = 'approved'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(len(self.client.get(url, params).data['results']), 0)
+
+    def test_generations_move_when_the_write_commits(self):
+        room = self.make_room()
+        before = get_generations(['rooms'])
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                room.save()
+                # A read racing the write must not cache the old rows under a new generation.
+                self.assertEqual(get_generations(['rooms']), before)
+        committed = get_generations(['rooms'])
+        self.assertNotEqual(committed, before)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                room.save()
+                raise RuntimeError
+        self.assertEqual(get_generations(['rooms']), committed)
+
+
+class ConditionalCatalogTests(CatalogTestCase):
+    def test_unchanged_list_is_not_modified_without_queries(self):
+        self.client.force_authenticate(self.student)
+        room = self.make_room()
+        url = reverse('room-list-create')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], first['ETag'])
+        with self.settings(CATALOG_CACHE_ENABLED=False):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+
+        room.hostel.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            room.hostel.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_roles_and_filters_get_their_own_etags(self):
+        self.make_room()
+        url = reverse('room-list-create')
+        self.client.force_authenticate(self.student)
+        student = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'room_type': 'suite'})['ETag'], student)
+        self.client.force_authenticate(self.custodian)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=student).status_code, status.HTTP_200_OK)
+
+    def test_detail_answers_conditional_gets_from_timestamps(self):
+        self.client.force_authenticate(self.custodian)
+        room = self.make_room()
+        url = reverse('room-retrieve-update-destroy', args=[room.pk])
+        first = self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        # Without hostel_name, renaming the hostel leaves the trimmed ETag alone.
+        trimmed = self.client.get(url, {'fields': 'room_number'})
+        self.assertNotEqual(trimmed['ETag'], first['ETag'])
+        room.hostel.name = 'Renamed'
+        room.hostel.save()
+        response = self.client.get(url, {'fields': 'room_number'}, HTTP_IF_NONE_MATCH=trimmed['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, status.HTTP_200_OK)
+
+    def test_writes_honour_if_match(self):
+        self.client.force_authenticate(self.custodian)
+        room = self.make_room()
+        url = reverse('room-retrieve-update-destroy', args=[room.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.patch(url, {'is_available': False}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {'is_available': True}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertFalse(Rooms.objects.get(pk=room.pk).is_available)
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH=etag).status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Rooms.objects.filter(pk=room.pk).exists())
+
+    def test_if_match_accepts_the_etag_of_a_compressed_response(self):
+        self.client.force_authenticate(self.admin)
+        hostel = self.make_hostel()
+        hostel.description = 'A long description. ' * 100
+        hostel.save()
+        url = reverse('hostel-retrieve-update-destroy', args=[hostel.pk])
+        for encoding in ('gzip', 'br'):
+            with self.subTest(encoding=encoding):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                if response.get('Content-Encoding') != encoding:
+                    self.skipTest(f'{encoding} is not available')
+                self.assertTrue(response['ETag'].startswith('W/'))
+                response = self.client.patch(url, {'capacity': 20}, HTTP_IF_MATCH=response['ETag'])
+                # Applied: the ETag changes, so the next encoding reads a fresh one.
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(url, {'capacity': 30}, HTTP_IF_MATCH='W/"stale"').status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+
+class AsyncCatalogReadTests(CatalogTestCase):
+    """The async views must answer exactly like the sync ones."""
+
+    def assertSameResponse(self, sync_url, async_url, params=None):
+        expected = self.client.get(sync_url, params)
+        actual = self.client.get(async_url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content.replace(sync_url.encode(), async_url.encode()))
+        self.assertEqual(actual.get('ETag'), expected.get('ETag'))
+        self.assertEqual(actual.get('Last-Modified'), expected.get('Last-Modified'))
+        return actual
+
+    def test_lists_match_sync_views_for_every_role(self):
+        for _ in range(12):
+            self.make_room()
+        for user in (self.admin, self.custodian, self.student):
+            for params in ({}, {'page': 2}, {'ordering': 'room_number', 'pagination': 'cursor', 'page_size': 5},
+                           {'search': 'Hostel 3'}):
+                with self.subTest(role=user.role, **params):
+                    self.client.force_authenticate(user)
+                    self.assertSameResponse(reverse('room-list-create'), reverse('async-room-list'), params)
+            with self.subTest(role=user.role):
+                self.assertSameResponse(reverse('hostel-list-create'), reverse('async-hostel-list'))
+
+    def test_room_detail_keeps_permissions(self):
+        room = self.make_room()
+        sync_url = reverse('room-retrieve-update-destroy', args=[room.pk])
+        async_url = reverse('async-room-detail', args=[room.pk])
+        for user in (self.admin, self.custodian, self.student):
+            with self.subTest(role=user.role):
+                self.client.force_authenticate(user)
+                response = self.assertSameResponse(sync_url, async_url)
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN
+                                 if user is self.student else status.HTTP_200_OK)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(async_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(self.custodian)
+        room.delete()
+        self.assertEqual(self.client.get(async_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_views_answer_conditional_gets(self):
+        self.client.force_authenticate(self.custodian)
+        room = self.make_room()
+        urls = [reverse('async-room-list'), reverse('async-hostel-list'),
+                reverse('async-room-detail', args=[room.pk])]
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, status.HTTP_200_OK)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['ETag'], first['ETag'])
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code,
+                                 status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(self.client.get(url, HTTP_IF_MATCH='"stale"').status_code,
+                                 status.HTTP_412_PRECONDITION_FAILED)
+
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        room.room_number = '999'
+        with self.captureOnCommitCallbacks(execute=True):
+            room.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url, changed=True):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                                 status.HTTP_200_OK if 'rooms' in url else status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_views_are_read_only(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('async-hostel-list'), {'name': 'New', 'location': 'Campus',
+                                                                     'capacity': 5, 'custodian_id': self.custodian.pk})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_async_list_uses_the_catalog_cache(self):
+        self.make_room()
+        self.client.force_authenticate(self.student)
+        first = self.client.get(reverse('async-room-list'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('async-room-list'))
+        self.assertEqual(first.content, second.content)
+
+
+class RowSerializationTests(CatalogTestCase):
+    """Lists built from values_list() rows must be byte-identical to the serializers' output."""
+
+    def test_room_lists_match_serializers(self):
+        for number in range(12):
+            room = self.make_room()
+            room.room_type = ['single', 'double', 'triple'][number % 3]
+            room.price_per_semester = Decimal('499.50') + number
+            room.save()
+        for user in (self.admin, self.custodian, self.student):
+            for params in ({}, {'page': 2}, {'room_type': 'double', 'ordering': '-price_per_semester'},
+                           {'ordering': 'room_number', 'pagination': 'cursor', 'page_size': 5},
+                           {'search': 'Hostel 3'}):
+                with self.subTest(role=user.role, **params):
+                    self.client.force_authenticate(user)
+                    self.assertSameContent(reverse('room-list-create'), params)
+                    self.assertSameContent(reverse('async-room-list'), params)
+            with self.subTest(role=user.role, view='availability'):
+                self.assertSameContent(reverse('room-availability'),
+                                       {'check_in': '2025-01-01', 'check_out': '2025-02-01'})
+
+    def test_cursor_pages_match_serializers(self):
+        for _ in range(7):
+            self.make_room()
+        self.client.force_authenticate(self.custodian)
+        url = reverse('room-list-create')
+        params = {'page_size': 3, 'ordering': '-price_per_semester'}
+        with self.settings(FAST_LIST_SERIALIZATION_ENABLED=False, CATALOG_CACHE_ENABLED=False):
+            expected = walk_cursor_pages(self.client, url, params, key='room_id')
+        with self.settings(CATALOG_CACHE_ENABLED=False):
+            actual = walk_cursor_pages(self.client, url, params, key='room_id')
+        self.assertEqual(actual, expected)
+
+    def test_only_plain_serializers_compile(self):
+        class MethodFieldSerializer(RoomSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta(RoomSerializer.Meta):
+                fields = RoomSerializer.Meta.fields + ['label']
+
+            def get_label(self, obj):
+                return str(obj)
+
+        self.assertIsNotNone(compile_row_serializer(RoomSerializer))
+        self.assertIsNotNone(compile_row_serializer(StudentRoomSerializer))
+        self.assertIsNone(compile_row_serializer(MethodFieldSerializer))
+
+
+class SparseFieldsetTests(CatalogTestCase):
+    def get_with_queries(self, url, params):
+        with self.settings(CATALOG_CACHE_ENABLED=False), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response, ' '.join(query['sql'] for query in ctx.captured_queries)
+
+    def test_hostel_columns_are_not_read(self):
+        self.make_hostel()
+        self.client.force_authenticate(self.student)
+        response, sql = self.get_with_queries(reverse('hostel-list-create'), {'fields': 'name,capacity'})
+        self.assertEqual(list(response.data['results'][0]), ['name', 'capacity'])
+        self.assertNotIn('description', sql)
+        # Without the parameter only the role serializer's columns are read.
+        response, sql = self.get_with_queries(reverse('hostel-list-create'), {})
+        self.assertEqual(list(response.data['results'][0]), ['name', 'location', 'capacity', 'description'])
+        self.assertNotIn('custodian_id', sql)
+
+    def test_fields_outside_the_role_serializer_are_refused(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get(reverse('hostel-list-create'), {'fields': 'name,id', 'exclude': 'secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'fields', 'exclude'})
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('hostel-list-create'), {'fields': 'name,id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_trimmed_room_lists_match_serializers(self):
+        for _ in range(12):
+            self.make_room()
+        for user in (self.custodian, self.student):
+            for params in ({'fields': 'room_number,price_per_semester'}, {'exclude': 'hostel_name'},
+                           {'fields': 'hostel_name,room_number', 'exclude': 'room_number',
+                            'ordering': 'room_number', 'pagination': 'cursor', 'page_size': 5}):
+                with self.subTest(role=user.role, **params):
+                    self.client.force_authenticate(user)
+                    self.assertSameContent(reverse('room-list-create'), params)
+
+    def test_room_list_skips_the_hostel_join(self):
+        self.make_room()
+        self.client.force_authenticate(self.custodian)
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(FAST_LIST_SERIALIZATION_ENABLED=fast):
+                response, sql = self.get_with_queries(reverse('room-list-create'), {'exclude': 'hostel_name'})
+                self.assertNotIn('hostel_name', response.data['results'][0])
+                self.assertNotIn('hostels_hostel', sql)
+
+    def test_trimmed_room_detail(self):
+        room = self.make_room()
+        self.client.force_authenticate(self.custodian)
+        url = reverse('room-retrieve-update-destroy', args=[room.pk])
+        with self.settings(CATALOG_CACHE_ENABLED=False), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'exclude': 'created_at,updated_at'})
+        self.assertNotIn('created_at', response.data)
+        # The room is read without them; only the ETag's timestamp query reads updated_at.
+        room_sql, validators_sql = [query['sql'] for query in ctx.captured_queries]
+        self.assertNotIn('updated_at', room_sql)
+        self.assertNotIn('created_at', validators_sql)
+        # Writes validate and answer with every field.
+        response = self.client.patch(f'{url}?fields=room_number', {'room_number': '7'})
+        self.assertEqual(response.data['hostel_name'], room.hostel.name)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'price': Decimal('499.50'),
+        'at': datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        'naive': datetime(2025, 1, 2, 3, 4, 5),
+        'day': date(2025, 1, 2),
+        'label': gettext_lazy('Rooms'),
+        'text': 'caf\u00e9 \u2028 \u2029',
+        'nested': [{1: None, 'ok': True}, 2 ** 40, 0.5],
+    }
+
+    def assertSameAsDRF(self, data, media_type=None):
+        self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_output_matches_json_renderer(self):
+        self.assertSameAsDRF(self.data)
+        self.assertSameAsDRF(self.data, 'application/json; indent=4')
+        self.assertSameAsDRF({'big': 2 ** 70})
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_falls_back_without_orjson(self):
+        with patch.object(renderers, 'orjson', None):
+            self.assertSameAsDRF(self.data)
+
+
+@override_settings(ALLOWED_HOSTS=['*'], COMPRESSION_MIN_SIZE=1024, CATALOG_CACHE_ENABLED=False)
+class ResponseCompressionTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        for _ in range(20):
+            self.make_room()
+        self.client.force_authenticate(self.custodian)
+        self.url = reverse('room-list-create')
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br;q=0.5'), {'gzip', 'deflate', 'br'})
+        self.assertEqual(accepted_encodings('GZIP;q=0, br;q=bad, identity'), {'identity'})
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.get(self.url, {'page_size': 20})
+        self.assertGreater(len(plain.content), 1024)
+        self.assertNotIn('Content-Encoding', plain)
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        refused = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', refused)
+
+    def test_small_responses_are_sent_as_they_are(self):
+        response = self.client.get(self.url, {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertLess(len(response.content), 1024)
+        self.assertNotIn('Content-Encoding', response)
+
+    @skipIf(compression.brotli is None, 'brotli is not installed.')
+    def test_brotli_is_preferred(self):
+        plain = self.client.get(self.url, {'page_size': 20})
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+    @skipUnless(compression.brotli is None, 'brotli is installed.')
+    def test_brotli_only_clients_get_identity_without_brotli(self):
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='br')
+        self.assertNotIn('Content-Encoding', response)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(single_flight('key', compute, 60)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(len(calls), 1)
+
+
+class RoomBulkTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        self.existing = Rooms.objects.create(
+            hostel=self.hostel, room_number='100', price_per_semester=Decimal('500'))
+        self.client.force_authenticate(self.custodian)
+        self.url = reverse('room-bulk')
+
+    def room(self, number, **extra):
+        return {'hostel': str(self.hostel.pk), 'room_number': number,
+                'price_per_semester': '450.00', 'room_type': 'double', **extra}
+
+    def test_create_many_in_constant_queries(self):
+        payload = [self.room(str(number)) for number in range(200, 260)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(len(response.data), 60)
+        self.assertEqual(response.data[0]['hostel_name'], 'North')
+        # Two of these index the new rooms for search, and two are the
+        # savepoint that turns a racing duplicate into a 400.
+        self.assertLessEqual(len(ctx.captured_queries), 10)
+        self.assertEqual(Rooms.objects.count(), 61)
+
+    def test_per_item_errors_reject_whole_batch(self):
+        payload = [
+            self.room('201'),
+            self.room('202', price_per_semester='-1'),
+            self.room('201'),
+            self.room('100'),
+            self.room('203', hostel='not-a-uuid'),
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {item['index']: item['errors'] for item in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertIn('price_per_semester', errors[1])
+        self.assertIn('room_number', errors[2])
+        self.assertIn('room_number', errors[3])
+        self.assertIn('hostel', errors[4])
+        self.assertEqual(Rooms.objects.count(), 1)
+
+    def test_rooms_taken_during_the_write_are_reported(self):
+        def check_then_race(rooms, errors, exclude=()):
+            check_unique(rooms, errors, exclude)
+            if not Rooms.objects.filter(room_number='201').exists():
+                Rooms.objects.create(hostel=self.hostel, room_number='201', price_per_semester=Decimal('500'))
+
+        with patch('hostels.bulk.check_unique', side_effect=check_then_race):
+            response = self.client.post(self.url, [self.room('200'), self.room('201')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item['index'] for item in response.data['errors']], [1])
+        self.assertFalse(Rooms.objects.filter(room_number='200').exists())
+
+    def test_partial_updates(self):
+        other = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'))
+        response = self.client.patch(self.url, [
+            {'room_id': str(self.existing.pk), 'price_per_semester': '650.00', 'is_available': True},
+            {'room_id': str(other.pk), 'room_number': '102'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.existing.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.existing.price_per_semester, self.existing.is_available), (Decimal('650.00'), True))
+        self.assertEqual(other.room_number, '102')
+
+    def test_update_conflicts_are_reported(self):
+        other = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'))
+        response = self.client.patch(self.url, [
+            {'room_id': str(other.pk), 'room_number': '100'},
+            {'room_id': '00000000-0000-0000-0000-000000000000', 'room_number': '5'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item['index'] for item in response.data['errors']], [0, 1])
+        other.refresh_from_db()
+        self.assertEqual(other.room_number, '101')
+
+    def test_students_cannot_bulk_create(self):
+        student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.client.force_authenticate(student)
+        response = self.client.post(self.url, [self.room('300')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CatalogImportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        Rooms.objects.create(hostel=self.hostel, room_number='100', price_per_semester=Decimal('500'))
+
+    def csv(self, *lines):
+        return io.BytesIO('\n'.join(lines).encode())
+
+    def test_hostels_resolve_custodians_and_validate(self):
+        summary = import_catalog('hostels', self.csv(
+            'name,location,capacity,custodian_email',
+            'South,Campus,20,custodian@example.com',
+            'East,Campus,0,custodian@example.com',
+            'West,Campus,5,student@example.com',
+            'Far,Campus,5,nobody@example.com',
+            'North,Campus,5,custodian@example.com',
+        ), 'csv')
+        self.assertEqual((summary['created'], summary['invalid']), (1, 4))
+        errors = {item['line']: item['errors'] for item in summary['errors']}
+        self.assertIn('capacity', errors[3])
+        self.assertIn('custodian_id', errors[4])
+        self.assertIn('custodian_id', errors[5])
+        self.assertIn('name', errors[6])
+        self.assertTrue(Hostel.objects.filter(name='South', custodian_id=self.custodian).exists())
+
+    def test_rooms_by_hostel_name_in_constant_queries_per_batch(self):
+        rows = [json.dumps({'hostel_name': 'North', 'room_number': str(number), 'price_per_semester': '450.00'})
+                for number in range(200, 300)]
+        with CaptureQueriesContext(connection) as ctx:
+            summary = import_catalog('rooms', self.csv(*rows), 'ndjson', batch_size=50)
+        self.assertEqual(summary['created'], 100)
+        # Per batch: hostel names, existing rooms, the insert, savepoints (one around
+        # the batch, one around its write) and search indexing.
+        self.assertLessEqual(len(ctx.captured_queries), 2 * 10)
+        self.assertEqual(self.hostel.rooms.count(), 101)
+
+    def test_upsert_and_dry_run(self):
+        lines = ('hostel_name,room_number,price_per_semester,is_available',
+                 'North,100,650.00,true', 'North,101,300.00,false', 'North,101,310.00,false')
+        summary = import_catalog('rooms', self.csv(*lines), 'csv', dry_run=True)
+        self.assertEqual((summary['created'], summary['invalid']), (1, 2))
+        self.assertEqual(Rooms.objects.count(), 1)
+
+        summary = import_catalog('rooms', self.csv(*lines), 'csv', upsert=True)
+        self.assertEqual((summary['created'], summary['updated'], summary['invalid']), (1, 1, 1))
+        room = Rooms.objects.get(room_number='100')
+        self.assertEqual((room.price_per_semester, room.is_available), (Decimal('650.00'), True))
+
+    def test_rooms_taken_during_the_write_are_reported(self):
+        prepare = RoomImporter.prepare
+
+        def prepare_then_race(importer, rows, errors):
+            batch = prepare(importer, rows, errors)
+            Rooms.objects.create(hostel=self.hostel, room_number='201', price_per_semester=Decimal('500'))
+            return batch
+
+        with patch.object(RoomImporter, 'prepare', prepare_then_race):
+            summary = import_catalog('rooms', self.csv(
+                'hostel_name,room_number,price_per_semester', 'North,200,450.00', 'North,201,450.00'), 'csv')
+        self.assertEqual((summary['created'], summary['invalid']), (1, 1))
+        self.assertEqual(summary['errors'], [{'line': 3, 'errors': {
+            'room_number': ['A room with this number already exists in this hostel.']}}])
+        self.assertTrue(Rooms.objects.filter(room_number='200').exists())
+
+    def test_memory_does_not_grow_with_file_size(self):
+        def peak(rows):
+            lines = ('hostel,room_number,price_per_semester',
+                     *(f'{self.hostel.pk},R{number},450.00' for number in range(rows)))
+            stream = self.csv(*lines)
+            tracemalloc.start()
+            import_catalog('rooms', stream, 'csv', batch_size=100, dry_run=True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+
+        # sqlite3 caches a statement per savepoint name, up to a fixed number; fill it first.
+        peak(3000)
+        # Ten times the rows, well under twice the memory.
+        self.assertLess(peak(3000), 2 * peak(300))
+
+    def test_upload_endpoint_is_admin_only(self):
+        upload = SimpleUploadedFile('rooms.csv', b'hostel_name,room_number,price_per_semester\nNorth,7,400\n')
+        self.client.force_authenticate(self.custodian)
+        response = self.client.post(reverse('room-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pass12345!', role='admin',
+            first_name='Ad', last_name='Min', username='admin')
+        self.client.force_authenticate(admin)
+        upload.seek(0)
+        response = self.client.post(reverse('room-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(self.client.get(reverse('room-list-create'), {'search': 'North'}).data['count'], 2)
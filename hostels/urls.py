@@ -1,13 +1,23 @@
 from django.urls import path
-from .views import HostelListCreateAPIView, HostelRetrieveUpdateDestroyAPIView, RoomListCreateAPIView, RoomRetrieveUpdateDestroyAPIView
+from .views import HostelListCreateAPIView, HostelRetrieveUpdateDestroyAPIView, RoomListCreateAPIView, RoomAvailabilityAPIView, RoomBulkAPIView, RoomRetrieveUpdateDestroyAPIView, CatalogImportAPIView
+from .views import AsyncHostelListAPIView, AsyncRoomListAPIView, AsyncRoomRetrieveAPIView
 
 urlpatterns = [
     path('hostels/', HostelListCreateAPIView.as_view(), name='hostel-list-create'),
+    path('hostels/import/', CatalogImportAPIView.as_view(kind='hostels'), name='hostel-import'),
     path('hostels/<uuid:pk>/', HostelRetrieveUpdateDestroyAPIView.as_view(),
          name='hostel-retrieve-update-destroy'),
     path('rooms/', RoomListCreateAPIView.as_view(), name='room-list-create'),
+    path('rooms/available/', RoomAvailabilityAPIView.as_view(),
+         name='room-availability'),
+    path('rooms/bulk/', RoomBulkAPIView.as_view(), name='room-bulk'),
+    path('rooms/import/', CatalogImportAPIView.as_view(kind='rooms'), name='room-import'),
     path('rooms/<uuid:pk>/', RoomRetrieveUpdateDestroyAPIView.as_view(),
          name='room-retrieve-update-destroy'),
+    # Read-only async versions of the busiest reads, for ASGI deployments.
+    path('async/hostels/', AsyncHostelListAPIView.as_view(), name='async-hostel-list'),
+    path('async/rooms/', AsyncRoomListAPIView.as_view(), name='async-room-list'),
+    path('async/rooms/<uuid:pk>/', AsyncRoomRetrieveAPIView.as_view(), name='async-room-detail'),
 ]
 
 # path('hostels/<int:pk>/',
@@ -1,13 +1,27 @@
 from django.shortcuts import render
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 from accounts.permissions import IsAdmin, IsCustodian, IsStudent, IsCustodianOrAdmin
 from rest_framework.permissions import IsAuthenticated
+from hostel_booking_system.async_views import AsyncListMixin, AsyncRetrieveMixin
+from hostel_booking_system.caching import CachedListMixin
+from hostel_booking_system.conditional import ConditionalDetailMixin, ConditionalListMixin
+from hostel_booking_system.db_routing import ReplicaReadMixin
+from hostel_booking_system.fieldsets import SparseFieldsetMixin
+from hostel_booking_system.pagination import HybridPagination
+from hostel_booking_system.row_serializers import RowSerializerMixin
+from bookings.availability import available_rooms, get_interval_index, interval_index_enabled
+from .bulk import BulkRoomError, bulk_create_rooms, bulk_update_rooms
+from .importer import CatalogImportError, detect_format, import_catalog
 from .models import Hostel, Rooms
 from .serializers import (HostelSerializer,
                           StudentHostelSerializer,
                           CustodianHostelSerializer,
                           RoomSerializer,
-                          StudentRoomSerializer)
+                          StudentRoomSerializer,
+                          RoomAvailabilityQuerySerializer,
+                          CatalogImportSerializer)
 # Create your views here.
 
 
@@ -16,9 +30,11 @@ from .serializers import (HostelSerializer,
 #     serializer_class = HostelSerializer
 #     permission_classes = [permissions.IsAuthenticated & IsAdmin]
 
-class HostelListCreateAPIView(generics.ListCreateAPIView):
+class HostelListCreateAPIView(ReplicaReadMixin, ConditionalListMixin, CachedListMixin, SparseFieldsetMixin,
+                              generics.ListCreateAPIView):
     queryset = Hostel.objects.all().order_by('-created_at')
     serializer_class = HostelSerializer
+    cache_dependencies = ('hostels',)
     # permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['name', 'location', 'custodian_id']
     search_fields = ['name', 'location']
@@ -38,15 +54,20 @@ class HostelListCreateAPIView(generics.ListCreateAPIView):
         return [permissions.IsAuthenticated()]
 
 
-class HostelRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class HostelRetrieveUpdateDestroyAPIView(ReplicaReadMixin, ConditionalDetailMixin, SparseFieldsetMixin,
+                                         generics.RetrieveUpdateDestroyAPIView):
     queryset = Hostel.objects.all()
     serializer_class = HostelSerializer
     permission_classes = [IsAdmin]
 
 
-class RoomListCreateAPIView(generics.ListCreateAPIView):
-    queryset = Rooms.objects.all().order_by('-created_at')
+class RoomListCreateAPIView(ReplicaReadMixin, ConditionalListMixin, CachedListMixin, SparseFieldsetMixin,
+                            RowSerializerMixin, generics.ListCreateAPIView):
+    throttle_scope = 'rooms'
+    queryset = Rooms.objects.select_related('hostel').order_by('-created_at')
     serializer_class = RoomSerializer
+    pagination_class = HybridPagination
+    cache_dependencies = ('rooms',)
     filterset_fields = ['room_type', 'price_per_semester', 'hostel', 'is_available']
     search_fields = ['room_number', 'hostel__name']
     ordering_fields = ['created_at', 'price_per_semester', 'room_number']
@@ -63,7 +84,106 @@ class RoomListCreateAPIView(generics.ListCreateAPIView):
         return [permissions.IsAuthenticated()]
 
 
-class RoomRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Rooms.objects.all()
+class RoomAvailabilityAPIView(ReplicaReadMixin, CachedListMixin, SparseFieldsetMixin, RowSerializerMixin,
+                              generics.ListAPIView):
+    throttle_scope = 'rooms'
+    cache_dependencies = ('rooms', 'availability')
+    filterset_fields = ['room_type', 'hostel']
+    search_fields = ['room_number', 'hostel__name']
+    ordering_fields = ['price_per_semester', 'room_number']
+
+    def get_queryset(self):
+        params = RoomAvailabilityQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        check_in = params.validated_data['check_in']
+        check_out = params.validated_data['check_out']
+        hostel = params.validated_data.get('hostel')
+
+        queryset = Rooms.objects.select_related('hostel').filter(
+            is_available=True).order_by('-created_at')
+        if hostel and interval_index_enabled():
+            index = get_interval_index(hostel)
+            return queryset.filter(pk__in=index.free_room_ids(check_in, check_out))
+        return available_rooms(queryset, check_in, check_out)
+
+    def get_serializer_class(self):
+        user = self.request.user
+        if user.is_authenticated and user.role in ['custodian', 'admin']:
+            return RoomSerializer
+        return StudentRoomSerializer
+
+
+class RoomBulkAPIView(generics.GenericAPIView):
+    """
+    POST a list of rooms to create them, or PATCH a list of partial updates
+    (each with its ``room_id``), in one transaction. Any invalid item rejects
+    the whole batch with errors reported per item index.
+    """
+    serializer_class = RoomSerializer
+    permission_classes = [IsCustodianOrAdmin]
+    max_batch_size = 5000
+
+    def post(self, request, *args, **kwargs):
+        return self.run_bulk(request, bulk_create_rooms, status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        return self.run_bulk(request, bulk_update_rooms, status.HTTP_200_OK)
+
+    def run_bulk(self, request, operation, success_status):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Expected a non-empty list of rooms.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_batch_size:
+            return Response({'detail': f'At most {self.max_batch_size} rooms per request.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rooms = operation(items)
+        except BulkRoomError as exc:
+            return Response({'errors': exc.as_list()}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(rooms, many=True).data, status=success_status)
+
+
+class CatalogImportAPIView(generics.GenericAPIView):
+    """
+    Upload a CSV or NDJSON file (multipart field ``file``) of hostels or
+    rooms. The file is streamed in batches; invalid rows are skipped and
+    reported by line number. See hostels.importer for the columns.
+    """
+    serializer_class = CatalogImportSerializer
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser]
+    kind = None
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        upload = data['file']
+        upload.seek(0)
+        try:
+            summary = import_catalog(self.kind, upload.file, data.get('format') or detect_format(upload.name),
+                                     dry_run=data['dry_run'], upsert=data['upsert'])
+        except CatalogImportError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK if data['dry_run'] else status.HTTP_201_CREATED)
+
+
+class RoomRetrieveUpdateDestroyAPIView(ReplicaReadMixin, ConditionalDetailMixin, SparseFieldsetMixin,
+                                       generics.RetrieveUpdateDestroyAPIView):
+    throttle_scope = 'rooms'
+    queryset = Rooms.objects.select_related('hostel')
     serializer_class = RoomSerializer
     permission_classes = [IsCustodianOrAdmin]
+
+
+class AsyncHostelListAPIView(AsyncListMixin, HostelListCreateAPIView):
+    """The hostel list, read with the async ORM when served over ASGI."""
+
+
+class AsyncRoomListAPIView(AsyncListMixin, RoomListCreateAPIView):
+    """The room list, read with the async ORM when served over ASGI."""
+
+
+class AsyncRoomRetrieveAPIView(AsyncRetrieveMixin, RoomRetrieveUpdateDestroyAPIView):
+    """A room's detail, read with the async ORM when served over ASGI."""
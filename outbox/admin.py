@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import OutboxTask
+
+class OutboxTaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status', 'topic')
+
+admin.site.register(OutboxTask, OutboxTaskAdmin)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from outbox.queue import drain, requeue_failed, run_batch
+
+
+class Command(BaseCommand):
+    help = ('Run the handlers of events recorded in the outbox (booking notifications and other '
+            'post-commit side effects). Polls until stopped, or drains what is due with --once.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Tasks claimed per batch.')
+        parser.add_argument('--threads', type=int, default=1, help='Run each batch on this many threads.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no task is due.')
+        parser.add_argument('--once', action='store_true', help='Drain the due tasks and exit.')
+        parser.add_argument('--requeue-failed', action='store_true',
+                            help='Give failed tasks a fresh set of attempts before starting.')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            self.stdout.write(f'Requeued {requeue_failed()} failed tasks.')
+        if options['once']:
+            totals = drain(options['batch_size'], options['threads'])
+            self.stdout.write(self.format(totals))
+            return
+        try:
+            while True:
+                close_old_connections()
+                summary = run_batch(options['batch_size'], options['threads'])
+                if summary['claimed']:
+                    self.stdout.write(self.format(summary))
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+    @staticmethod
+    def format(summary):
+        return ', '.join(f'{key}: {value}' for key, value in summary.items())
@@ -0,0 +1,32 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxTask(models.Model):
+    """
+    One event waiting for its handlers, written in the same transaction as
+    the change that raised it and deleted once every handler has run.
+    ``available_at`` is when a worker may next claim it: claiming pushes it
+    a lease ahead, so a task whose worker died is picked up again.
+    """
+    STATUS = [
+        ('pending', 'pending'),
+        ('failed', 'failed'),
+    ]
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id'], name='outbox_status_available_id'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
@@ -0,0 +1,152 @@
+import logging
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxTask
+
+logger = logging.getLogger(__name__)
+
+# topic -> handlers, in registration order
+_handlers = defaultdict(list)
+
+
+def handler(topic):
+    """
+    Register the decorated function to run, with the event's payload, for
+    every event enqueued on ``topic``. Delivery is at least once: a handler
+    can see the same event again after a failure or a worker crash, so it
+    must be idempotent.
+    """
+    def register(func):
+        if func not in _handlers[topic]:
+            _handlers[topic].append(func)
+        return func
+    return register
+
+
+def handlers_for(topic):
+    return list(_handlers.get(topic, ()))
+
+
+def enqueue(topic, payload):
+    """
+    Record an event for the worker. Call it inside the transaction of the
+    write that raised it, so the event commits or rolls back with it.
+    Returns the task, or None when no handler listens on ``topic``.
+    """
+    tasks = enqueue_many(topic, [payload])
+    return tasks[0] if tasks else None
+
+
+def enqueue_many(topic, payloads, batch_size=1000):
+    """Record one event per payload with batched INSERTs; one write however many handlers listen."""
+    if not _handlers.get(topic):
+        return []
+    return OutboxTask.objects.bulk_create(
+        [OutboxTask(topic=topic, payload=payload) for payload in payloads], batch_size=batch_size)
+
+
+def max_attempts():
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def retry_delay(attempts):
+    # Doubles after every failed attempt.
+    return timedelta(seconds=getattr(settings, 'OUTBOX_RETRY_DELAY', 30) * 2 ** (attempts - 1))
+
+
+def claim(batch_size):
+    """
+    Lease up to ``batch_size`` due tasks, oldest first, by moving their
+    ``available_at`` a lease ahead. Concurrent workers skip each other's rows
+    where the database supports SKIP LOCKED.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'OUTBOX_LEASE_SECONDS', 300))
+    with transaction.atomic():
+        due = OutboxTask.objects.filter(status='pending', available_at__lte=now).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return []
+        OutboxTask.objects.filter(pk__in=ids).update(available_at=now + lease, attempts=F('attempts') + 1)
+    return list(OutboxTask.objects.filter(pk__in=ids).order_by('available_at', 'id'))
+
+
+def run_task(task):
+    """Run every handler of the task's topic; returns None or the first traceback."""
+    for func in handlers_for(task.topic):
+        try:
+            func(task.payload)
+        except Exception:
+            logger.exception('Outbox handler %s failed for %s', func.__qualname__, task)
+            return traceback.format_exc()
+    return None
+
+
+def _run_in_thread(task):
+    try:
+        return run_task(task)
+    finally:
+        # Each pool thread has its own connection.
+        connection.close()
+
+
+def run_batch(batch_size=100, threads=1):
+    """
+    Claim one batch, run it (on ``threads`` threads when more than one) and
+    record the outcome: finished tasks are deleted in one statement, failed
+    ones are retried with a growing delay until OUTBOX_MAX_ATTEMPTS and then
+    kept as 'failed'. Returns counts per outcome.
+    """
+    tasks = claim(batch_size)
+    if threads > 1 and len(tasks) > 1:
+        with ThreadPoolExecutor(min(threads, len(tasks))) as pool:
+            errors = list(pool.map(_run_in_thread, tasks))
+    else:
+        errors = [run_task(task) for task in tasks]
+
+    summary = {'claimed': len(tasks), 'succeeded': 0, 'retried': 0, 'failed': 0}
+    done = [task.pk for task, error in zip(tasks, errors) if error is None]
+    if done:
+        OutboxTask.objects.filter(pk__in=done).delete()
+    summary['succeeded'] = len(done)
+    now = timezone.now()
+    for task, error in zip(tasks, errors):
+        if error is None:
+            continue
+        if task.attempts >= max_attempts():
+            OutboxTask.objects.filter(pk=task.pk).update(status='failed', last_error=error)
+            summary['failed'] += 1
+        else:
+            OutboxTask.objects.filter(pk=task.pk).update(
+                available_at=now + retry_delay(task.attempts), last_error=error)
+            summary['retried'] += 1
+    return summary
+
+
+def drain(batch_size=100, threads=1):
+    """Run batches until no task is due. Returns the summed counts."""
+    totals = {'claimed': 0, 'succeeded': 0, 'retried': 0, 'failed': 0}
+    while True:
+        summary = run_batch(batch_size, threads)
+        for key, value in summary.items():
+            totals[key] += value
+        if not summary['claimed']:
+            return totals
+
+
+def requeue_failed(topic=None):
+    """Give failed tasks a fresh set of attempts. Returns how many were requeued."""
+    failed = OutboxTask.objects.filter(status='failed')
+    if topic:
+        failed = failed.filter(topic=topic)
+    return failed.update(status='pending', attempts=0, available_at=timezone.now())
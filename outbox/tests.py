@@ -0,0 +1,182 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core import mail
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import CustomUser
+from bookings.events import BOOKING_CREATED, BOOKING_STATUS_CHANGED
+from bookings.models import Booking
+from hostels.models import Hostel, Rooms
+from .models import OutboxTask
+from .queue import _handlers, claim, drain, enqueue, handlers_for, requeue_failed, run_batch
+
+
+class OutboxTestCase(APITestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pass12345!', role='admin',
+            first_name='Ad', last_name='Min', username='admin')
+        self.custodian = CustomUser.objects.create_user(
+            email='custodian@example.com', password='pass12345!', role='custodian',
+            first_name='Cus', last_name='Todian', username='custodian')
+        self.student = CustomUser.objects.create_user(
+            email='student@example.com', password='pass12345!', role='student',
+            first_name='Stu', last_name='Dent', username='student')
+        self.other_student = CustomUser.objects.create_user(
+            email='other@example.com', password='pass12345!', role='student',
+            first_name='Oth', last_name='Er', username='other')
+        self.hostel = Hostel.objects.create(
+            name='North', location='Campus', capacity=10, custodian_id=self.custodian)
+        self.room = Rooms.objects.create(
+            hostel=self.hostel, room_number='101', price_per_semester=Decimal('500'), is_available=True)
+
+    def request_booking(self, student):
+        self.client.force_authenticate(student)
+        response = self.client.post(reverse('bookings-list-create'), {
+            'room_id': self.room.pk, 'check_in_date': '2025-01-01', 'check_out_date': '2025-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return Booking.objects.get(student_id=student)
+
+
+class BookingEventTests(OutboxTestCase):
+    def test_booking_request_is_delivered_after_the_response(self):
+        self.request_booking(self.student)
+        self.assertEqual(list(OutboxTask.objects.values_list('topic', flat=True)), [BOOKING_CREATED])
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(drain(), {'claimed': 1, 'succeeded': 1, 'retried': 0, 'failed': 0})
+        self.assertEqual(mail.outbox[0].to, ['custodian@example.com'])
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_events_roll_back_with_the_write(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            enqueue(BOOKING_CREATED, {'booking_id': 'missing'})
+            raise RuntimeError
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_refused_request_records_nothing(self):
+        self.request_booking(self.student)
+        response = self.client.post(reverse('bookings-list-create'), {
+            'room_id': self.room.pk, 'check_in_date': '2025-01-01', 'check_out_date': '2025-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OutboxTask.objects.count(), 1)
+
+    def test_decisions_notify_every_affected_student(self):
+        first = self.request_booking(self.student)
+        self.request_booking(self.other_student)
+        OutboxTask.objects.all().delete()
+        self.client.force_authenticate(self.custodian)
+        response = self.client.post(reverse('booking-decisions'), {'ids': [first.pk], 'status': 'approved'},
+                                    format='json')
+        self.assertEqual(response.data['auto_rejected'], 1)
+        payloads = sorted((task.payload['student_id'], task.payload['status'], task.payload['previous_status'])
+                          for task in OutboxTask.objects.filter(topic=BOOKING_STATUS_CHANGED))
+        self.assertEqual(payloads, sorted([(self.student.pk, 'approved', 'pending'),
+                                           (self.other_student.pk, 'rejected', 'pending')]))
+        drain()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['other@example.com', 'student@example.com'])
+
+    def test_superseded_change_is_not_sent(self):
+        booking = self.request_booking(self.student)
+        self.client.force_authenticate(self.custodian)
+        url = reverse('booking-detail', args=[booking.pk])
+        self.client.patch(url, {'status': 'approved'})
+        self.client.patch(url, {'status': 'rejected'})
+        OutboxTask.objects.filter(topic=BOOKING_CREATED).delete()
+        self.assertEqual(drain()['succeeded'], 2)
+        self.assertEqual([message.subject for message in mail.outbox], ['Your booking is rejected'])
+
+    def test_write_cost_does_not_grow_with_handlers(self):
+        self.client.force_authenticate(self.student)
+        url = reverse('bookings-list-create')
+        counts = []
+        # The first request also warms the auth cache.
+        for extra in (0, 0, 20):
+            noops = [lambda payload: None] * extra
+            with patch.dict(_handlers, {BOOKING_CREATED: handlers_for(BOOKING_CREATED) + noops}):
+                room = Rooms.objects.create(hostel=self.hostel, room_number=f'2{len(counts)}',
+                                            price_per_semester=Decimal('500'))
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.post(url, {'room_id': room.pk, 'check_in_date': '2025-01-01',
+                                           'check_out_date': '2025-06-01'})
+                counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[1], counts[2])
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_DELAY=10)
+class DeliveryTests(OutboxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.failures = 0
+        patcher = patch.dict(_handlers, {'test.event': [self.record]})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, payload):
+        self.calls.append(payload['n'])
+        if self.failures:
+            self.failures -= 1
+            raise ValueError('handler failed')
+
+    def test_batches_run_oldest_first(self):
+        for n in range(5):
+            enqueue('test.event', {'n': n})
+        self.assertEqual(run_batch(batch_size=2)['succeeded'], 2)
+        self.assertEqual(drain(batch_size=2)['succeeded'], 3)
+        self.assertEqual(self.calls, [0, 1, 2, 3, 4])
+
+    def test_unhandled_topics_are_not_recorded(self):
+        self.assertIsNone(enqueue('test.nobody', {'n': 0}))
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_failures_are_retried_with_backoff_then_kept(self):
+        task = enqueue('test.event', {'n': 0})
+        self.failures = 5
+        self.assertEqual(run_batch()['retried'], 1)
+        task.refresh_from_db()
+        self.assertEqual(task.attempts, 1)
+        self.assertIn('handler failed', task.last_error)
+        self.assertGreater(task.available_at, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(run_batch()['claimed'], 0)
+
+        for _ in range(2):
+            OutboxTask.objects.update(available_at=timezone.now())
+            run_batch()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 3))
+        self.assertEqual(self.calls, [0, 0, 0])
+
+        self.failures = 0
+        self.assertEqual(requeue_failed(), 1)
+        self.assertEqual(drain()['succeeded'], 1)
+        self.assertFalse(OutboxTask.objects.exists())
+
+    def test_claimed_tasks_return_when_the_lease_expires(self):
+        enqueue('test.event', {'n': 0})
+        self.assertEqual(len(claim(10)), 1)
+        # The worker that claimed it died before finishing.
+        self.assertEqual(claim(10), [])
+        OutboxTask.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain()['succeeded'], 1)
+        self.assertEqual(self.calls, [0])
+
+
+class ThreadedDrainTests(TransactionTestCase):
+    def test_thread_pool_runs_every_task_once(self):
+        seen = []
+        with patch.dict(_handlers, {'test.event': [lambda payload: seen.append(payload['n'])]}):
+            for n in range(20):
+                enqueue('test.event', {'n': n})
+            totals = drain(batch_size=8, threads=4)
+        self.assertEqual(totals['succeeded'], 20)
+        self.assertEqual(sorted(seen), list(range(20)))
+        self.assertFalse(OutboxTask.objects.exists())
@@ -0,0 +1,28 @@
+from rest_framework.filters import SearchFilter
+
+from .index import get_index, search_index_enabled
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    Drop-in for SearchFilter. Each selective search term is first narrowed,
+    through the word-suffix index, to the rows that can contain it; then
+    SearchFilter's own icontains lookups run on that short list, so results
+    are identical. Unselective terms, prefixed lookups (``^``, ``=``...) and
+    fields that are not indexed fall back to the plain SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        index = get_index(queryset.model)
+        if not (search_fields and search_terms and index and search_index_enabled()):
+            return super().filter_queryset(request, queryset, view)
+        fields = [str(field) for field in search_fields]
+        if any(field[0] in self.lookup_prefixes or field not in index.fields for field in fields):
+            return super().filter_queryset(request, queryset, view)
+        for term in search_terms:
+            condition = index.matching(fields, term)
+            if condition is not None:
+                queryset = queryset.filter(condition)
+        return super().filter_queryset(request, queryset, view)
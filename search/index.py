@@ -0,0 +1,147 @@
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import IntegerField, Q
+from django.db.models.functions import Cast
+
+from .models import SearchSuffix
+
+BATCH_SIZE = 2000
+# Longer suffixes are stored (and searched) truncated; SearchFilter's own
+# icontains lookups check the candidates exactly afterwards.
+SUFFIX_LENGTH = SearchSuffix._meta.get_field('suffix').max_length
+MIN_PIECE_LENGTH = 2
+# Above this many postings a term is not selective enough to beat a scan.
+MAX_CANDIDATES = 1000
+
+WORD = re.compile(r'\w+')
+
+_registry = {}
+
+
+def search_index_enabled():
+    return getattr(settings, 'SEARCH_INDEX_ENABLED', True)
+
+
+def words(text):
+    return WORD.findall(str(text).lower())
+
+
+def suffixes(text):
+    return {word[start:start + SUFFIX_LENGTH]
+            for word in words(text) for start in range(len(word) - MIN_PIECE_LENGTH + 1)}
+
+
+class SearchIndex:
+    """
+    Word-suffix index over some text fields of one model. Fields may follow
+    one foreign key (``hostel__name``); saving the related row reindexes the
+    rows that point at it.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        self.label = model._meta.label_lower
+        self.integer_pk = isinstance(model._meta.pk, IntegerField)
+        # {related model: {foreign key name: [(indexed path, related attribute)]}}
+        self.dependencies = {}
+        for path in self.fields:
+            if '__' not in path:
+                continue
+            relation, attname = path.split('__', 1)
+            related = model._meta.get_field(relation).related_model
+            self.dependencies.setdefault(related, {}).setdefault(relation, []).append((path, attname))
+
+    def object_id(self, pk):
+        return str(self.model._meta.pk.get_db_prep_value(pk, connection))
+
+    def rows(self, values, fields):
+        for pk, *texts in values:
+            object_id = self.object_id(pk)
+            for field, text in zip(fields, texts):
+                if text:
+                    for suffix in suffixes(text):
+                        yield SearchSuffix(model=self.label, field=field, suffix=suffix, object_id=object_id)
+
+    def reindex(self, pks, fields=None, created=False):
+        """
+        Rewrite the postings of the given rows (all indexed fields by
+        default). Rows that were just created have no postings to delete.
+        """
+        fields = fields or self.fields
+        pks = list(pks)
+        if not pks:
+            return
+        values = self.model._default_manager.filter(pk__in=pks).values_list('pk', *fields)
+        if created:
+            SearchSuffix.objects.bulk_create(self.rows(values, fields), batch_size=BATCH_SIZE)
+            return
+        object_ids = [self.object_id(pk) for pk in pks]
+        with transaction.atomic():
+            SearchSuffix.objects.filter(model=self.label, field__in=fields, object_id__in=object_ids).delete()
+            SearchSuffix.objects.bulk_create(self.rows(values, fields), batch_size=BATCH_SIZE)
+
+    def remove(self, pks):
+        SearchSuffix.objects.filter(model=self.label, object_id__in=[self.object_id(pk) for pk in pks]).delete()
+
+    def rebuild(self, chunk_size=BATCH_SIZE):
+        """
+        Drop and rebuild every posting for this model, a chunk of rows at a
+        time, in one transaction, so searches keep using the old postings
+        until the new ones are all in place.
+        """
+        with transaction.atomic():
+            SearchSuffix.objects.filter(model=self.label).delete()
+            values = self.model._default_manager.order_by().values_list('pk', *self.fields)
+            created = 0
+            batch = []
+            for row in self.rows(values.iterator(chunk_size=chunk_size), self.fields):
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    created += len(SearchSuffix.objects.bulk_create(batch))
+                    batch = []
+            created += len(SearchSuffix.objects.bulk_create(batch))
+        return created
+
+    def postings(self, fields, piece):
+        piece = piece[:SUFFIX_LENGTH]
+        # A range rather than LIKE 'piece%', so every backend can use the index.
+        upper = piece[:-1] + chr(ord(piece[-1]) + 1)
+        return SearchSuffix.objects.filter(model=self.label, field__in=fields,
+                                           suffix__gte=piece, suffix__lt=upper)
+
+    def matching(self, fields, term):
+        """
+        A Q object keeping rows where one of ``fields`` has a word containing
+        the longest word-piece of ``term``, or None when the index cannot
+        narrow the search usefully (short or unselective terms).
+        """
+        pieces = [piece for piece in words(term) if len(piece) >= MIN_PIECE_LENGTH]
+        if not pieces:
+            return None
+        postings = self.postings(fields, max(pieces, key=len))
+        # Bounded probe: reads at most MAX_CANDIDATES + 1 index entries.
+        if len(postings.values_list('pk', flat=True)[:MAX_CANDIDATES + 1]) > MAX_CANDIDATES:
+            return None
+        if self.integer_pk:
+            object_ids = postings.values(pk=Cast('object_id', self.model._meta.pk))
+        else:
+            object_ids = postings.values('object_id')
+        return Q(pk__in=object_ids)
+
+
+def register(label, fields):
+    index = SearchIndex(apps.get_model(label), fields)
+    _registry[index.model] = index
+    return index
+
+
+def get_index(model):
+    return _registry.get(model)
+
+
+def registered_indexes():
+    return list(_registry.values())
@@ -0,0 +1,7 @@
+from .index import register
+
+# Keep these in step with the search_fields of the views; search.tests checks it.
+register('hostels.Hostel', ['name', 'location'])
+register('hostels.Rooms', ['room_number', 'hostel__name'])
+register('bookings.Booking', ['student_id__username', 'room_id__room_number'])
+register('accounts.CustomUser', ['username', 'first_name', 'last_name', 'email'])
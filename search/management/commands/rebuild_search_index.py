@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from search.index import registered_indexes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the word-suffix search index for every registered model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append',
+                            help='Only rebuild this model (app_label.model_name); repeatable.')
+
+    def handle(self, *args, **options):
+        for index in registered_indexes():
+            if options['model'] and index.label not in {label.lower() for label in options['model']}:
+                continue
+            created = index.rebuild()
+            self.stdout.write(f'{index.label}: {created} postings')
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSuffix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=40)),
+                ('field', models.CharField(max_length=60)),
+                ('suffix', models.CharField(max_length=16)),
+                ('object_id', models.CharField(max_length=36)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='search_suffix_object')],
+                'unique_together': {('model', 'field', 'suffix', 'object_id')},
+            },
+        ),
+    ]
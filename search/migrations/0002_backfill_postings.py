@@ -0,0 +1,63 @@
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+# A copy of search.index as it was when this migration was written, so later
+# changes to the index cannot change what migrating builds.
+INDEXES = [
+    ('hostels', 'Hostel', ['name', 'location']),
+    ('hostels', 'Rooms', ['room_number', 'hostel__name']),
+    ('bookings', 'Booking', ['student_id__username', 'room_id__room_number']),
+    ('accounts', 'CustomUser', ['username', 'first_name', 'last_name', 'email']),
+]
+BATCH_SIZE = 2000
+SUFFIX_LENGTH = 16
+MIN_PIECE_LENGTH = 2
+WORD = re.compile(r'\w+')
+
+
+def suffixes(text):
+    return {word[start:start + SUFFIX_LENGTH]
+            for word in WORD.findall(str(text).lower()) for start in range(len(word) - MIN_PIECE_LENGTH + 1)}
+
+
+def backfill_postings(apps, schema_editor):
+    # Rows written before the index existed have no postings, so ?search=
+    # would not find them.
+    if not getattr(settings, 'SEARCH_INDEX_ENABLED', True):
+        return
+    connection = schema_editor.connection
+    SearchSuffix = apps.get_model('search', 'SearchSuffix')
+    postings = SearchSuffix.objects.using(connection.alias)
+    for app_label, model_name, fields in INDEXES:
+        model = apps.get_model(app_label, model_name)
+        label = model._meta.label_lower
+        postings.filter(model=label).delete()
+        batch = []
+        rows = model._default_manager.using(connection.alias).order_by().values_list('pk', *fields)
+        for pk, *texts in rows.iterator(chunk_size=BATCH_SIZE):
+            # Object ids are primary keys in their database form, as search.index stores them.
+            object_id = str(model._meta.pk.get_db_prep_value(pk, connection))
+            for field, text in zip(fields, texts):
+                if text:
+                    batch.extend(SearchSuffix(model=label, field=field, suffix=suffix, object_id=object_id)
+                                 for suffix in suffixes(text))
+            if len(batch) >= BATCH_SIZE:
+                postings.bulk_create(batch)
+                batch = []
+        postings.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('accounts', '0005_user_role_date_joined_id'),
+        ('bookings', '0006_archived_booking'),
+        ('hostels', '0004_rooms_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_postings, migrations.RunPython.noop),
+    ]
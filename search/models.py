@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class SearchSuffix(models.Model):
+    """
+    One suffix of one word found in ``field`` of the ``model`` row whose
+    primary key, in its database form, is ``object_id``. Any substring of a
+    word is a prefix of one of its suffixes, so a substring search becomes a
+    range scan over this table's unique index.
+    """
+    model = models.CharField(max_length=40)
+    field = models.CharField(max_length=60)
+    suffix = models.CharField(max_length=16)
+    object_id = models.CharField(max_length=36)
+
+    class Meta:
+        unique_together = ('model', 'field', 'suffix', 'object_id')
+        indexes = [
+            models.Index(fields=['model', 'object_id'], name='search_suffix_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.model}.{self.field} {self.suffix!r} {self.object_id}"
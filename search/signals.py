@@ -0,0 +1,72 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.archive import archiving
+from bookings.models import Booking
+from bookings.signals import bookings_bulk_updated
+from hostels.models import Hostel, Rooms
+from hostels.signals import hostels_bulk_saved, rooms_bulk_saved
+from . import indexes  # noqa: F401
+from .index import get_index, registered_indexes, search_index_enabled
+
+
+def _touches(update_fields, attnames):
+    return update_fields is None or bool(set(update_fields) & set(attnames))
+
+
+def _connect(index):
+    local_fields = [path for path in index.fields if '__' not in path]
+    relations = [path.split('__', 1)[0] for path in index.fields if '__' in path]
+
+    def saved(sender, instance, created=False, update_fields=None, **kwargs):
+        if search_index_enabled() and _touches(update_fields, local_fields + relations):
+            index.reindex([instance.pk], created=created)
+
+    def deleted(sender, instance, **kwargs):
+        # archive_batch removes the postings of the bookings it moves in one statement.
+        if search_index_enabled() and not archiving():
+            index.remove([instance.pk])
+
+    post_save.connect(saved, sender=index.model, weak=False, dispatch_uid=f'search-{index.label}-save')
+    post_delete.connect(deleted, sender=index.model, weak=False, dispatch_uid=f'search-{index.label}-delete')
+
+    for related, through in index.dependencies.items():
+        def related_saved(sender, instance, created=False, update_fields=None, through=through, **kwargs):
+            if created or not search_index_enabled():
+                return
+            for relation, paths in through.items():
+                if _touches(update_fields, [attname for _, attname in paths]):
+                    pks = index.model._default_manager.filter(**{relation: instance}).values_list('pk', flat=True)
+                    index.reindex(pks, [path for path, _ in paths])
+
+        post_save.connect(related_saved, sender=related, weak=False,
+                          dispatch_uid=f'search-{index.label}-{related._meta.label_lower}-save')
+
+
+for search_index in registered_indexes():
+    _connect(search_index)
+
+
+@receiver(rooms_bulk_saved)
+def rooms_bulk_changed(sender, room_ids=(), created=False, **kwargs):
+    if search_index_enabled():
+        get_index(Rooms).reindex(room_ids, created=created)
+
+
+@receiver(hostels_bulk_saved)
+def hostels_bulk_changed(sender, hostel_ids=(), created=False, fields=None, **kwargs):
+    if not search_index_enabled():
+        return
+    get_index(Hostel).reindex(hostel_ids, created=created)
+    # Rooms index their hostel's name; senders that do not say what they wrote may have changed it.
+    if not created and (fields is None or 'name' in fields):
+        rooms = Rooms.objects.filter(hostel_id__in=hostel_ids).values_list('pk', flat=True)
+        get_index(Rooms).reindex(rooms, ['hostel__name'])
+
+
+@receiver(bookings_bulk_updated)
+def bookings_bulk_changed(sender, reassigned_ids=(), **kwargs):
+    # Status changes are not indexed; only bookings moved to another room are.
+    if search_index_enabled():
+        get_index(Booking).reindex(reassigned_ids, ['room_id__room_number'])
+
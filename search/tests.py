@@ -0,0 +1,134 @@
+import io
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import CustomUser
+from accounts.views import UserViewSet
+from bookings.allocation import allocate_rooms
+from bookings.models import Booking
+from bookings.views import BookingListCreateView
+from hostels.bulk import bulk_create_rooms
+from hostels.importer import import_catalog
+from hostels.models import Hostel, Rooms
+from hostels.signals import hostels_bulk_saved
+from hostels.views import HostelListCreateAPIView, RoomAvailabilityAPIView, RoomListCreateAPIView
+from .index import get_index
+from .models import SearchSuffix
+
+
+class IndexedSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create(
+            email='admin@example.com', username='admin', role='admin', first_name='Ada', last_name='Lovelace')
+        self.custodian = CustomUser.objects.create(
+            email='warden@example.com', username='warden', role='custodian', first_name='Cus', last_name='Todian')
+        self.hostels = [
+            Hostel.objects.create(name=name, location=location, capacity=10, custodian_id=self.custodian)
+            for name, location in [('Northgate', 'Upper Campus'), ('Southbank', 'River Road'), ('Eastwing', 'Campus')]]
+        self.rooms = [
+            Rooms.objects.create(hostel=hostel, room_number=f'{hostel.name[0]}{number}', is_available=True,
+                                 price_per_semester=Decimal('500'))
+            for hostel in self.hostels for number in (101, 102, 201)]
+        self.students = [
+            CustomUser.objects.create(email=f'{name}@uni.example', username=name, role='student',
+                                      first_name=name.title(), last_name='Student')
+            for name in ('amara', 'bongani', 'chidi', 'amarachi')]
+        for number, (student, room) in enumerate(zip(self.students * 2, self.rooms)):
+            Booking.objects.create(student_id=student, room_id=room, check_in_date=date(2025, 1, 1 + number),
+                                   check_out_date=date(2025, 6, 1))
+        self.client.force_authenticate(self.admin)
+
+    def ids(self, url, term):
+        response = self.client.get(url, {'search': term, 'page_size': 100})
+        return sorted(str(row.get('id') or row.get('room_id')) for row in response.data['results'])
+
+    def test_results_match_plain_search_filter(self):
+        urls = [reverse('hostel-list-create'), reverse('room-list-create'),
+                reverse('bookings-list-create'), reverse('users-list')]
+        terms = ['north', 'CAMPUS', 'amara', 'N10', 'ri', 'bank road', '"upper campus"', 'zzz', '201', 'uni.ex']
+        matched = 0
+        for url in urls:
+            for term in terms:
+                with self.subTest(url=url, term=term):
+                    indexed = self.ids(url, term)
+                    cache.clear()
+                    with override_settings(SEARCH_INDEX_ENABLED=False):
+                        plain = self.ids(url, term)
+                    cache.clear()
+                    self.assertEqual(indexed, plain)
+                    matched += bool(indexed)
+        self.assertGreater(matched, len(urls))
+
+    def test_index_follows_related_renames(self):
+        hostel = Hostel.objects.get(pk=self.hostels[0].pk)
+        hostel.name = 'Kilimanjaro'
+        hostel.save()
+        self.assertEqual(len(self.ids(reverse('room-list-create'), 'kiliman')), 3)
+
+        student = CustomUser.objects.get(pk=self.students[2].pk)
+        student.username = 'zawadi'
+        student.save()
+        self.assertEqual(len(self.ids(reverse('bookings-list-create'), 'zawadi')), 2)
+        self.assertEqual(self.ids(reverse('bookings-list-create'), 'chidi'), [])
+
+    def test_bulk_writes_and_deletes_are_indexed(self):
+        bulk_create_rooms([{'hostel': str(self.hostels[1].pk), 'room_number': 'X900',
+                            'price_per_semester': '400', 'is_available': True}])
+        self.assertEqual(len(self.ids(reverse('room-list-create'), 'x900')), 1)
+
+        Rooms.objects.create(hostel=self.hostels[0], room_number='N301', is_available=True,
+                             price_per_semester=Decimal('500'))
+        mover = Booking.objects.create(student_id=self.admin, room_id=self.rooms[0],
+                                       check_in_date=date(2025, 1, 1), check_out_date=date(2025, 6, 1))
+        allocate_rooms()
+        self.assertEqual(self.ids(reverse('bookings-list-create'), 'n301'), [str(mover.pk)])
+
+        Hostel.objects.get(pk=self.hostels[2].pk).delete()
+        index = get_index(Rooms)
+        self.assertFalse(SearchSuffix.objects.filter(
+            model='hostels.rooms', object_id__in=[index.object_id(room.pk) for room in self.rooms[6:]]).exists())
+
+    def test_migration_backfills_existing_rows(self):
+        expected = self.ids(reverse('hostel-list-create'), 'north')
+        postings = set(SearchSuffix.objects.values_list('model', 'field', 'suffix', 'object_id'))
+        SearchSuffix.objects.all().delete()
+        cache.clear()
+        self.assertEqual(self.ids(reverse('hostel-list-create'), 'north'), [])
+        state = MigrationLoader(connection).project_state(('search', '0002_backfill_postings'))
+        # Only the schema editor's connection is used; sqlite cannot open one inside a test.
+        import_module('search.migrations.0002_backfill_postings').backfill_postings(
+            state.apps, SimpleNamespace(connection=connection))
+        # The same postings the live index writes.
+        self.assertEqual(set(SearchSuffix.objects.values_list('model', 'field', 'suffix', 'object_id')), postings)
+        cache.clear()
+        self.assertEqual(self.ids(reverse('hostel-list-create'), 'north'), expected)
+
+    def test_bulk_hostel_updates_reindex_rooms_only_on_rename(self):
+        lines = b'name,location,capacity,custodian_email\nNorthgate,Lower Campus,12,warden@example.com\n'
+        with CaptureQueriesContext(connection) as ctx:
+            summary = import_catalog('hostels', io.BytesIO(lines), 'csv', upsert=True)
+        self.assertEqual(summary['updated'], 1)
+        self.assertFalse([query for query in ctx.captured_queries if 'hostels.rooms' in query['sql']])
+        self.assertEqual(self.ids(reverse('hostel-list-create'), 'lower'), [str(self.hostels[0].pk)])
+
+        Hostel.objects.filter(pk=self.hostels[0].pk).update(name='Kilimanjaro')
+        hostels_bulk_saved.send(sender=Hostel, hostel_ids=[self.hostels[0].pk], created=False, fields=['name'])
+        self.assertEqual(len(self.ids(reverse('room-list-create'), 'kiliman')), 3)
+
+    def test_every_search_view_is_indexed(self):
+        for view, model in [(HostelListCreateAPIView, Hostel), (RoomListCreateAPIView, Rooms),
+                            (RoomAvailabilityAPIView, Rooms), (BookingListCreateView, Booking),
+                            (UserViewSet, CustomUser)]:
+            with self.subTest(view=view.__name__):
+                self.assertLessEqual(set(view.search_fields), set(get_index(model).fields))